@@ -1,16 +1,27 @@
 # ______________________________________________ ADVANCED TO-DO LIST: VERSION 1.1 _____________________________________
+import os
 import sys
-import sqlite3 as sql # we will use database storage in later versions
-from PyQt5.QtWidgets import (QApplication, QWidget, QVBoxLayout, QHBoxLayout, QLineEdit, QPushButton, QListWidget,
-                             QLabel, QAbstractItemView, QToolTip, QMenu, QMessageBox, QAction, QColorDialog,
-                             QListWidgetItem, QTableWidget, QTableWidgetItem, QFrame, QProgressBar, QTreeView, QComboBox,
-                             QHeaderView, QDateEdit, QStyledItemDelegate, QTextEdit, QCalendarWidget, QTabWidget)
-from PyQt5.QtCore import Qt, pyqtSignal, QTimer, QTime, QDateTime, QDate
-from PyQt5.QtGui import QIcon, QKeyEvent, QBrush, QColor, QPixmap
+from todo_instrumentation import instrumentation, timed, startup_profile  # first: starts the start-up clock
+from PyQt5.QtWidgets import (QApplication, QWidget, QVBoxLayout, QHBoxLayout, QLineEdit, QPushButton,
+                             QListView, QLabel, QAbstractItemView, QToolTip, QMenu, QMessageBox, QAction, QColorDialog,
+                             QTableView, QFrame, QProgressBar, QTreeView, QComboBox,
+                             QHeaderView, QDateEdit, QStyledItemDelegate, QTextEdit, QCalendarWidget, QTabWidget,
+                             QFileDialog, QShortcut)
+from PyQt5.QtCore import (Qt, pyqtSignal, QObject, QTimer, QTime, QDateTime, QDate, QAbstractListModel, QEvent,
+                          QAbstractTableModel, QModelIndex, QMimeData, QRunnable, QThreadPool)
+from PyQt5.QtGui import QIcon, QKeyEvent, QBrush, QColor, QPixmap, QKeySequence, QCursor
+from PyQt5 import sip
 import datetime
 import json
-import matplotlib.pyplot as plt
+import weakref
+from collections import OrderedDict
+from itertools import islice
+from todo_engine import TaskEngine, decode_text
+from shift_schedule import PATTERNS, month_table, export_roster
+from todo_themes import theme_manager
+from todo_io import io_service
 from io import BytesIO
+startup_profile.mark("import")
 # Creating a custom line edit class:  subclassing a widget
 class CustomLineEdit(QLineEdit):
     def __init__(self, parent=None):  # constructor method for the CustomLineEdit class, default parent widget: None
@@ -23,19 +34,850 @@ class CustomLineEdit(QLineEdit):
             self.clear()  # Clear the text when Escape key is pressed
         else:
             super().keyPressEvent(event)
-class ReadOnlyDelegate(QStyledItemDelegate):
+class DateDelegate(QStyledItemDelegate):
+    # Draws the deadline as plain text; a QDateEdit exists only while the cell is being edited
+    def displayText(self, value, locale):
+        return value.toString(Qt.ISODate) if isinstance(value, QDate) else super().displayText(value, locale)
+
+    def createEditor(self, parent, option, index):
+        date_edit = QDateEdit(parent)
+        date_edit.setCalendarPopup(True)
+        date_edit.setProperty("cellEditor", True)  # styled by todo_themes
+        return date_edit
+
+    def setEditorData(self, editor, index):
+        editor.setDate(index.data(Qt.EditRole))
+
+    def setModelData(self, editor, model, index):
+        model.setData(index, editor.date(), Qt.EditRole)
+
+
+class ComboBoxDelegate(QStyledItemDelegate):
+    def __init__(self, items, parent=None):
+        super().__init__(parent)
+        self.items = items
+
+    def createEditor(self, parent, option, index):
+        combo_box = QComboBox(parent)
+        combo_box.addItems(self.items)
+        combo_box.setProperty("cellEditor", True)
+        return combo_box
+
+    def setEditorData(self, editor, index):
+        editor.setCurrentText(index.data(Qt.EditRole))
+
+    def setModelData(self, editor, model, index):
+        model.setData(index, editor.currentText(), Qt.EditRole)
+
+
+class CommentDelegate(QStyledItemDelegate):
     def createEditor(self, parent, option, index):
-        return None  #  By returning None, we effectively prevent any editor from being created for the cell.
+        user_comment_widget = QTextEdit(parent)
+        user_comment_widget.setProperty("cellEditor", True)
+        return user_comment_widget
+
+    def setEditorData(self, editor, index):
+        editor.setPlainText(index.data(Qt.EditRole))
+
+    def setModelData(self, editor, model, index):
+        model.setData(index, editor.toPlainText(), Qt.EditRole)
+
+class SaveTask(QRunnable):
+    def __init__(self, scheduler):
+        super().__init__()
+        self.scheduler = scheduler
+
+    def run(self):
+        self.scheduler.run_save()
+
+
+class SaveScheduler(QObject):
+    # Marks the storage dirty and writes it on a worker thread once the edits stop for debounce_ms, so a burst such
+    # as select-all plus delete or a multi-item drag-drop costs one write. Saves run one at a time, in order.
+    saved = pyqtSignal()
+    failed = pyqtSignal(str)
+    debounce_ms = 250
+
+    def __init__(self, save, parent=None):
+        super().__init__(parent)
+        self.save = save  # called on the worker thread
+        self._dirty = False
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.setInterval(self.debounce_ms)
+        self._timer.timeout.connect(self.start_save)
+        self._pool = QThreadPool(self)
+        self._pool.setMaxThreadCount(1)
+
+    def schedule(self):
+        self._dirty = True
+        self._timer.start()  # restarting the timer coalesces the burst
+
+    def start_save(self):
+        if self._dirty:
+            self._dirty = False
+            self._pool.start(SaveTask(self))
+
+    @timed(category="io")
+    def run_save(self):
+        try:
+            self.save()
+        except Exception as error:
+            self.failed.emit(str(error))
+        else:
+            self.saved.emit()
+
+    def flush(self):
+        # blocks until everything scheduled so far is on disk; used when the app closes
+        self._timer.stop()
+        self._pool.waitForDone()
+        if self._dirty:
+            self._dirty = False
+            self.run_save()
+
+
+class TaskLoader(QObject):
+    # Streams a backend's rows into a TaskStore one chunk per event-loop turn, so the first screen of tasks shows right
+    # away and the window stays responsive while a very large history loads. Cancelling stops the stream and leaves
+    # the rows loaded so far; the next mutation of the store finishes the load first, so nothing is saved from a
+    # partial list.
+    progress = pyqtSignal(int, int)  # rows loaded so far, total rows (0 when the backend cannot tell)
+    finished = pyqtSignal()
+    cancelled = pyqtSignal()
+    chunk_size = 2000
+
+    def __init__(self, task_store):
+        super().__init__(task_store)
+        self.task_store = task_store
+        self.loaded = 0
+        self.total = 0
+        self._rows = None
+        self._timer = QTimer(self)
+        self._timer.setInterval(0)  # one chunk whenever the event loop is idle
+        self._timer.timeout.connect(self.load_chunk)
+
+    def start(self):
+        backend = self.task_store.backend
+        self.total = backend.count_tasks() or 0
+        self._rows = backend.iter_load()
+        self.task_store._set_tasks({"pending": [], "completed": []})
+        self.task_store._set_recycle_bin_items({"recycled": []})
+        self.task_store.tasksReloaded.emit()
+        self.load_chunk()  # the first screen, before the window is even painted
+        if self._rows is not None:
+            self._timer.start()
+
+    @timed(category="io")
+    def load_chunk(self, chunk_size=None):
+        rows = list(islice(self._rows, chunk_size or self.chunk_size))
+        self.task_store._append_loaded(rows)
+        self.loaded += len(rows)
+        self.progress.emit(self.loaded, self.total)
+        if chunk_size is None and len(rows) < self.chunk_size:
+            self._done()
+
+    def finish(self):
+        # loads whatever is left right now
+        if self._rows is not None:
+            self.load_chunk(chunk_size=sys.maxsize)
+            self._done()
+
+    def cancel(self):
+        self._timer.stop()
+        self.cancelled.emit()
+
+    def _done(self):
+        self._timer.stop()
+        self._rows = None
+        if self.task_store.loader is self:
+            self.task_store.loader = None
+        self.task_store.tasksChanged.emit()
+        self.task_store.recycleBinChanged.emit()
+        self.finished.emit()
+
+
+class TaskStore(QObject, TaskEngine):
+    # The TaskEngine shared by every window. It is loaded once and handed to each of them, so no window has to build a
+    # throwaway TodoApp() just to read the lists; the engine's hooks become Qt signals and background saves.
+    tasksChanged = pyqtSignal()  # pending and/or completed tasks changed
+    recycleBinChanged = pyqtSignal()  # recycled tasks changed
+    tasksReloaded = pyqtSignal()  # lists were replaced wholesale; views must rebuild
+    # one user action as an ordered list of ("remove", list_name, row) / ("append", list_name, task) edits,
+    # list_name being "pending", "completed" or "recycled"; views replay it instead of rebuilding
+    tasksEdited = pyqtSignal(object)
+    tasksLoaded = pyqtSignal(object)  # a chunk of a streaming load: {list_name: rows appended}
+    performanceDataLoaded = pyqtSignal()  # performance_data() has the saved rows now
+    performanceDataSaved = pyqtSignal()  # the rows last given to save_performance_data() are on disk
+
+    def __init__(self, backend=None, parent=None):
+        super().__init__(parent=parent, backend=backend)  # QObject passes backend on to TaskEngine
+        self.saver = SaveScheduler(self.backend.write_pending, self)
+        self.loader = None  # the TaskLoader still streaming into the lists, if any
+        # the saved performance rows, parsed once: the Performance window refreshes on every store change
+        self._performance_data = None
+        self._performance_read_pending = False
+        self._performance_save_pending = False
+        if hasattr(self.backend, "write_file"):
+            # the text backend's user_performance.json is read and written on io_service's workers, atomically
+            self.backend.write_file = io_service.write
+            self.backend.read_file = io_service.read_text
+            io_service.readFinished.connect(self.on_io_read)
+            io_service.writeFinished.connect(self.on_io_written)
+            io_service.failed.connect(self.on_io_failed)
+        else:
+            self.saver.saved.connect(self.on_saved)  # the database commits them with the tasks
+
+    def on_io_read(self, path, contents):
+        if path != self.backend.performance_file or not self._performance_read_pending:
+            return
+        self._performance_read_pending = False
+        if self._performance_data is None:  # not saved meanwhile
+            try:
+                self._performance_data = json.loads(decode_text(contents)) if contents is not None else []
+            except ValueError:
+                self._performance_data = []
+            self.performanceDataLoaded.emit()
+
+    def on_io_written(self, path):
+        if path == self.backend.performance_file:
+            self.on_saved()
+
+    def on_saved(self):
+        if self._performance_save_pending:
+            self._performance_save_pending = False
+            self.performanceDataSaved.emit()
+
+    def on_io_failed(self, path, error):
+        if path == self.backend.performance_file:
+            self._performance_save_pending = False
+            self.saver.failed.emit(error)
+
+    def tasks_reloaded(self, list_names):
+        self.tasksReloaded.emit()
+        if list_names & {"pending", "completed"}:
+            self.tasksChanged.emit()
+        if "recycled" in list_names:
+            self.recycleBinChanged.emit()
+
+    def tasks_edited(self, edits):
+        self.saver.schedule()
+        # one notification per user action, however many rows it touched
+        self.tasksEdited.emit(edits)
+        touched = {list_name for _, list_name, _ in edits}
+        if touched & {"pending", "completed"}:
+            self.tasksChanged.emit()
+        if "recycled" in touched:
+            self.recycleBinChanged.emit()
+
+    def load(self):
+        self._drop_loader()
+        self.saver.flush()  # edits still waiting for the debounce must be on disk before it is re-read
+        self._performance_data = None
+        super().load()
+
+    def load_tasks(self):
+        self._drop_loader()
+        self.saver.flush()  # edits still waiting for the debounce must be on disk before it is re-read
+        self._performance_data = None
+        super().load_tasks()
+
+    def load_recycle_bin_items(self):
+        self._drop_loader()
+        self.saver.flush()  # edits still waiting for the debounce must be on disk before it is re-read
+        super().load_recycle_bin_items()
+
+    def load_incrementally(self):
+        # like load(), but streams the storage in chunks from the event loop; returns the TaskLoader
+        self._drop_loader()
+        self.saver.flush()
+        loader = self.loader = TaskLoader(self)
+        loader.start()
+        return loader
+
+    def ensure_loaded(self):
+        if self.loader is not None:
+            self.loader.finish()
+
+    def _drop_loader(self):
+        if self.loader is not None:
+            self.loader.cancel()
+            self.loader = None
+
+    def _append_loaded(self, rows):
+        counts = {}
+        for list_name, task_id, task in rows:
+            tasks, ids = self._lists(list_name)
+            tasks.append(task)
+            ids.append(task_id)
+            counts[list_name] = counts.get(list_name, 0) + 1
+            if list_name != "recycled":
+                self.index.add(task, list_name)
+        self.search_index.add_many((task_id, task) for _, task_id, task in rows)
+        if counts:
+            self.tasksLoaded.emit(counts)
+
+    def save_tasks(self):
+        self.saver.schedule()
+
+    def save_recycled_items(self):
+        self.saver.schedule()
+
+    def flush(self):
+        # final, synchronous save: pending writes plus a fresh snapshot
+        self.saver.flush()
+        io_service.wait_for_done()
+        if self.loader is None:  # a partially loaded store must not become the snapshot
+            super().flush()
+
+    def performance_data(self):
+        # Copies of the saved performance rows, or None while the text backend's file is still being read in the
+        # background; performanceDataLoaded follows once it is in
+        if self._performance_data is None:
+            if hasattr(self.backend, "write_file"):
+                if not self._performance_read_pending:
+                    self._performance_read_pending = True
+                    io_service.read(self.backend.performance_file)
+                return None
+            self._performance_data = super().load_performance_data()
+        return [dict(item) for item in self._performance_data]
+
+    def load_performance_data(self):
+        # synchronous, for callers that cannot wait; shares the cache with performance_data()
+        if self._performance_data is None:
+            self._performance_data = super().load_performance_data()
+        return [dict(item) for item in self._performance_data]
+
+    def save_performance_data(self, task_data):
+        super().save_performance_data(task_data)
+        self._performance_data = [dict(item) for item in task_data]
+        self._performance_save_pending = True
+        self.saver.schedule()
+
+
+class TaskListModel(QAbstractListModel):
+    # Read-only list model over one of the TaskStore lists ("pending", "completed" or "recycled"). Rows are handed to
+    # the view in pages through fetchMore, so a long history costs nothing until it is scrolled into view, and
+    # TaskStore.tasksEdited batches are applied as row inserts/removals instead of a reset. While a search query is set
+    # the model only holds the store rows matching it (see set_query), so view rows and store rows differ.
+    page_size = 500
+
+    def __init__(self, task_store, list_name, parent=None):
+        super().__init__(parent)
+        self.task_store = task_store
+        self.list_name = list_name
+        self.query = ""
+        self._rows = None  # store rows matching self.query, or None when every row is shown
+        self._loaded = 0  # rows exposed to the view so far
+        self._total = 0  # length of the store list (or of self._rows) as of the last edit applied
+        self.reload()
+        task_store.tasksReloaded.connect(self.reload)
+        task_store.tasksEdited.connect(self.apply_task_edits)
+        task_store.tasksLoaded.connect(self.apply_loaded_rows)
+
+    def tasks(self):
+        return self.task_store._lists(self.list_name)[0]
+
+    def reload(self):
+        self.beginResetModel()
+        self._rows = self.task_store.search_rows(self.list_name, self.query) if self.query else None
+        self._total = len(self.tasks()) if self._rows is None else len(self._rows)
+        self._loaded = min(self.page_size, self._total)
+        self.endResetModel()
+
+    def set_query(self, query):
+        # filters the list down to the tasks matching every word of query; an empty query shows them all again
+        query = query.strip()
+        if query != self.query:
+            self.query = query
+            self.reload()
+
+    def store_row(self, row):
+        return row if self._rows is None else self._rows[row]
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else self._loaded
+
+    def data(self, index, role=Qt.DisplayRole):
+        if index.isValid() and role in (Qt.DisplayRole, Qt.ToolTipRole):
+            return self.tasks()[self.store_row(index.row())]
+        return None
+
+    def canFetchMore(self, parent=QModelIndex()):
+        return not parent.isValid() and self._loaded < self._total
+
+    def fetchMore(self, parent=QModelIndex()):
+        count = min(self.page_size, self._total - self._loaded)
+        if count <= 0:
+            return
+        self.beginInsertRows(QModelIndex(), self._loaded, self._loaded + count - 1)
+        self._loaded += count
+        self.endInsertRows()
+
+    def fetch_all(self):
+        while self.canFetchMore():
+            self.fetchMore()
+
+    def apply_task_edits(self, edits):
+        if self._rows is not None:
+            # searching: find the matching rows again in one pass rather than replaying the edits
+            if any(list_name == self.list_name for _, list_name, _ in edits):
+                self.reload()
+            return
+        for operation, list_name, value in edits:
+            if list_name != self.list_name:
+                continue
+            if operation == "remove":
+                if value < self._loaded:
+                    self.beginRemoveRows(QModelIndex(), value, value)
+                    self._loaded -= 1
+                    self.endRemoveRows()
+                self._total -= 1
+            else:
+                self._total += 1
+                if self._loaded == self._total - 1:  # fully loaded, so the new row is visible right away
+                    self.beginInsertRows(QModelIndex(), self._loaded, self._loaded)
+                    self._loaded += 1
+                    self.endInsertRows()
+
+    def apply_loaded_rows(self, counts):
+        # a streaming load only fills the first page; the rest arrives through fetchMore as usual
+        if self._rows is not None:
+            if self.list_name in counts:
+                self.reload()
+            return
+        self._total += counts.get(self.list_name, 0)
+        if self._loaded < self.page_size:
+            self.fetchMore()
+
+    # drag and drop: the drops themselves are handled by TodoApp.eventFilter
+    def flags(self, index):
+        if not index.isValid():
+            return Qt.ItemIsDropEnabled
+        return Qt.ItemIsEnabled | Qt.ItemIsSelectable | Qt.ItemIsDragEnabled | Qt.ItemNeverHasChildren
+
+    def supportedDropActions(self):
+        return Qt.MoveAction | Qt.CopyAction
+
+    def mimeTypes(self):
+        return ["text/plain"]
+
+    def mimeData(self, indexes):
+        mime_data = QMimeData()
+        mime_data.setText("\n".join(index.data() for index in indexes))
+        return mime_data
+
+
+def task_list_view(task_store, list_name):
+    view = QListView()
+    view.setModel(TaskListModel(task_store, list_name, view))
+    view.setUniformItemSizes(True)  # lets the view lay out rows without measuring each one
+    view.setSelectionMode(QAbstractItemView.ExtendedSelection)  # see MultipleSelection
+    return view
+
+
+def selected_rows(view):
+    # store rows of a task list view's selection, which are not the view's rows while a search filters it
+    model = view.model()
+    return [model.store_row(index.row()) for index in view.selectedIndexes()]
+
+
+class TaskSearchBar(CustomLineEdit):
+    # Filters task list views to the tasks matching what is typed. The search runs once typing pauses, so a burst of
+    # keystrokes costs one query against TaskStore's search index.
+    debounce_ms = 150
+
+    def __init__(self, views, parent=None):
+        super().__init__(parent)
+        self.views = views
+        self.setPlaceholderText("SEARCH TASKS")
+        self.setToolTip("Type words or parts of words to show only the matching tasks\nPress ESC key to show them all")
+        self.setClearButtonEnabled(True)
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.setInterval(self.debounce_ms)
+        self._timer.timeout.connect(self.run_search)
+        self.textChanged.connect(lambda: self._timer.start())
+
+    def run_search(self):
+        self._timer.stop()
+        for view in self.views:
+            view.model().set_query(self.text())
+
+
+class PerformanceTableModel(QAbstractTableModel):
+    # Backs the "Your Performance" table. Every row is one task: the pending tasks come first with their saved
+    # performance data (deadline, type, priority, comment), followed by the completed tasks in column 3, so the two
+    # columns never pair unrelated tasks on one row. Only the current page of rows is exposed to the view, and
+    # nothing but the edited cell ever gets a widget.
+    headers = ["Pending\nTasks", "Completion\nDeadline", "Days\nRemaining",
+               "Completed\nTasks", "Task\nType", "Task\nPriority", "Your\nComments"]
+    task_types = ["Work", "Business", "Leisure", "Programming", "Other"]
+    task_priorities = ["High", "Medium", "Low", "Average"]
+    editable_columns = {1: "deadline", 4: "task_type", 5: "task_priority", 6: "user_comment"}
+    defaults = {"task_type": "Other", "task_priority": "Average", "user_comment": ""}
+
+    page_sizes = [25, 50, 100, 250, 500]
+
+    def __init__(self, parent=None, page_size=50):
+        super().__init__(parent)
+        self.task_data = []
+        self.completed_tasks = []
+        self.page = 0
+        self.page_size = page_size
+        self.edited = False  # cells were edited since the rows were last set
+        self.read_only = False  # the saved rows are still being read; an edit now would be saved over them
+
+    def set_rows(self, task_data, completed_tasks):
+        self.beginResetModel()
+        self.task_data = task_data
+        self.completed_tasks = completed_tasks
+        self.edited = False
+        self.page = min(self.page, self.page_count() - 1)
+        self.endResetModel()
+
+    def total_rows(self):
+        return len(self.task_data) + len(self.completed_tasks)
+
+    def page_count(self):
+        return max(1, -(-self.total_rows() // self.page_size))
+
+    def set_page(self, page):
+        page = max(0, min(page, self.page_count() - 1))
+        if page != self.page:
+            self.beginResetModel()
+            self.page = page
+            self.endResetModel()
+
+    def set_page_size(self, page_size):
+        # keep the first row of the current page in view
+        first_row = self.page * self.page_size
+        self.beginResetModel()
+        self.page_size = page_size
+        self.page = first_row // page_size
+        self.endResetModel()
+
+    def absolute_row(self, row):
+        return self.page * self.page_size + row
+
+    def rowCount(self, parent=QModelIndex()):
+        if parent.isValid():
+            return 0
+        return max(0, min(self.page_size, self.total_rows() - self.page * self.page_size))
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.headers)
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role == Qt.DisplayRole:
+            if orientation == Qt.Horizontal:
+                return self.headers[section]
+            return str(self.absolute_row(section) + 1)
+        return super().headerData(section, orientation, role)
+
+    def deadline(self, row):
+        return QDate.fromString(self.task_data[row]["deadline"], Qt.ISODate)
+
+    def days_remaining(self, row):
+        return QDate.currentDate().daysTo(self.deadline(row))
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        row, column = self.absolute_row(index.row()), index.column()
+        if row >= len(self.task_data):
+            # completed task rows only fill the "Completed Tasks" column
+            if column != 3:
+                return None
+            if role == Qt.DisplayRole:
+                return self.completed_tasks[row - len(self.task_data)]
+            if role == Qt.BackgroundRole:
+                return QColor('green')
+            if role == Qt.ForegroundRole:
+                return QColor('#ccc')
+            return None
+        if column == 3:
+            return None
+        task_info = self.task_data[row]
+        if column == 0:
+            if role == Qt.DisplayRole:
+                return task_info["task_name"]
+            if role == Qt.BackgroundRole:
+                return QColor('#000')
+            if role == Qt.ForegroundRole:
+                return QColor('#ccc')
+        elif column == 1:
+            if role in (Qt.DisplayRole, Qt.EditRole):
+                return self.deadline(row)
+        elif column == 2:
+            if role == Qt.DisplayRole:
+                return str(self.days_remaining(row))
+            if role == Qt.BackgroundRole:
+                days_remaining = self.days_remaining(row)
+                if days_remaining < 0:
+                    return QColor('red')
+                return QColor('green') if days_remaining == 0 else QColor('yellow')
+        elif role in (Qt.DisplayRole, Qt.EditRole):
+            key = self.editable_columns[column]
+            return task_info.get(key, self.defaults[key])
+        return None
+
+    def flags(self, index):
+        flags = super().flags(index)
+        if (index.column() in self.editable_columns and self.absolute_row(index.row()) < len(self.task_data)
+                and not self.read_only):
+            flags |= Qt.ItemIsEditable
+        return flags
+
+    def setData(self, index, value, role=Qt.EditRole):
+        if role != Qt.EditRole or not self.flags(index) & Qt.ItemIsEditable:
+            return False
+        row, column = self.absolute_row(index.row()), index.column()
+        if column == 1:
+            self.task_data[row]["deadline"] = value.toString(Qt.ISODate)
+            # the days remaining follow the deadline
+            self.dataChanged.emit(index, self.index(index.row(), 2))
+        else:
+            self.task_data[row][self.editable_columns[column]] = value
+            self.dataChanged.emit(index, index)
+        self.edited = True
+        return True
+
+    def clear_cell(self, index):
+        key = self.editable_columns.get(index.column())
+        if key in self.defaults and self.flags(index) & Qt.ItemIsEditable:
+            self.setData(index, self.defaults[key])
+
+
+def render_task_distribution_png(pending_count, completed_count, recycled_count, figsize=(4, 3), dark_mode=False):
+    # matplotlib is imported on first use so that start-up never pays for it. The chart is drawn with the Agg canvas
+    # and the object-oriented Figure API: no pyplot state, nothing left open, safe to call off the GUI thread.
+    from matplotlib.figure import Figure
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+
+    # Calculate percentages for each component; with no tasks at all every bar is simply 0
+    total_tasks = pending_count + completed_count + recycled_count
+    pending_percentage = (pending_count / total_tasks) * 100 if total_tasks else 0
+    completed_percentage = (completed_count / total_tasks) * 100 if total_tasks else 0
+    recycled_percentage = (recycled_count / total_tasks) * 100 if total_tasks else 0
+
+    # Create bar chart
+    labels = ['Pending', 'Completed', 'Recycled']
+    percentages = [pending_percentage, completed_percentage, recycled_percentage]
+    colors = ['#FCF55F', 'green', '#465362']
+
+    figure = Figure(figsize=figsize, facecolor='#a3aabe' if dark_mode else '#f2f2f2')  # Set figure size
+    FigureCanvasAgg(figure)
+    axes = figure.add_subplot()
+    axes.bar(labels, percentages, color=colors)
+    axes.set_ylabel('Percentage')
+    axes.set_title('Task Distribution')
+
+    buffer = BytesIO()
+    figure.savefig(buffer, format='png')
+    return buffer.getvalue()
+
+
+class ChartCache:
+    # LRU of rendered chart PNGs keyed on (pending, completed, recycled, figure size, dark mode), so reopening
+    # "Your Performance" with unchanged counts never touches matplotlib. With a cache_dir the PNGs also survive
+    # restarts: they are written through io_service and read back by ChartRenderTask, so the GUI thread never waits
+    # for the disk. Only used from the GUI thread, apart from read_disk().
+    def __init__(self, max_entries=16, cache_dir=None):
+        self.max_entries = max_entries
+        self.cache_dir = cache_dir
+        self._entries = OrderedDict()
+
+    @staticmethod
+    def key(pending_count, completed_count, recycled_count, figsize, dark_mode):
+        return pending_count, completed_count, recycled_count, tuple(figsize), bool(dark_mode)
+
+    def _path(self, key):
+        pending_count, completed_count, recycled_count, (width, height), dark_mode = key
+        mode = "dark" if dark_mode else "light"
+        return os.path.join(self.cache_dir,
+                            f"chart-{pending_count}-{completed_count}-{recycled_count}-{width}x{height}-{mode}.png")
+
+    def get(self, key):
+        # the in-memory entry only; see read_disk()
+        png = self._entries.get(key)
+        if png is not None:
+            self._entries.move_to_end(key)
+        return png
+
+    def read_disk(self, key):
+        # the PNG saved by an earlier put(), or None; safe to call from any thread
+        if not self.cache_dir:
+            return None
+        try:
+            return io_service.read_bytes(self._path(key))
+        except OSError:
+            return None
+
+    def put(self, key, png, save=True):
+        self._remember(key, png)
+        if self.cache_dir and save:
+            try:
+                os.makedirs(self.cache_dir, exist_ok=True)
+            except OSError:
+                return  # the disk cache is only an optimisation
+            io_service.write(self._path(key), png)
+
+    def _remember(self, key, png):
+        self._entries[key] = png
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+
+chart_cache = ChartCache(cache_dir=os.environ.get("TODO_CHART_CACHE_DIR"))
+
+
+class ChartRenderSignals(QObject):
+    finished = pyqtSignal(bytes)  # the encoded PNG
+    failed = pyqtSignal(str)
+
+
+class ChartRenderTask(QRunnable):
+    # Renders the "Task Distribution" chart on a QThreadPool worker, unless chart_cache has it on disk; results come
+    # back through queued signals
+    def __init__(self, pending_count, completed_count, recycled_count, figsize=(4, 3), dark_mode=False):
+        super().__init__()
+        self.counts = (pending_count, completed_count, recycled_count)
+        self.figsize = figsize
+        self.dark_mode = dark_mode
+        self.from_disk = False  # the PNG came from the disk cache rather than matplotlib
+        self.signals = ChartRenderSignals()
+        self.setAutoDelete(False)  # the window keeps the task (and its signals) alive until the chart arrives
+
+    def run(self):
+        png = chart_cache.read_disk(ChartCache.key(*self.counts, self.figsize, self.dark_mode))
+        if png is not None:
+            self.from_disk = True
+            self.signals.finished.emit(png)
+            return
+        try:
+            png = render_task_distribution_png(*self.counts, figsize=self.figsize, dark_mode=self.dark_mode)
+        except Exception as error:
+            self.signals.failed.emit(str(error))
+        else:
+            self.signals.finished.emit(png)
+
+
+class ClockService(QObject):
+    # One clock for every window: a single-shot coarse timer re-armed for the next wall-clock second, running only
+    # while an attached window is shown and not minimized, and timeChanged is only emitted when the text changes.
+    timeChanged = pyqtSignal(str)  # "hh:mm:ss"
+
+    def __init__(self, time_format="hh:mm:ss"):
+        super().__init__()
+        self.time_format = time_format
+        self.text = None
+        self.windows = weakref.WeakSet()  # attaching a window does not keep it alive
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.setTimerType(Qt.CoarseTimer)
+        self._timer.timeout.connect(self.tick)
+
+    def attach(self, window, slot):
+        # Calls slot with the current time now and on every change while the clock runs
+        self.timeChanged.connect(slot)
+        slot(self.current_text())
+        if window not in self.windows:
+            self.windows.add(window)
+            window.installEventFilter(self)
+        self.update_running()
+
+    def detach(self, window, slot):
+        self.timeChanged.disconnect(slot)
+        self.windows.discard(window)
+        self.update_running()
+
+    def current_text(self):
+        return QTime.currentTime().toString(self.time_format)
+
+    def is_running(self):
+        return self._timer.isActive()
+
+    def eventFilter(self, obj, event):
+        if event.type() in (QEvent.Show, QEvent.Hide, QEvent.WindowStateChange):
+            self.update_running()
+        return False
+
+    def showing(self):
+        return any(not sip.isdeleted(window) and window.isVisible() and not window.isMinimized()
+                   for window in list(self.windows))
+
+    def update_running(self):
+        if not self.showing():
+            self._timer.stop()
+        elif not self._timer.isActive():
+            self.tick()  # catch up on the time missed while hidden
+
+    def tick(self):
+        if not self.showing():  # e.g. the last window was deleted while on screen
+            return
+        now = QTime.currentTime()
+        text = now.toString(self.time_format)
+        if text != self.text:
+            self.text = text
+            self.timeChanged.emit(text)
+        # a coarse timer may fire a little early; the text is then unchanged and the next shot only waits the rest
+        self._timer.start(1000 - now.msec())
+
+
+clock_service = ClockService()
+
+
+class ShiftCalendarWidget(QCalendarWidget):
+    # Month view with every visible day striped by crew: one segment per crew along the bottom of the cell, coloured
+    # by that crew's shift. The page's shifts come from shift_schedule.month_table, so painting is only lookups.
+    shift_colors = [QColor("#ffd23f"), QColor("#3a5cc5"), QColor("#8a8f98")]  # DAY, NIGHT, OFF
+
+    def __init__(self, pattern, parent=None):
+        super().__init__(parent)
+        self.pattern = pattern
+        self._table = None
+        self.currentPageChanged.connect(self.load_page)
+        self.load_page(self.yearShown(), self.monthShown())
+
+    def set_pattern(self, pattern):
+        self.pattern = pattern
+        self.load_page(self.yearShown(), self.monthShown())
+
+    def load_page(self, year, month):
+        self._table = month_table(self.pattern, year, month)
+        self.updateCells()
+
+    def shifts_on(self, date):
+        first, days = self._table
+        index = date.toPyDate().toordinal() - first.toordinal()
+        return days[index] if 0 <= index < len(days) else None
+
+    def paintCell(self, painter, rect, date):
+        super().paintCell(painter, rect, date)
+        shifts = self.shifts_on(date)
+        if not shifts:
+            return
+        height = max(3, rect.height() // 6)
+        width = rect.width() / len(shifts)
+        top = rect.bottom() - height + 1
+        for crew_index, shift in enumerate(shifts):
+            left = rect.left() + round(crew_index * width)
+            painter.fillRect(left, top, round((crew_index + 1) * width) - round(crew_index * width), height,
+                             self.shift_colors[shift])
+
 
 class ShiftScheduleApp(QWidget):
-    global dark_mode_requested
-    def __init__(self):
+    shift_labels = ['DAY\t☀', 'NIGHT\t🌙', 'OFF\t🍕']  # indexed by shift_schedule.DAY/NIGHT/OFF
+
+    def __init__(self, pattern="2-2-2"):
         super().__init__()
+        self.pattern = PATTERNS[pattern]  # see shift_schedule.RotationPattern for custom crews and anchor dates
         self.init_ui()
 
     def init_ui(self):
         self.setWindowTitle("AGL🌍 Shift Schedule".upper())
-        self.setStyleSheet('background-color: #05161a;')
+        self.setObjectName("shiftScheduleWindow")  # styled by todo_themes
         self.setWindowIcon(QIcon("agl_shifts_icon.png"))
         self.resize(400, 200)
 
@@ -44,38 +886,85 @@ class ShiftScheduleApp(QWidget):
 
         # Create date label
         self.date_label = QLabel("Select a Date".upper())
-        self.date_label.setStyleSheet("""
-            background-color: #000; 
-            color: #ccc; 
-            padding-left: 120px; 
-            padding-top: 5px;
-            border: 1px solid #c1e8ff; 
-            padding-bottom: 5px;
-            """)
+        self.date_label.setObjectName("dateLabel")
         layout.addWidget(self.date_label)
 
+        # Rotation pattern selection
+        self.pattern_combo = QComboBox()
+        self.pattern_combo.addItems(list(PATTERNS))
+        self.pattern_combo.setCurrentText(self.pattern.name)
+        self.pattern_combo.setObjectName("patternCombo")
+        self.pattern_combo.currentTextChanged.connect(self.change_pattern)
+        layout.addWidget(self.pattern_combo)
+
         # Create calendar widget
-        self.calendar = QCalendarWidget()
-        self.calendar.setStyleSheet('background-color: #6da5c0;')
+        self.calendar = ShiftCalendarWidget(self.pattern)
+        self.calendar.setObjectName("shiftCalendar")
         self.calendar.setSelectedDate(QDate.currentDate())
         self.calendar.selectionChanged.connect(self.update_output)  # Connect signal to update_output method
         layout.addWidget(self.calendar)
 
+        self.legend_label = QLabel()
+        self.legend_label.setObjectName("legendLabel")
+        self.update_legend()
+        layout.addWidget(self.legend_label)
+
         # Create output label
         self.output_label = QLabel("")
-        self.output_label.setStyleSheet("""
-            background-color: #000; 
-            padding-left: 120px; 
-            padding-top: 5px; 
-            padding-bottom: 5px; 
-            border: 1px solid #c1e8ff; 
-            color: yellow;
-            """)
+        self.output_label.setObjectName("shiftOutputLabel")
         layout.addWidget(self.output_label)
 
+        # Roster export: the selected crews from the "From" date to the "To" date as .ics or .csv
+        export_layout = QHBoxLayout()
+        self.export_from_edit = QDateEdit(QDate.currentDate())
+        self.export_to_edit = QDateEdit(QDate.currentDate().addYears(1))
+        for date_edit in (self.export_from_edit, self.export_to_edit):
+            date_edit.setCalendarPopup(True)
+            date_edit.setDisplayFormat("dd MMM yyyy")
+            date_edit.setProperty("rosterInput", True)
+        self.export_crews_entry = QLineEdit()
+        self.export_crews_entry.setPlaceholderText("Crews: all")
+        self.export_crews_entry.setToolTip("Comma separated crews to export, e.g. A, C\nLeave empty for every crew")
+        self.export_crews_entry.setProperty("rosterInput", True)
+        self.export_button = QPushButton("Export Roster")
+        self.export_button.setObjectName("exportRosterButton")
+        self.export_button.clicked.connect(self.export_roster)
+        export_layout.addWidget(self.export_from_edit)
+        export_layout.addWidget(self.export_to_edit)
+        export_layout.addWidget(self.export_crews_entry)
+        export_layout.addWidget(self.export_button)
+        layout.addLayout(export_layout)
+
         self.setLayout(layout)
         self.update_output()
 
+    def export_roster(self):
+        crews = [crew.strip() for crew in self.export_crews_entry.text().split(",") if crew.strip()]
+        unknown = [crew for crew in crews if crew not in self.pattern.crews]
+        start, end = self.export_from_edit.date(), self.export_to_edit.date()
+        if unknown or end < start:
+            problem = f"Unknown crew(s): {', '.join(unknown)}" if unknown else "The roster ends before it starts"
+            QMessageBox.warning(self, "Export Roster", problem, QMessageBox.Ok)
+            return
+        path, _ = QFileDialog.getSaveFileName(self, "Export Roster", f"{self.pattern.name} roster.ics",
+                                              "iCalendar (*.ics);;CSV (*.csv)")
+        if not path:
+            return
+        try:
+            export_roster(path, self.pattern, start.toPyDate(), end.toPyDate(), crews or None)
+        except OSError as error:
+            QMessageBox.warning(self, "Export Roster", f"The roster could not be written:\n{error}", QMessageBox.Ok)
+
+    def change_pattern(self, name):
+        self.pattern = PATTERNS[name]
+        self.calendar.set_pattern(self.pattern)
+        self.update_legend()
+        self.update_output()
+
+    def update_legend(self):
+        self.legend_label.setText(f"Day stripes, left to right: crews {', '.join(self.pattern.crews)}\n"
+                                  "Yellow DAY · Blue NIGHT · Grey OFF")
+
     def update_output(self):
         selected_date = self.calendar.selectedDate()
         shifts = self.get_shift(selected_date)
@@ -89,22 +978,18 @@ class ShiftScheduleApp(QWidget):
             self.date_label.setText("Select a Date")
 
     def get_shift(self, selected_date):
-        shifts = ['A', 'B', 'C']
-        shift_day_types = []
-        start_date = QDate(2024, 4, 30)
-        days_since_start = start_date.daysTo(selected_date)  # Calculate days since start date
-        for shift in shifts:
-            shift_index = shifts.index(shift)
-            day_type_index = (days_since_start + shift_index * 2) % 6
-            day_type = ['DAY\t☀', 'NIGHT\t🌙', 'OFF\t🍕'][day_type_index // 2]  # Each type repeats every 2 days
-            shift_day_types.append(f"{shift}: {day_type}")
-        return shift_day_types
+        # one line per crew; shift_schedule.shift_roster gives whole date ranges at once
+        return [f"{crew}: {self.shift_labels[shift]}" for crew, shift in self.pattern.shift_on(selected_date.toPyDate())]
 
 
 class Performance_Window(QFrame):
-    global dark_mode_requested
-    def __init__(self):
+    chart_figsize = (4, 3)  # inches, for the "Task Distribution" chart
+    def __init__(self, task_store):
         super().__init__()
+        self.setObjectName("performanceWindow")  # styled by todo_themes
+        self.task_store = task_store
+        self.chart_tasks = {}  # chart key -> ChartRenderTask still rendering
+        self.stale = False  # the table missed store changes while hidden (or was released); rebuilt on show
         self.setWindowTitle("Your Performance")
         self.resize(800, 700)
         self.performance_initUI()
@@ -114,110 +999,78 @@ class Performance_Window(QFrame):
         # Create a QVBoxLayout to hold the widgets
         layout = QVBoxLayout()
 
-        # Add a QTableWidget
-        # Add a QTableWidget to the layout
-        self.table_widget = QTableWidget()  # or you can explicitly set rows and columns e.g QTableWidget(12, 7)
+        # Add a model-backed QTableView to the layout; the deadline, type, priority and comment cells are drawn by
+        # delegates, which only create an editor for the cell being edited
+        self.table_model = PerformanceTableModel(self)
+        self.table_view = QTableView()
+        self.table_view.setObjectName("performanceTable")
+        self.table_view.setModel(self.table_model)
+        self.table_view.setItemDelegateForColumn(1, DateDelegate(self.table_view))
+        self.table_view.setItemDelegateForColumn(
+            4, ComboBoxDelegate(PerformanceTableModel.task_types, self.table_view))
+        self.table_view.setItemDelegateForColumn(
+            5, ComboBoxDelegate(PerformanceTableModel.task_priorities, self.table_view))
+        self.table_view.setItemDelegateForColumn(6, CommentDelegate(self.table_view))
+        self.table_view.setEditTriggers(QAbstractItemView.DoubleClicked | QAbstractItemView.SelectedClicked |
+                                        QAbstractItemView.EditKeyPressed)
         self.reference_label = QLabel()
+        self.reference_label.setObjectName("referenceLabel")
         self.save_button = QPushButton('Save')
+        self.save_button.setObjectName("saveButton")
         self.save_button.setToolTip('Save Changes')
-
-
-        self.save_button.setStyleSheet('''
-            QPushButton {
-                background-color: #000; color: white; border: 2px solid greenyellow; border-radius: 10px;
-            }
-            QPushButton::hover {
-                background-color: green; color: white
-            }
-        ''')
         self.save_button.setFixedSize(50, 30)
         self.refresh_button = QPushButton('Refresh')
 
-        self.table_widget.setRowCount(12)  # Assuming 7 days in a week
-        self.table_widget.setColumnCount(7)  # Two columns: Day and Percentage Completed
-
-        # Set headers for the table; try for table_widget.verticalHeader()
-        table_headers = ["Pending\nTasks", "Completion\nDeadline", "Days\nRemaining",
-                                                "Completed\nTasks", "Task\nType", "Task\nPriority", "Your\nComments"]
-        self.table_widget.setHorizontalHeaderLabels(table_headers)
-        self.table_widget.horizontalHeader().setDefaultAlignment(Qt.AlignCenter)
-        self.table_widget.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)  # for columns to stretch out
-        self.table_widget.horizontalHeader().setHighlightSections(True)
-        self.table_widget.horizontalHeader().setSectionsClickable(True)
-        self.table_widget.cellClicked.connect(self.on_cell_clicked)
-        self.table_widget.cellPressed.connect(self.on_cell_pressed)
-        self.table_widget.cellActivated.connect(self.on_cell_activated)
+        # paging through long task histories; only the visible page is handed to the table view
+        self.previous_page_button = QPushButton('◀')
+        self.previous_page_button.setToolTip('Previous Page')
+        self.previous_page_button.clicked.connect(lambda: self.show_page(self.table_model.page - 1))
+        self.next_page_button = QPushButton('▶')
+        self.next_page_button.setToolTip('Next Page')
+        self.next_page_button.clicked.connect(lambda: self.show_page(self.table_model.page + 1))
+        self.page_label = QLabel()
+        self.page_size_combo = QComboBox()
+        self.page_size_combo.setToolTip('Rows per page')
+        self.page_size_combo.addItems([str(page_size) for page_size in PerformanceTableModel.page_sizes])
+        self.page_size_combo.setCurrentText(str(self.table_model.page_size))
+        self.page_size_combo.currentTextChanged.connect(self.change_page_size)
+
+        # Set headers for the table; try for table_view.verticalHeader()
+        self.table_view.horizontalHeader().setDefaultAlignment(Qt.AlignCenter)
+        self.table_view.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)  # for columns to stretch out
+        self.table_view.horizontalHeader().setHighlightSections(True)
+        self.table_view.horizontalHeader().setSectionsClickable(True)
+        self.table_view.clicked.connect(self.on_cell_clicked)
+        self.table_view.pressed.connect(self.on_cell_pressed)
         self.save_button.clicked.connect(self.save_changes)
 
         """
         # How to merge cells
-        num_rows = self.table_widget.rowCount()
+        num_rows = self.table_model.rowCount()
 
         # Merge cells in the success rate column (assuming it's the 3rd column, index 2)
-        self.table_widget.setSpan(0, 4, num_rows, 1)
+        self.table_view.setSpan(0, 4, num_rows, 1)
         """
         self.populate_table()
 
-        # set background colors for days remaining for existing data before populating
-        for i in range(self.table_widget.rowCount()):
-            item = self.table_widget.item(i, 2)
-            if item:
-                value = int(item.text())
-                if value < 0:
-                    item.setBackground(QColor('red'))
-                elif value == 0:
-                    item.setBackground(QColor('green'))
-                else:
-                    item.setBackground(QColor('yellow'))
-        # Set header background color, text color, and font properties
-        header = self.table_widget.horizontalHeader()
-        header.setStyleSheet("""
-            QHeaderView::section { 
-                background-color: green; color:white; font-weight: bold; 
-            }
-            """)
-        if dark_mode_requested:
-            header.setStyleSheet("""
-                QHeaderView::section { 
-                    background-color: #0077b6; color:white; font-weight: bold; 
-                }
-            """)
-        # Set vertical header background color, text color, and font properties
-        vertical_header = self.table_widget.verticalHeader()
-        vertical_header.setStyleSheet("""
-                    QHeaderView::section { 
-                        background-color: #3c3c3c; 
-                        color: white; 
-                        font-weight: bold; 
-                    }
-                """)
-        # Set cell background color, text color, and font properties
-        self.table_widget.setStyleSheet("""
-                    QTableWidget { 
-                        background-color: #edfbff; 
-                        color: black;
-                    }
-                """)
-        if dark_mode_requested:
-            self.setStyleSheet("""
-                QFrame { background-color: #021024;}
-            """)
-            self.table_widget.setStyleSheet("""
-                QTableWidget { 
-                    background-color: #a3aabe; 
-                    color: black;
-                }
-            """)
-        pending_tasks = TodoApp().pending_tasks
-        completed_tasks = TodoApp().completed_tasks
-        recyclebin_tasks = Recycle_Bin_Window().recycle_bin_tasks
-
-        layout.addWidget(self.table_widget)
+        # header and cell colours come from the theme's stylesheet
+        self.table_view.horizontalHeader().setObjectName("taskHeader")
+        self.table_view.verticalHeader().setObjectName("taskRowHeader")
+
+        layout.addWidget(self.table_view)
+        paging_layout = QHBoxLayout()
+        paging_layout.addWidget(self.save_button)
+        paging_layout.addStretch()
+        paging_layout.addWidget(self.previous_page_button)
+        paging_layout.addWidget(self.page_label)
+        paging_layout.addWidget(self.next_page_button)
+        paging_layout.addWidget(self.page_size_combo)
         layout.addWidget(self.reference_label)
-        layout.addWidget(self.save_button)
+        layout.addLayout(paging_layout)
 
         # Add a QTreeView: For Visualization of success rate
         self.tab_widget = QTabWidget()
+        self.tab_widget.setObjectName("taskTabs")
         # Add tabs
         self.pending_tasks_tab = QWidget()
         self.completed_tasks_tab = QWidget()
@@ -236,53 +1089,22 @@ class Performance_Window(QFrame):
         recycled_items_layout = QVBoxLayout()
         analytics_layout = QVBoxLayout()
 
-        # Add widgets to tab layouts
-        # Display pending tasks in the "Pending Tasks" tab
-        pending_tasks_label = QLabel()
-        pending_tasks_text = "\n".join(pending_tasks)  # Convert the list of tasks to a string with line breaks
-        pending_tasks_label.setText(pending_tasks_text)
-        pending_tasks_layout.addWidget(pending_tasks_label)
-
-        completed_tasks_label = QLabel()
-        completed_tasks_text = "\n".join(completed_tasks)  # Convert the list of tasks to a string with line breaks
-        completed_tasks_label.setText(completed_tasks_text)
-        completed_tasks_layout.addWidget(completed_tasks_label)
-
-        recyclebin_label = QLabel()
-        recyclebin_text = "\n".join(recyclebin_tasks)  # Convert the list of tasks to a string with line breaks
-        recyclebin_label.setText(recyclebin_text)
-        recycled_items_layout.addWidget(recyclebin_label)
-
-        # analytics label
-        analytics_label = QLabel('')
-        analytics_layout.addWidget(analytics_label)
-        # Calculate percentages for each component
-        total_tasks = len(pending_tasks) + len(completed_tasks) + len(recyclebin_tasks)
-        pending_percentage = (len(pending_tasks) / total_tasks) * 100
-        completed_percentage = (len(completed_tasks) / total_tasks) * 100
-        recycled_percentage = (len(recyclebin_tasks) / total_tasks) * 100
-
-        # Create bar chart
-        labels = ['Pending', 'Completed', 'Recycled']
-        percentages = [pending_percentage, completed_percentage, recycled_percentage]
-        colors = ['#FCF55F', 'green', '#465362']
-
-        plt.figure(figsize=(4, 3), facecolor='#f2f2f2')  # Set figure size
-        plt.bar(labels, percentages, color=colors)
-        plt.ylabel('Percentage')
-        plt.title('Task Distribution')
-
-        # Convert the Matplotlib figure to a QPixmap
-        buffer = BytesIO()
-        plt.savefig(buffer, format='png')
-        buffer.seek(0)
-        pixmap = QPixmap()
-        pixmap.loadFromData(buffer.getvalue())
-        buffer.close()
+        # Add widgets to tab layouts: each list tab is a lazily fetched view of the store, like the main window's
+        # lists, rather than one label holding every task (which made restyling the window slow)
+        self.pending_tasks_view = pending_tasks_view = task_list_view(self.task_store, "pending")
+        pending_tasks_layout.addWidget(pending_tasks_view)
 
-        # Set the QPixmap to the QLabel
-        analytics_label.setPixmap(pixmap)
-        analytics_label.setScaledContents(True)  # Scale contents to fit the label
+        self.completed_tasks_view = completed_tasks_view = task_list_view(self.task_store, "completed")
+        completed_tasks_layout.addWidget(completed_tasks_view)
+
+        self.recyclebin_view = recyclebin_view = task_list_view(self.task_store, "recycled")
+        recycled_items_layout.addWidget(recyclebin_view)
+
+        # analytics label: shows a placeholder until the chart has been rendered off the GUI thread
+        self.analytics_label = analytics_label = QLabel('Rendering chart...')
+        analytics_label.setAlignment(Qt.AlignCenter)
+        analytics_layout.addWidget(analytics_label)
+        self.request_chart()
 
         # Set layouts for each tab
         self.pending_tasks_tab.setLayout(pending_tasks_layout)
@@ -290,20 +1112,10 @@ class Performance_Window(QFrame):
         self.recycled_items_tab.setLayout(recycled_items_layout)
         self.analytics_tab.setLayout(analytics_layout)
 
-        self.tab_widget.setStyleSheet("""
-            QTabBar::tab:selected {
-                background-color: #468faf; color: #ccc;
-            }
-            QTabBar::tab {
-                background-color: #000; color: #ccc;
-            }
-            QTabBar {color: #fff;}
-
-        """)
-        completed_tasks_label.setStyleSheet("background-color: green;padding:10px;color: #fff;")
-        pending_tasks_label.setStyleSheet('background-color: #FCF55F; color: #000;padding:10px;')
-        recyclebin_label.setStyleSheet('background-color: #465362; color: #fff;padding:10px;')
-        analytics_label.setStyleSheet('background-color: #000; color: #fff;padding:10px;')
+        pending_tasks_view.setProperty("taskTab", "pending")
+        completed_tasks_view.setProperty("taskTab", "completed")
+        recyclebin_view.setProperty("taskTab", "recycled")
+        analytics_label.setProperty("taskTab", "analytics")
 
         layout.addWidget(self.tab_widget)
 
@@ -313,336 +1125,470 @@ class Performance_Window(QFrame):
         # Set the layout for the QFrame
         self.setLayout(layout)
 
-    def on_cell_clicked(self, row, column):
-        reference_text = f"Selected Cell: ({row + 1}, {column + 1})"
+        # keep the table in step with the shared task store (the tab views follow it through their models)
+        self.task_store.tasksChanged.connect(self.on_tasks_changed)
+        self.task_store.performanceDataLoaded.connect(self.on_tasks_changed)
+        self.task_store.performanceDataSaved.connect(self.on_performance_saved)
+        self.task_store.saver.failed.connect(lambda error: self.on_performance_saved())  # the main window reports it
+        theme_manager.themeChanged.connect(self.request_chart)
+
+    def request_chart(self):
+        # The "Task Distribution" chart for the current counts and theme, rendered off the GUI thread unless the
+        # chart cache already has it
+        counts = (len(self.task_store.pending_tasks), len(self.task_store.completed_tasks),
+                  len(self.task_store.recycle_bin_tasks))
+        self.chart_key = key = ChartCache.key(*counts, self.chart_figsize, theme_manager.is_dark)
+        png = chart_cache.get(key)
+        if png is not None:
+            self.show_analytics_chart(png)
+        elif key not in self.chart_tasks:
+            chart_task = self.chart_tasks[key] = ChartRenderTask(*counts, figsize=self.chart_figsize,
+                                                                 dark_mode=theme_manager.is_dark)
+            chart_task.signals.finished.connect(lambda png: self.on_chart_rendered(key, png))
+            chart_task.signals.failed.connect(lambda error: self.on_chart_failed(key, error))
+            QThreadPool.globalInstance().start(chart_task)
+
+    def on_chart_rendered(self, key, png):
+        chart_task = self.chart_tasks.pop(key, None)
+        chart_cache.put(key, png, save=chart_task is None or not chart_task.from_disk)
+        if key == self.chart_key:  # the theme may have changed while it rendered
+            self.show_analytics_chart(png)
+
+    def on_chart_failed(self, key, error):
+        self.chart_tasks.pop(key, None)
+        if key == self.chart_key:
+            self.analytics_label.setText(error)
+
+    def show_analytics_chart(self, png):
+        # Convert the rendered PNG to a QPixmap (pixmaps may only be created on the GUI thread)
+        pixmap = QPixmap()
+        pixmap.loadFromData(png)
+
+        # Set the QPixmap to the QLabel
+        self.analytics_label.setPixmap(pixmap)
+        self.analytics_label.setScaledContents(True)  # Scale contents to fit the label
+
+    def showEvent(self, event):
+        # a reused window catches up with the store and shows the chart for the current counts; the chart cache makes
+        # this free when nothing changed
+        if self.stale:
+            self.stale = False
+            self.refresh_table()
+        self.request_chart()
+        super().showEvent(event)
+
+    def on_tasks_changed(self):
+        if self.isVisible():
+            self.refresh_table()
+        else:
+            self.stale = True  # refreshed once when shown again, not on every change while hidden
+
+    def release_resources(self):
+        # called by the WindowManager while the window is hidden: drops the chart pixmap and, unless they hold unsaved
+        # edits, the table rows; showEvent rebuilds both
+        self.analytics_label.clear()
+        self.analytics_label.setText('Rendering chart...')
+        if not self.table_model.edited:
+            self.table_model.set_rows([], [])
+            self.task_data = []
+            self.stale = True
+
+    def show_page(self, page):
+        self.table_model.set_page(page)
+        self.update_page_controls()
+
+    def change_page_size(self, page_size):
+        self.table_model.set_page_size(int(page_size))
+        self.update_page_controls()
+
+    def update_page_controls(self):
+        page, page_count = self.table_model.page, self.table_model.page_count()
+        self.page_label.setText(f"Page {page + 1} of {page_count}")
+        self.previous_page_button.setEnabled(page > 0)
+        self.next_page_button.setEnabled(page < page_count - 1)
+
+    def on_cell_clicked(self, index):
+        reference_text = f"Selected Cell: ({self.table_model.absolute_row(index.row()) + 1}, {index.column() + 1})"
         self.reference_label.setText(reference_text)
-        if dark_mode_requested:
-            self.reference_label.setStyleSheet('color: white;')
-    def on_cell_pressed(self, row, column):
-        global dark_mode_requested
-        if column == 0 or column == 2 or column == 3:
+    def on_cell_pressed(self, index):
+        if index.column() == 0 or index.column() == 2 or index.column() == 3:
             # Show a popup indicating that the field is not editable
             msg_box = QMessageBox(self)
+            msg_box.setObjectName("readOnlyNotice")
             msg_box.setWindowTitle("Not Editable")
             msg_box.setText("This Field is ReadOnly!")
             msg_box.show()
             timer = QTimer(self)
             timer.singleShot(800, msg_box.close)
-            if dark_mode_requested:
-                msg_box.setStyleSheet('background-color: white;')
 
     def save_changes(self):
-        todo_completed_items = TodoApp().completed_tasks
         self.task_data = []
 
-        for row in range(self.table_widget.rowCount()):
-            task_name_item = self.table_widget.item(row, 0)
-            deadline_item = self.table_widget.cellWidget(row, 1)
-            task_type_combo = self.table_widget.cellWidget(row, 4)
-            task_priority_combo = self.table_widget.cellWidget(row, 5)
-            user_comment_widget = self.table_widget.cellWidget(row, 6)
-            if task_name_item and deadline_item:
-                task_name = task_name_item.text()
-                deadline = deadline_item.date().toString(Qt.ISODate)
-                task_type = task_type_combo.currentText()
-                task_priority = task_priority_combo.currentText()
-                user_comment = user_comment_widget.toPlainText()
-                # Check if the task name is not in the completed column (column 3)
-                if task_name not in todo_completed_items:
-                    # Task not in completed list, add it to task data
-                    self.task_data.append({"task_name": task_name,
-                                           "deadline": deadline,
-                                           "task_type": task_type,
-                                           "task_priority": task_priority,
-                                           "user_comment": user_comment
-                                           })
-
-        with open("user_performance.json", "w") as f:
-            json.dump(self.task_data, f, indent=4)
+        # read the rows straight from the table model; the delegates have already written any edits into it
+        for task_info in self.table_model.task_data:
+            task_name = task_info["task_name"]
+            # Check if the task name is not in the completed column (column 3)
+            if self.task_store.task_state(task_name) != "completed":
+                # Task not in completed list, add it to task data
+                self.task_data.append({"task_name": task_name,
+                                       "deadline": task_info["deadline"],
+                                       "task_type": task_info.get("task_type", "Other"),
+                                       "task_priority": task_info.get("task_priority", "Average"),
+                                       "user_comment": task_info.get("user_comment", "")
+                                       })
+
+        self.save_button.setEnabled(False)  # until the store reports the rows are on disk
+        self.task_store.save_performance_data(self.task_data)
         self.populate_table()
-        for i in range(self.table_widget.rowCount()):
-            item = self.table_widget.item(i, 2)
-            if item:
-                value = int(item.text())
-                if value < 0:
-                    item.setBackground(QColor('red'))
-                elif value == 0:
-                    item.setBackground(QColor('green'))
-                else:
-                    item.setBackground(QColor('yellow'))
-
-    def on_cell_activated(self, row, column, event: QKeyEvent):  # specifying the type of parameter is optional
-        # Get the item at the clicked cell
-        item = self.table_widget.item(row, column)
-        if item is not None:
-            modifiers = QApplication.keyboardModifiers()
-            if event.key() == Qt.Key_Delete:
-                self.table_widget.setItem(row, column, QTableWidgetItem())
-                event.accept()  # it accepts the event to indicate that it has been processed.
-
-    # overiding keypress event to allow for deletion of ALL SELECTED ITEMS in the window
+
+    def on_performance_saved(self):
+        self.save_button.setEnabled(True)
+
+    # overiding keypress event to allow for clearing of ALL SELECTED editable cells in the window
     def keyPressEvent(self, event: QKeyEvent):
         if event.key() == Qt.Key_Delete:
-            selected_items = self.table_widget.selectedItems()
-            for item in selected_items:
-                item.setText("")
+            for index in self.table_view.selectedIndexes():
+                self.table_model.clear_cell(index)
             event.accept()
 
-    def populate_table(self):
-        # Load data from the JSON file
-        with open("user_performance.json", "r") as file:
-            self.task_data = json.load(file)
-
-        # Get pending tasks from todoapp.pending_tasks
-        pending_tasks = TodoApp().pending_tasks
-        completed_tasks = TodoApp().completed_tasks
-
-        # Add pending tasks to JSON file with today's date if they don't exist
+    def refresh_table(self):
+        # follows a store change; unsaved edits are kept: the edited rows are merged with the store instead of being
+        # replaced by the saved data
+        if self.table_model.edited:
+            self.populate_table(self.table_model.task_data)
+        else:
+            self.populate_table()
+
+    @timed()
+    def populate_table(self, task_data=None):
+        # The saved deadlines, types, priorities and comments, unless the rows to start from are given. Until the
+        # saved rows have been read in the background every pending task gets a default row and the table stays
+        # read-only, with saving disabled; the store's performanceDataLoaded then refreshes the table.
+        edited = task_data is not None and self.table_model.edited
+        loading = False
+        if task_data is None:
+            task_data = self.task_store.performance_data()
+            loading = task_data is None
+        self.task_data = task_data or []
+
+        # Get pending tasks from the shared task store
+        pending_tasks = self.task_store.pending_tasks
+        completed_tasks = self.task_store.completed_tasks
+
+        # Keep only the saved rows of tasks that are still pending, then add the new pending tasks with today's date
+        saved_rows = {item["task_name"]: item for item in self.task_data}
+        today = QDate.currentDate().toString(Qt.ISODate)
+        self.task_data = [item for item in self.task_data if self.task_store.task_state(item["task_name"]) == "pending"]
         for task in pending_tasks:
-            if not any(item["task_name"] == task for item in self.task_data):
+            if task not in saved_rows:
                 self.task_data.append({"task_name": task,
-                                       "deadline": QDate.currentDate().toString(Qt.ISODate)
+                                       "deadline": today
                                        })
-        # Iterate over a copy of the task_data list to safely remove items during iteration
-        for item in self.task_data.copy():
-            # If the task name in the item is not in the pending_tasks list
-            if item["task_name"] not in pending_tasks:
-                # Remove the item from the task_data list
-                self.task_data.remove(item)
-        for c_row, c_task_data in enumerate(completed_tasks):
-            c_item = QTableWidgetItem(str(c_task_data))
-            self.table_widget.setItem(c_row, 3, c_item)
-            c_item.setBackground(QColor('green'))
-            c_item.setForeground(QColor('#ccc'))
-        # Populate table with data from JSON file
-        for row, task_info in enumerate(self.task_data):
-            task_name = task_info["task_name"]
-            deadline = task_info["deadline"]
-            task_type = task_info.get("task_type", "Other")  # Get task type or default to "Other"
-            task_priority = task_info.get("task_priority", "Average")  # Get task priority or default to "Average"
-            user_comment = task_info.get("user_comment", "")  # Get user comment or default to empty string
-
-            # Add task name to the table
-            p_item = QTableWidgetItem(task_name)
-            self.table_widget.setItem(row, 0, p_item)
-            p_item.setForeground(QColor('#ccc'))
-            p_item.setBackground(QColor('#000'))
-
-            # Add completion deadline to the table
-            date_edit = QDateEdit()
-            date_edit.setStyleSheet('background-color: #ccc;')
-            deadline_date = QDate.fromString(deadline, Qt.ISODate)
-            date_edit.setDate(deadline_date)
-            date_edit.setCalendarPopup(True)
-            if dark_mode_requested:
-                date_edit.setStyleSheet('background-color: #ccc')
-            date_edit.dateChanged.connect(lambda date, row=row: self.update_days_remaining(date, row))
-            self.table_widget.setCellWidget(row, 1, date_edit)  # Column 1 corresponds to "Completion Deadline"
-            # Set task type and task priority in the respective comboboxes
-            task_type_combo = QComboBox()
-            task_type_combo.setStyleSheet('background-color: #ccc;')
-            task_type_combo.addItems(["Work", "Business", "Leisure", "Programming", "Other"])
-            task_type_combo.setCurrentText(task_type)
-            if dark_mode_requested:
-                task_type_combo.setStyleSheet('background-color: #ccc;')
-            self.table_widget.setCellWidget(row, 4, task_type_combo)
-
-            task_priority_combo = QComboBox()
-            task_priority_combo.addItems(["High", "Medium", "Low", "Average"])
-            task_priority_combo.setCurrentText(task_priority)
-            task_priority_combo.setStyleSheet('background-color: #ccc;')
-            self.table_widget.setCellWidget(row, 5, task_priority_combo)
-
-            # Set user comment in the QTextEdit widget
-            user_comment_widget = QTextEdit()
-            user_comment_widget.setPlainText(user_comment)
-            user_comment_widget.setStyleSheet('background-color: #ccc;')
-            self.table_widget.setCellWidget(row, 6, user_comment_widget)
-            # Calculate days remaining
-            days_remaining = QDate.currentDate().daysTo(deadline_date)
-            # Set the days remaining in the "Days Remaining" column
-            days_remaining_item = QTableWidgetItem(str(days_remaining))
-            self.table_widget.setItem(row, 2, days_remaining_item)  # Column 2 corresponds to "Days Remaining"
-
-        # Set items in the "Pending Tasks" column uneditable
-        delegate = ReadOnlyDelegate()
-        # Columns for which you want to set the delegate
-        columns = [0, 2, 3]  # Replace with the column indices you want
-
-        # Set the delegate for each column
-        for column in columns:
-            self.table_widget.setItemDelegateForColumn(column, delegate)
-    def update_days_remaining(self, date, row):
-        deadline = date
-        days_remaining = QDate.currentDate().daysTo(deadline)
-        days_remaining_item = QTableWidgetItem(str(days_remaining))
-        self.table_widget.setItem(row, 2, days_remaining_item)
-        # Style the background color based on the value of days_remaining)
-        if days_remaining < 0:
-            days_remaining_item.setBackground(QColor("red"))
-        else:
-            days_remaining_item.setBackground(QColor("yellow"))
+        if loading or self.table_model.read_only:  # otherwise the button follows the saves
+            self.save_button.setEnabled(not loading)
+        self.table_model.read_only = loading
+        self.table_model.set_rows(self.task_data, completed_tasks)
+        self.table_model.edited = edited  # the kept edits still need saving
+        self.update_page_controls()
 
     def calculate_success_rate(self):
-        todo_pending_tasks = TodoApp().pending_tasks
-        todo_completed_tasks = TodoApp().completed_tasks
-        # Get the number of pending tasks
-        num_pending_tasks = len(self.todo_pending_tasks)
-
-        # Get the number of completed tasks
-        num_completed_tasks = len(self.todo_completed_tasks)
-
-        # Calculate the success rate
-        if num_pending_tasks == 0:
-            success_rate = 100  # All pending tasks are completed
-        else:
-            success_rate = (num_completed_tasks / num_pending_tasks) * 100
-
-        return success_rate
+        return self.task_store.success_rate()
 
 
 class Recycle_Bin_Window(QWidget):
-    def __init__(self):
+    def __init__(self, task_store):
         super().__init__()
-        self.setStyleSheet("background-color: #000;")
+        self.setObjectName("recycleBinWindow")  # styled by todo_themes
         self.setWindowTitle("Recycle Bin")
         self.resize(280, 400)
         self.setWindowIcon(QIcon("to-do-list recycle bin.ico"))
-        self.recycle_bin_tasks = []
+        self.task_store = task_store
         self.recycle_bin_label = QLabel('RECYCLED ITEMS')
-        self.recycle_bin_listbox = QListWidget()
-        self.recycle_bin_listbox.setSelectionMode(QAbstractItemView.ExtendedSelection)  # see MultipleSelection
+        self.recycle_bin_label.setObjectName("recycleBinLabel")
+        self.recycle_bin_listbox = task_list_view(task_store, "recycled")
+        self.recycle_bin_listbox.setObjectName("recycleBinList")
         self.recycle_bin_listbox.setToolTip('-Use CTRL + Selection to Select Item(s)')
+        self.recycle_bin_search_bar = TaskSearchBar([self.recycle_bin_listbox])
+        self.recycle_bin_search_bar.setObjectName("recycleBinSearch")
         self.restore_button = QPushButton("Restore to Completed Tasks")
+        self.restore_button.setObjectName("restoreButton")
         self.restore_button.clicked.connect(self.restore_tasks)
         self.permanent_deletion_button = QPushButton("Permanently Delete Item")
+        self.permanent_deletion_button.setObjectName("permanentDeletionButton")
         self.permanent_deletion_button.setToolTip('Note, this action is irreversible!')
         self.permanent_deletion_button.clicked.connect(self.permanent_deletion)
         self.recycle_bin_initUI()
-        # stylesheets
-        self.recycle_bin_label.setStyleSheet("""
-            QLabel {
-                background-color: #ffcc00;
-                padding: 5px;
-                color: black;
-                font-weight:bold;
-                justify-content: center;
-            }
-        """)
-        self.recycle_bin_listbox.setStyleSheet("""
-            QListWidget {
-            background-color: #000; padding-left: 3px; padding-top: 1px;
-            color: white; 
-            background-image: url('to-do-list recycle bin background-img.jpg');
-            }
-            QListWidget::item:selected {
-                background-color: black;
-            }
-        """)
-        self.restore_button.setStyleSheet("""
-            QPushButton {
-                background-color: #ccc;
-                border: 2px solid #4CAF50;
-                border-radius: 10px;
-                padding: 5px 10px;
-            }
-            QPushButton:hover {
-                background-color: green;
-                color: white;
-
-            }
-        """)
-        self.permanent_deletion_button.setStyleSheet("""
-            QPushButton {
-                background-color: #ccc;
-                border: 2px solid #4CAF50;
-                border-radius: 10px;
-                padding: 5px 10px;
-            }
-            QPushButton:hover {
-                background-color: #ff0000;
-                color: white;
-
-            }
-        """)
-        self.load_recycle_bin_items()
+
+    @property
+    def recycle_bin_tasks(self):
+        return self.task_store.recycle_bin_tasks
+
     def recycle_bin_initUI(self):
         # Create a QVBoxLayout to hold the widgets
         layout = QVBoxLayout()
 
         layout.addWidget(self.recycle_bin_label)
+        layout.addWidget(self.recycle_bin_search_bar)
         layout.addWidget(self.recycle_bin_listbox)
         layout.addWidget(self.restore_button)
         layout.addWidget(self.permanent_deletion_button)
         self.setLayout(layout)
 
     def load_recycle_bin_items(self):
-        try:
-            with open("PyQt5_tasks_recycle_bin.txt", "r") as file:
-                lines = file.readlines()
-                self.recycle_bin_tasks = []
-                for line in lines:
-                    line = line.strip()
-                    self.recycle_bin_tasks.append(line)
-
-                self.update_recycle_bin_listbox()
-
-        except FileNotFoundError:
-            return 'PyQt5_tasks_recycle_bin.txt is missing'
-
+        return self.task_store.load_recycle_bin_items()
 
     def update_recycle_bin_listbox(self):
-        self.recycle_bin_listbox.clear()
-        for task in self.recycle_bin_tasks:
-            self.recycle_bin_listbox.addItem(task)
-        self.save_recycled_items()
+        self.recycle_bin_listbox.model().reload()
 
     def save_recycled_items(self):
-        with open("PyQt5_tasks_recycle_bin.txt", "w") as file:
-            for task in self.recycle_bin_tasks:
-                file.write(task + "\n")
+        self.task_store.save_recycled_items()
 
     def restore_tasks(self):
-        selected_tasks_indexes = self.recycle_bin_listbox.selectedIndexes()
-        selected_tasks_indexes.sort(reverse=True,
-                                    key=lambda x: x.row())  # Reverse sorting to avoid issues when removing items
-        todo_instance = TodoApp()  # Instantiate the TodoApp
-        for index in selected_tasks_indexes:
-            selected_task_index = index.row()
-            restored_task = self.recycle_bin_tasks.pop(selected_task_index)
-
-            if (restored_task not in todo_instance.completed_tasks) and (
-                    restored_task not in todo_instance.pending_tasks):
-                todo_instance.completed_tasks.append(restored_task)
-            # Save the updated tasks
-            todo_instance.save_tasks()
-            self.update_recycle_bin_listbox()
-
+        rows = selected_rows(self.recycle_bin_listbox)
+        if rows:
+            # the store saves both files and notifies the main window's completed list
+            self.task_store.restore_tasks(rows)
 
     def permanent_deletion(self):
-        selected_items = self.recycle_bin_listbox.selectedItems()
-        for item in selected_items:
-            self.recycle_bin_tasks.remove(item.text())
-            self.recycle_bin_listbox.takeItem(self.recycle_bin_listbox.row(item))
-        self.save_recycled_items()
+        rows = selected_rows(self.recycle_bin_listbox)
+        if rows:
+            self.task_store.purge_recycled_tasks(rows)
+
+class WidgetAllocationCounter(QObject):
+    # Application-wide event filter counting widgets as they are given a parent. It is only installed while
+    # instrumentation is on, since it sees every event of the application.
+    def eventFilter(self, obj, event):
+        if event.type() == QEvent.ChildAdded and event.child().isWidgetType():
+            instrumentation.count("widgets created")
+        return False
+
+
+widget_allocation_counter = WidgetAllocationCounter()
+
+
+def set_instrumentation_enabled(enabled):
+    instrumentation.enable(enabled)
+    app = QApplication.instance()
+    if app is not None:
+        app.removeEventFilter(widget_allocation_counter)
+        if enabled:
+            app.installEventFilter(widget_allocation_counter)
+
+
+def export_chrome_trace(parent):
+    path, _ = QFileDialog.getSaveFileName(parent, "Export Chrome Trace", "todo_trace.json", "Trace JSON (*.json)")
+    if not path:
+        return
+    try:
+        instrumentation.export_chrome_trace(path)
+    except OSError as error:
+        QMessageBox.warning(parent, "Export Chrome Trace", f"The trace could not be written:\n{error}", QMessageBox.Ok)
+
+
+class DiagnosticsPanel(QWidget):
+    # The instrumentation overlay: per-span totals, counters and the latest spans from the ring buffer, refreshed once
+    # a second while the panel is on screen. Opened from the main window's hidden menu (Ctrl+Shift+D).
+    recent_count = 50
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("Diagnostics")
+        self.setObjectName("diagnosticsPanel")
+        self.resize(640, 520)
+        self.enable_button = QPushButton()
+        self.enable_button.setCheckable(True)
+        self.enable_button.toggled.connect(self.toggle_instrumentation)
+        clear_button = QPushButton("Clear")
+        clear_button.clicked.connect(self.clear)
+        export_button = QPushButton("Export Chrome Trace...")
+        export_button.clicked.connect(self.export_trace)
+        buttons_layout = QHBoxLayout()
+        buttons_layout.addWidget(self.enable_button)
+        buttons_layout.addWidget(clear_button)
+        buttons_layout.addWidget(export_button)
+        self.report = QTextEdit()
+        self.report.setReadOnly(True)
+        self.report.setLineWrapMode(QTextEdit.NoWrap)
+        self.report.setFontFamily("monospace")
+        layout = QVBoxLayout(self)
+        layout.addLayout(buttons_layout)
+        layout.addWidget(self.report)
+        self._timer = QTimer(self)
+        self._timer.setInterval(1000)
+        self._timer.timeout.connect(self.refresh)
+
+    def showEvent(self, event):
+        self.refresh()
+        self._timer.start()
+        super().showEvent(event)
+
+    def hideEvent(self, event):
+        self._timer.stop()
+        super().hideEvent(event)
+
+    def toggle_instrumentation(self, enabled):
+        set_instrumentation_enabled(enabled)
+        self.refresh()
+
+    def clear(self):
+        instrumentation.clear()
+        self.refresh()
+
+    def export_trace(self):
+        export_chrome_trace(self)
+
+    def refresh(self):
+        self.enable_button.blockSignals(True)
+        self.enable_button.setChecked(instrumentation.enabled)
+        self.enable_button.blockSignals(False)
+        self.enable_button.setText("Instrumentation: On" if instrumentation.enabled else "Instrumentation: Off")
+        lines = [f"{'span':<48}{'calls':>8}{'total ms':>12}{'max ms':>10}"]
+        lines.extend(f"{name[:47]:<48}{calls:>8}{total:>12.1f}{longest:>10.1f}"
+                     for name, (calls, total, longest) in instrumentation.summary().items())
+        lines.append("")
+        lines.extend(f"{name}: {count}" for name, count in sorted(instrumentation.counters.items()))
+        lines.append("")
+        lines.append(f"latest spans ({len(instrumentation.events)} of {instrumentation.events.maxlen} kept)")
+        recent = list(instrumentation.events)[-self.recent_count:]
+        lines.extend(f"{start / 1000:>12.1f} ms  {duration / 1000:>9.2f} ms  {category:<9}{name}"
+                     for name, category, start, duration, _ in reversed(recent))
+        self.report.setPlainText("\n".join(lines))
+
+
+class WindowManager(QObject):
+    # One live instance of each secondary window, by name: show() builds it with its factory the first time (or after
+    # it was deleted) and just raises it afterwards. A window left hidden for idle_timeout_ms has its
+    # release_resources() called, if it has one, to drop what it rebuilds when shown again. Qt has no memory pressure
+    # signal on desktop platforms, so release_hidden() does the same for every hidden window on demand.
+    idle_timeout_ms = 2 * 60 * 1000
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.windows = {}  # name -> window
+        self._idle_timers = {}  # name -> single-shot QTimer, running while the window is hidden
+
+    def get(self, name):
+        window = self.windows.get(name)
+        return None if window is None or sip.isdeleted(window) else window
+
+    def show(self, name, create):
+        window = self.get(name)
+        if window is None:
+            window = self.windows[name] = create()
+            window.installEventFilter(self)
+            if name not in self._idle_timers:
+                timer = self._idle_timers[name] = QTimer(self)
+                timer.setSingleShot(True)
+                timer.setInterval(self.idle_timeout_ms)
+                timer.timeout.connect(lambda: self.release(name))
+        window.show()
+        window.raise_()
+        window.activateWindow()
+        return window
+
+    def eventFilter(self, obj, event):
+        if event.type() in (QEvent.Show, QEvent.Hide):
+            for name, window in self.windows.items():
+                if window is obj:
+                    timer = self._idle_timers[name]
+                    timer.start() if event.type() == QEvent.Hide else timer.stop()
+        return False
+
+    def release(self, name):
+        window = self.get(name)
+        if window is not None and not window.isVisible() and hasattr(window, "release_resources"):
+            window.release_resources()
+
+    def release_hidden(self):
+        for name in list(self.windows):
+            self.release(name)
+
+    def close_all(self):
+        for name in list(self.windows):
+            window = self.get(name)
+            if window is not None:
+                window.close()
+
+
+class StartupReport(QObject):
+    # Ends the start-up phases that finish inside the event loop: the main window's first paint, then the task load.
+    # With TODO_STARTUP_REPORT=1 the phase timings are printed to stderr once both are done.
+    def __init__(self, window, loader):
+        super().__init__(window)
+        self.window = window
+        self.painted = False
+        self.loaded = window.task_store.loader is not loader  # a small file may be loaded already
+        loader.finished.connect(self.on_loaded)
+        loader.cancelled.connect(self.on_loaded)
+        window.installEventFilter(self)
+
+    def eventFilter(self, obj, event):
+        if obj is self.window and event.type() == QEvent.Paint and not self.painted:
+            self.painted = True
+            startup_profile.mark("first paint")
+            self.window.removeEventFilter(self)
+            if self.loaded:
+                self.finish()
+        return False
+
+    def on_loaded(self):
+        if not self.loaded:
+            self.loaded = True
+            if self.painted:
+                self.finish()
+
+    def finish(self):
+        startup_profile.mark("data load")
+        if os.environ.get("TODO_STARTUP_REPORT", "0") not in ("", "0"):
+            print(f"start-up:\n{startup_profile.report()}", file=sys.stderr)
+
 
-dark_mode_requested = False
 class TodoApp(QWidget):
     # define custom signals if any; i.e class variables
     closed = pyqtSignal()  # closed signal is defined as a class-level attribute
     allTasksCompleted = pyqtSignal()
 
-    def __init__(self):
+    def __init__(self, task_store=None):
         super().__init__()
+        if task_store is None:
+            task_store = TaskStore()
+            task_store.load()
+        self.task_store = task_store
+        self.task_store.saver.failed.connect(self.on_save_failed)
+        # secondary windows are built on first use, then reused
+        self.windows = WindowManager(self)
         self.initUI()
 
+    @property
+    def pending_tasks(self):
+        return self.task_store.pending_tasks
+
+    @property
+    def completed_tasks(self):
+        return self.task_store.completed_tasks
+
+    @property
+    def agl_shifts(self):
+        return self.windows.get("agl_shifts")
+
+    @property
+    def Performance_Window(self):
+        return self.windows.get("performance")
+
+    @property
+    def recycle_bin(self):
+        return self.windows.get("recycle_bin")
+
+    @property
+    def diagnostics_panel(self):
+        return self.windows.get("diagnostics")
+
     def initUI(self):
         # define instance variables
         self.setWindowTitle("To Do List App")
+        self.setObjectName("todoApp")  # styled by todo_themes
         self.setWindowIcon(QIcon("todo_icon.ico"))
         self.resize(900, 700)  # see self.setGeometry(600, 600, 400, 300)
-        self.pending_tasks = []
-        self.completed_tasks = []
 
         # Create layouts
         main_layout = QHBoxLayout(
@@ -653,14 +1599,13 @@ class TodoApp(QWidget):
 
         # Left Frame
         left_label = QLabel("PENDING TASKS")
-        self.pending_tasks_listbox = QListWidget()
-        self.pending_tasks_listbox.setSelectionMode(QAbstractItemView.ExtendedSelection)  # see MultipleSelection
+        self.pending_tasks_listbox = task_list_view(self.task_store, "pending")
         self.pending_tasks_listbox.keyPressEvent = self.pending_tasks_keypress
         self.pending_tasks_listbox.setToolTip('-Use Delete Key or Ctrl + D\non Selection(s) To Delete\nan item(s)' \
                                               '\n-Double click to copy')
         self.pending_tasks_listbox.setContextMenuPolicy(Qt.CustomContextMenu)
         self.pending_tasks_listbox.customContextMenuRequested.connect(self.pendingTasksContextMenu)
-        self.pending_tasks_listbox.itemDoubleClicked.connect(self.pending_task_doubleclickToCopy)
+        self.pending_tasks_listbox.doubleClicked.connect(self.pending_task_doubleclickToCopy)
         self.pending_tasks_listbox.setDragEnabled(True)
         self.pending_tasks_listbox.setAcceptDrops(True)
         self.pending_tasks_listbox.viewport().installEventFilter(self)
@@ -673,9 +1618,9 @@ class TodoApp(QWidget):
         self.task_entry.returnPressed.connect(self.add_tasks)
 
         add_task_button = QPushButton("Add a Task")  # add_task_button.setText('Add a Task')
-        add_task_button.clicked.connect(self.add_tasks)
+        add_task_button.clicked.connect(lambda: self.add_tasks())
         complete_task_button = QPushButton("Mark selected task(s) as completed")
-        complete_task_button.clicked.connect(self.complete_task)
+        complete_task_button.clicked.connect(lambda: self.complete_task())
 
         left_layout.addWidget(left_label)
         left_layout.addWidget(self.pending_tasks_listbox)
@@ -685,18 +1630,17 @@ class TodoApp(QWidget):
 
         # right pane
         right_label = QLabel("COMPLETED TASKS")
-        self.completed_tasks_listbox = QListWidget()
+        self.completed_tasks_listbox = task_list_view(self.task_store, "completed")
         self.completed_tasks_listbox.setToolTip('Use CTRL+Selection\nfor multiple item selection')
-        self.completed_tasks_listbox.setSelectionMode(QAbstractItemView.ExtendedSelection)
         self.completed_tasks_listbox.setDragEnabled(True)
         self.completed_tasks_listbox.setAcceptDrops(True)  # Enable dropping here
         self.completed_tasks_listbox.viewport().installEventFilter(self)
 
         clear_completed_task_button = QPushButton("Clear all completed tasks")
         clear_completed_task_button.setToolTip('Clear all tasks')
-        clear_completed_task_button.clicked.connect(self.clear_completed_tasks)
+        clear_completed_task_button.clicked.connect(lambda: self.clear_completed_tasks())
         clear_a_completed_task_button = QPushButton("Clear selected completed task(s)")
-        clear_a_completed_task_button.clicked.connect(self.clear_a_completed_task)
+        clear_a_completed_task_button.clicked.connect(lambda: self.clear_a_completed_task())
 
         right_layout.addWidget(right_label)
         right_layout.addWidget(self.completed_tasks_listbox)
@@ -706,272 +1650,134 @@ class TodoApp(QWidget):
         # progress pane
         # Create mode selection with combo box
         self.agl_shifts_button = QPushButton('AGL Shifts')
-        self.agl_shifts_button.setStyleSheet("""
-            QPushButton {background-color: #29343d; color: #ccc;}
-            QPushButton::hover {background-color: green;}
-        """)
-        self.agl_shifts_button.clicked.connect(self.agl_shiftScheduler)
+        self.agl_shifts_button.setObjectName("aglShiftsButton")
+        self.agl_shifts_button.clicked.connect(lambda: self.agl_shiftScheduler())
         self.mode_combo = QComboBox()  # Create a combo box for selecting mode
         self.mode_combo.addItems(["Dark Mode", "Light Mode"])  # Add mode options
-        self.mode_combo.setStyleSheet('background-color: #f2f2f2;')
-        self.mode_combo.setCurrentIndex(1)
+        self.mode_combo.setObjectName("modeCombo")
+        self.mode_combo.setCurrentIndex(0 if theme_manager.is_dark else 1)
         self.mode_combo.currentIndexChanged.connect(self.change_mode)  # Connect signal to mode change method
         self.refresh_button = QPushButton('Refresh')
-        self.refresh_button.clicked.connect(self.refresh)
+        self.refresh_button.setObjectName("refreshButton")
+        self.refresh_button.clicked.connect(lambda: self.refresh())
         self.refresh_button.setIcon(QIcon('todo_refresh.ico'))
         self.current_time_button = QPushButton()
-        self.current_time_button.setStyleSheet("text-align: left; background-color: #f2f2f2;")
-        # Create a QTimer to update the current time button every second
-        self.timer = QTimer(self)
-        self.timer.timeout.connect(self.update_time_button)
-        self.timer.start(1000)  # Update every 1000 milliseconds (1 second)
-        # Variable to keep track of elapsed time in seconds
-        self.elapsed_time_seconds = 0
-        self.update_time_button()
+        self.current_time_button.setObjectName("currentTimeButton")
+        # the shared clock updates the button once a second while this window is on screen
+        clock_service.attach(self, self.update_time_button)
         self.performance_button = QPushButton('Your Performance')
-        self.performance_button.clicked.connect(self.progress_window)
+        self.performance_button.setObjectName("performanceButton")
+        self.performance_button.clicked.connect(lambda: self.progress_window())
         self.recycle_bin_button = QPushButton('Recycle Bin')
-        self.recycle_bin_button.clicked.connect(self.open_recycle_bin_window)
-        self.refresh_button.setStyleSheet("""
-            QPushButton {
-                background-color: black;
-                color: white;
-                letter-spacing: 1px; font-family: Georgia, san-serif; padding: 5px 1px; margin: 0; border-color: white;
-            }
-            QPushButton:hover {
-                background-color: black; cursor: pointer;
-                color: green;
-            }
-        """)
-        self.performance_button.setStyleSheet("""
-            QPushButton {
-                background-color: black;
-                color: white;
-            }
-            QPushButton:hover {
-                background-color: green;
-            }
-        """)
-        self.recycle_bin_button.setStyleSheet("""
-            QPushButton {
-                background-color: #4d4dff;
-                color: white;
-            }
-            QPushButton:hover {
-                background-color: green;
-                color: white;
-                
-            }
-        """)
+        self.recycle_bin_button.setObjectName("recycleBinButton")
+        self.recycle_bin_button.clicked.connect(lambda: self.open_recycle_bin_window())
+        # shown while TaskStore.load_incrementally() streams a large task history in
+        self.load_progress_bar = QProgressBar()
+        self.load_progress_bar.setFormat("Loading tasks... %v")
+        self.load_progress_bar.hide()
+        self.stop_loading_button = QPushButton('Stop Loading')
+        self.stop_loading_button.hide()
         performance_layout.addWidget(self.agl_shifts_button)
         performance_layout.addWidget(self.mode_combo)
         performance_layout.addWidget(self.refresh_button)
         performance_layout.addWidget(self.current_time_button)
         performance_layout.addWidget(self.performance_button)
         performance_layout.addWidget(self.recycle_bin_button)
-
-        # Add layouts to main layout
-        main_layout.addLayout(left_layout)
-        main_layout.addLayout(right_layout)
+        performance_layout.addWidget(self.load_progress_bar)
+        performance_layout.addWidget(self.stop_loading_button)
+
+        # Add layouts to main layout; the search bar sits above, and filters, both task lists
+        self.search_bar = TaskSearchBar([self.pending_tasks_listbox, self.completed_tasks_listbox])
+        task_lists_layout = QHBoxLayout()
+        task_lists_layout.addLayout(left_layout)
+        task_lists_layout.addLayout(right_layout)
+        search_layout = QVBoxLayout()
+        search_layout.addWidget(self.search_bar)
+        search_layout.addLayout(task_lists_layout)
+        main_layout.addLayout(search_layout)
         main_layout.addLayout(performance_layout)
 
-        # Set background colors
-        self.setStyleSheet("""
-            QWidget {
-                background-color: #05161a;
-            }
-            QLabel {
-                background-color: #ffcc00; padding: 5px; color: black; font-weight:bold; font-family: Arial,sans-serif;
-            }
-            /*For multiple element style use e.g QListWidget, QLineEdit */
-            QListWidget {
-                background-color: #e4e7eb;
-            }
-            QLineEdit {
-                background-color: white;
-                color: black;
-                font-weight: bold;
-            }
-            QPushButton {
-                background-color: #98FB98;
-                border: 1px solid #4CAF50;
-                border-radius: 10px;
-                padding: 5px 10px;
-            }
-            QPushButton:hover {
-                background-color: yellow;
-            }
-            QPushButton:pressed {
-                background-color: #FF0000;
-            }
-            QToolTip {
-                border: 2px solid black; /* Border color and width */
-                border-radius: 7px; /* Border radius to make it circular */
-                background-color: grey; /* Background color */
-                color: yellow; /* Text color */
-                padding: 8px; /* Padding inside the tooltip */
-                overflow: hidden;
-            }
-            QMenu {
-                background-color: None;
-            }
-            QMessageBox {
-                background-color: #000; 
-            }
-            QMessageBox QPushButton {
-                background-color: #000;
-                color: white;
-            }
-            QMessageBox QPushButton:hover {
-                background-color: #00ff00;
-                color: white;
-            }
-            QMessageBox QLabel {
-                background-color: #000;
-                color: white;
-            }
-        """)
-
-        self.load_tasks()
+        # colours come from the application stylesheet of the current theme, see todo_themes
+        theme_manager.apply()
 
         # Connect the allTasksCompleted signal to the congrats_slot
         self.allTasksCompleted.connect(self.congrats_slot)
+
+        # hidden diagnostics menu: timing instrumentation, its panel and the trace export
+        self.diagnostics_shortcut = QShortcut(QKeySequence("Ctrl+Shift+D"), self)
+        self.diagnostics_shortcut.activated.connect(self.show_diagnostics_menu)
+        if instrumentation.enabled:  # switched on by TODO_INSTRUMENT
+            set_instrumentation_enabled(True)
+
+    def show_diagnostics_menu(self):
+        menu = QMenu(self)
+        enable_action = menu.addAction("Enable Instrumentation")
+        enable_action.setCheckable(True)
+        enable_action.setChecked(instrumentation.enabled)
+        show_action = menu.addAction("Show Diagnostics")
+        export_action = menu.addAction("Export Chrome Trace...")
+        release_action = menu.addAction("Release Hidden Windows")
+        action = menu.exec_(QCursor.pos())
+        if action == enable_action:
+            set_instrumentation_enabled(enable_action.isChecked())
+        elif action == show_action:
+            self.show_diagnostics()
+        elif action == export_action:
+            export_chrome_trace(self)
+        elif action == release_action:
+            self.windows.release_hidden()
+
+    def show_diagnostics(self):
+        self.windows.show("diagnostics", DiagnosticsPanel)
+    @timed(category="slot")
     def agl_shiftScheduler(self):
-        self.agl_shifts = ShiftScheduleApp()
-        self.agl_shifts.show()
+        self.windows.show("agl_shifts", ShiftScheduleApp)
+    @timed(category="slot")
     def change_mode(self, index):  # for mode selection
-        global dark_mode_requested
         if index == 0:
-            dark_mode_requested = True
             self.set_dark_mode()  # Dark mode
         else:
-            dark_mode_requested = False
             self.set_light_mode()  # Light mode
 
     def set_dark_mode(self):
-        self.setStyleSheet("""
-            QWidget {
-                background-color: #021024;
-            }
-            QLabel {
-                background-color: #5483b3;padding: 5px;
-                color: white;
-            }
-            /*For multiple element style use e.g QListWidget, QLineEdit */
-            QListWidget {
-                background-color: #29343d; color: #ccc;
-            }
-            QListWidget::item:selected {
-                background-color: #0f969c; color: #c1e8ff;
-            }
-            QLineEdit {
-                background-color: #c1ebff;
-            }
-            QPushButton {
-                background-color: #5483b3;
-                border: 1px solid #4CAF50;
-                border-radius: 10px;
-                padding: 5px 10px;
-            }
-            QPushButton:hover {
-                background-color: green; color: white;
-            }
-            QPushButton:pressed {
-                background-color: #FF0000;
-            }
-            QComboBox {
-                background-color: #c1ebff;
-                color: white;
-            }
-            QMenu {background-color: #29343d; color: #ccc;}
-        """)
-        self.current_time_button.setStyleSheet("""
-            QPushButton:hover {
-                    background-color: #021024; border-color: #021024; color: #021024;
-            }
-            QPushButton {
-                    background-color: #021024; border-color: #021024; color: yellow;
-            }
-        """)
+        theme_manager.apply("dark")
+
     def set_light_mode(self):
-        self.setStyleSheet("""
-            QWidget {
-                background-color: #05161a;
-            }
-            QLabel {
-                background-color: #ffcc00;
-                padding: 5px;
-                color: black;
-                font-weight:bold;
-            }
-            /*For multiple element style use e.g QListWidget, QLineEdit */
-            QListWidget {
-                background-color: #e4e7eb;
-            }
-            QLineEdit {
-                background-color: white;
-                color: black;
-                font-weight: bold;
-            }
-            QPushButton {
-                background-color: #98FB98;
-                border: 1px solid #4CAF50;
-                border-radius: 10px;
-                padding: 5px 10px;
-            }
-            QPushButton:hover {
-                background-color: yellow;
-            }
-            QPushButton:pressed {
-                background-color: #FF0000;
-            }
-            QToolTip {
-                border: 2px solid black; /* Border color and width */
-                border-radius: 7px; /* Border radius to make it circular */
-                background-color: grey; /* Background color */
-                color: yellow; /* Text color */
-                padding: 8px; /* Padding inside the tooltip */
-                overflow: hidden;
-            }
-            QMessageBox {
-                background-color: #000; 
-            }
-            QMessageBox QPushButton {
-                background-color: #000;
-                color: white;
-            }
-            QMessageBox QPushButton:hover {
-                background-color: #00ff00;
-                color: white;
-            }
-            QMessageBox QLabel {
-                background-color: #000;
-                color: white;
-            }
-            QMenu {background-color: #e4e7eb; color: #000;}
-        """)
+        theme_manager.apply("light")
+
+    @timed(category="slot")
     def refresh(self):
         self.load_tasks()
 
-    def update_time_button(self):
-        # Get the current time
-        current_datetime = QDateTime.currentDateTime().time()
-
-        # Calculate the new time by adding the elapsed time
-        new_time = current_datetime.addSecs(self.elapsed_time_seconds)
-
-        # Format the new time as a string
-        new_time_str = new_time.toString("hh:mm:ss")
-
-        # Update the text of the current time button with the new time
-        self.current_time_button.setText(f"Live Time: {new_time_str}")
+    def watch_loading(self, loader):
+        if self.task_store.loader is not loader:
+            return  # already finished
+        self.load_progress_bar.setRange(0, loader.total)  # (0, 0) is a busy indicator when the total is unknown
+        self.load_progress_bar.setValue(loader.loaded)
+        self.load_progress_bar.show()
+        self.stop_loading_button.show()
+        loader.progress.connect(self.update_load_progress)
+        loader.finished.connect(self.hide_load_progress)
+        loader.cancelled.connect(self.hide_load_progress)
+        self.stop_loading_button.clicked.connect(loader.cancel)
+
+    def update_load_progress(self, loaded, total):
+        self.load_progress_bar.setValue(min(loaded, total) if total else loaded)
+
+    def hide_load_progress(self):
+        self.load_progress_bar.hide()
+        self.stop_loading_button.hide()
+        try:
+            self.stop_loading_button.clicked.disconnect()
+        except TypeError:
+            pass  # nothing connected
 
-        # Increment elapsed time in seconds
-        self.elapsed_time_seconds += 0
+    def update_time_button(self, time_text):
+        self.current_time_button.setText(f"Live Time: {time_text}")
 
-    def pending_task_doubleclickToCopy(self, item):
+    def pending_task_doubleclickToCopy(self, index):
         clipboard = QApplication.clipboard()
-        clipboard.setText(item.text())
+        clipboard.setText(index.data())
     def pendingTasksContextMenu(self, pos):
         context_menu = QMenu(self)
         # sub menu
@@ -998,21 +1804,17 @@ class TodoApp(QWidget):
             self.pendingTasksContextMenu_Copy()
 
     def pendingTasksContextMenu_DeleteTask(self):
-        selected_items = self.pending_tasks_listbox.selectedItems()
-        for item in selected_items:
-            # remove selected item's text from the self.pending_tasks list
-            self.pending_tasks.remove(item.text())
-        # remove the item itself from the self.pending_tasks_listbox
-        self.update_pending_tasks_listbox()
-        self.save_tasks()
+        # remove selected items' text from the pending tasks; the store refreshes the listbox
+        self.task_store.delete_pending_tasks(selected_rows(self.pending_tasks_listbox))
 
     def pendingTasksContextMenu_SelectAll(self):
+        self.pending_tasks_listbox.model().fetch_all()  # select every task, not just the pages fetched so far
         self.pending_tasks_listbox.selectAll()
 
     def pendingTasksContextMenu_Copy(self):
-        selected_items = self.pending_tasks_listbox.selectedItems()
+        selected_items = self.pending_tasks_listbox.selectedIndexes()
         if selected_items:
-            clipboard_text = "\n".join(item.text() for item in selected_items)
+            clipboard_text = "\n".join(index.data() for index in selected_items)
             QApplication.clipboard().setText(clipboard_text)
     def pending_tasks_keypress(self, event):
         modifiers = QApplication.keyboardModifiers()
@@ -1024,15 +1826,12 @@ class TodoApp(QWidget):
             self.pendingTasksContextMenu_DeleteTask()
         elif event.key() == Qt.Key_A and modifiers == Qt.ControlModifier:
             # Ctrl + A pressed, select all items
-            self.pending_tasks_listbox.selectAll()
+            self.pendingTasksContextMenu_SelectAll()
         elif event.key() == Qt.Key_C and modifiers == Qt.ControlModifier:
-            selected_items = self.pending_tasks_listbox.selectedItems()
-            if selected_items:
-                clipboard_text = "\n".join(item.text() for item in selected_items)
-                QApplication.clipboard().setText(clipboard_text)
+            self.pendingTasksContextMenu_Copy()
         else:
-            # Pass other key events to the default implementation
-            super().keyPressEvent(event)
+            # Pass other key events to the list view's default implementation
+            QListView.keyPressEvent(self.pending_tasks_listbox, event)
 
     def context_menu_submenu_changeTextColor(self):
         color = QColorDialog.getColor()
@@ -1044,16 +1843,15 @@ class TodoApp(QWidget):
         if color.isValid():
             self.pending_tasks_listbox.setStyleSheet(f"background-color: {color.name()}")
 
+    @timed(category="slot")
     def add_tasks(self):
-        task = self.task_entry.text().upper()
+        task = self.task_entry.text()  # the store trims it and puts it in capitals
         if task:
-            if task in self.completed_tasks:
+            if self.task_store.task_state(task) == "completed":
                 # create a custom message box; note, you must execute it using msg_box.exec_()
-                msg_box = QMessageBox()
+                msg_box = QMessageBox(self)  # parented, so the theme's message box colours apply
                 msg_box.setIcon(QMessageBox.Warning)
                 msg_box.setText("You already completed this task!")
-                if dark_mode_requested:
-                    msg_box.setStyleSheet('background-color: #000')
                 msg_box.setWindowTitle("Completed Task")
                 msg_box.setStandardButtons(QMessageBox.Ok)
                 disclaimer_text = (
@@ -1063,9 +1861,9 @@ class TodoApp(QWidget):
                 )
                 msg_box.setDetailedText(disclaimer_text)
                 msg_box.exec_()  # show() displays the widget non-modally; control returns to the caller immediately
-            elif task in self.pending_tasks:
+            elif self.task_store.task_state(task) == "pending":
                 # create a custom message box; note, you must execute it using msg_box.exec_()
-                msg_box = QMessageBox()
+                msg_box = QMessageBox(self)
                 msg_box.setIcon(QMessageBox.Warning)
                 msg_box.setText("Task already exists in the pending tasks list.")
                 msg_box.setWindowTitle("Duplicate Task")
@@ -1079,10 +1877,8 @@ class TodoApp(QWidget):
                 msg_box.setDetailedText(disclaimer_text)
                 msg_box.exec_()  # show() displays the widget non-modally; control returns to the caller immediately
             else:
-                self.pending_tasks.append(task)
-                self.update_pending_tasks_listbox()
+                self.task_store.add_pending_task(task)
                 self.task_entry.clear()
-                self.save_tasks()
 
     def eventFilter(self, obj, event):
         #  The viewport is the area where the items of the list are displayed.
@@ -1101,18 +1897,7 @@ class TodoApp(QWidget):
             mime_data = event.mimeData()
             items = mime_data.text().split('\n')
             if items:
-                selected_tasks_to_clear = self.completed_tasks_listbox.selectedIndexes()
-                selected_tasks_to_clear.sort(reverse=True,
-                                             key=lambda
-                                                 x: x.row())  # Reverse sorting to avoid issues when removing items
-                for index in selected_tasks_to_clear:
-                    selected_task_index = index.row()
-                    cleared_task = self.completed_tasks.pop(selected_task_index)
-                    self.pending_tasks.append(cleared_task)
-                    self.pending_tasks_listbox.addItem(cleared_task)
-
-                self.update_completed_tasks_listbox()
-                self.save_tasks()
+                self.task_store.uncomplete_tasks(selected_rows(self.completed_tasks_listbox))
                 return True  # Return True to indicate that the event was handled
 
         return super().eventFilter(obj, event)
@@ -1120,31 +1905,22 @@ class TodoApp(QWidget):
     def completed_tasks_keypress(self, event):
         modifiers = QApplication.keyboardModifiers()
         if event.key() == Qt.Key_C and modifiers == Qt.ControlModifier:
-            selected_items = self.completed_tasks_listbox.selectedItems()
+            selected_items = self.completed_tasks_listbox.selectedIndexes()
             if selected_items:
-                clipboard_text = "\n".join(item.text() for item in selected_items)
+                clipboard_text = "\n".join(index.data() for index in selected_items)
                 QApplication.clipboard().setText(clipboard_text)
         else:
             # Pass other key events to the default implementation
             super().keyPressEvent(event)
 
+    @timed(category="slot")
     def complete_task(self):
-        selected_tasks_indexes = self.pending_tasks_listbox.selectedIndexes()
-        selected_tasks_indexes.sort(reverse=True,
-                                    key=lambda x: x.row())  # Reverse sorting to avoid issues when removing items
-        if selected_tasks_indexes:
-            for index in selected_tasks_indexes:
-                selected_task_index = index.row()
-                completed_task = self.pending_tasks.pop(selected_task_index)
-                if completed_task not in self.completed_tasks:
-                    self.completed_tasks.append(completed_task)
+        selected_tasks_rows = selected_rows(self.pending_tasks_listbox)
+        if selected_tasks_rows:
+            self.task_store.complete_tasks(selected_tasks_rows)
         else:
             QMessageBox.information(self, "No Selection", "You have not selected item", QMessageBox.Ok)
 
-        self.update_pending_tasks_listbox()
-        self.update_completed_tasks_listbox()
-        self.save_tasks()
-
         # Check if all tasks are completed
         if not self.pending_tasks:
             self.allTasksCompleted.emit()
@@ -1152,110 +1928,66 @@ class TodoApp(QWidget):
     def congrats_slot(self):
         # This slot will be called when all tasks are completed
         QMessageBox.information(self, "Congratulations!", "You've completed all tasks! 🎉", QMessageBox.Ok)
+    @timed(category="slot")
     def clear_a_completed_task(self):
-        selected_tasks_to_clear = self.completed_tasks_listbox.selectedIndexes()
-        selected_tasks_to_clear.sort(reverse=True,
-                                     key=lambda x: x.row())  # Reverse sorting to avoid issues when removing items
+        selected_tasks_to_clear = selected_rows(self.completed_tasks_listbox)
         if selected_tasks_to_clear:
-            for index in selected_tasks_to_clear:
-                selected_task_index = index.row()
-                cleared_task = self.completed_tasks.pop(selected_task_index)
-                # Create an instance of Recycle_Bin_Window if not already created
-                self.recycle_bin = Recycle_Bin_Window()
-                # Append the cleared task to the recycle_bin_tasks list
-                self.recycle_bin.recycle_bin_tasks.append(cleared_task)
+            # Move the cleared tasks to the recycle bin; the store notifies any open Recycle_Bin_Window
+            self.task_store.recycle_completed_tasks(selected_tasks_to_clear)
         else:
             QMessageBox.information(self, "No Selection", "No item selected!", QMessageBox.Ok)
-            return
-
-        # Update recycle bin listbox before saving recycled items
-        self.recycle_bin.save_recycled_items()
-        self.recycle_bin.update_recycle_bin_listbox()
-
-        self.update_completed_tasks_listbox()
-        self.save_tasks()
 
+    @timed(category="slot")
     def clear_completed_tasks(self):
-        # implement logic to populate recycle bin listbox
-        all_items = [self.completed_tasks_listbox.item(index).text() for index in range(self.completed_tasks_listbox.count())]
-        self.recycle_bin = Recycle_Bin_Window()
-        # Append the cleared task to the recycle_bin_tasks list
-        if all_items:
-            self.recycle_bin.recycle_bin_tasks.extend(all_items)
+        if self.completed_tasks:
+            self.task_store.recycle_all_completed_tasks()
         else:
             QMessageBox.information(self, "No Selection", "You have no items!", QMessageBox.Ok)
-        self.recycle_bin.save_recycled_items()
-
-        self.completed_tasks = []
-        self.update_completed_tasks_listbox()
-        self.save_tasks()
 
     def update_pending_tasks_listbox(self):
-        self.pending_tasks_listbox.clear()
-        for task in self.pending_tasks:
-            self.pending_tasks_listbox.addItem(task)
+        self.pending_tasks_listbox.model().reload()
 
     def update_completed_tasks_listbox(self):
-        self.completed_tasks_listbox.clear()
-        for task in self.completed_tasks:
-            self.completed_tasks_listbox.addItem(task)
+        self.completed_tasks_listbox.model().reload()
 
+    @timed(category="slot")
     def progress_window(self):
-        self.Performance_Window = Performance_Window()
-        self.Performance_Window.show()
+        self.windows.show("performance", lambda: Performance_Window(self.task_store))
 
+    @timed(category="slot")
     def open_recycle_bin_window(self):
-        self.recycle_bin = Recycle_Bin_Window()
-        self.recycle_bin.show()
+        self.windows.show("recycle_bin", lambda: Recycle_Bin_Window(self.task_store))
 
     def closeEvent(self, event):
         # Override the closeEvent method to emit the closed signal when the window is closed
         # allow other windows or components of the application to perform necessary cleanup or actions when the
         # main window is closed.
+        self.task_store.flush()
+        self.windows.close_all()
+        # charts still rendering emit through their window's ChartRenderTask, which must outlive the render
+        QThreadPool.globalInstance().waitForDone()
         self.closed.emit()
         event.accept()
 
     def load_tasks(self):
-        try:
-            with open("PyQt5_tasks.txt", "r") as file:
-                lines = file.readlines()
-                self.pending_tasks = []
-                self.completed_tasks = []
-
-                pending_section = True
-                for line in lines:
-                    line = line.strip()
-                    if line == "Completed Tasks:":
-                        pending_section = False
-                    elif pending_section and line != "Pending Tasks:":
-                        self.pending_tasks.append(line)
-                    elif not pending_section:
-                        self.completed_tasks.append(line)
-
-                self.update_pending_tasks_listbox()
-                self.update_completed_tasks_listbox()
-
-        except FileNotFoundError:
-            return 'PyQt5_tasks.txt is missing'
+        # re-reads the task storage into the shared store; the listboxes rebuild from its tasksReloaded signal
+        return self.task_store.load_tasks()
 
     def save_tasks(self):
-        with open("PyQt5_tasks.txt", "w") as file:
-            file.write("Pending Tasks:\n")
-            for task in self.pending_tasks:
-                file.write(task + "\n")
+        self.task_store.save_tasks()
 
-            file.write("Completed Tasks:\n")
-            for task in self.completed_tasks:
-                file.write(task + "\n")
+    def on_save_failed(self, error):
+        QMessageBox.warning(self, "Save Failed", f"Your tasks could not be saved:\n{error}", QMessageBox.Ok)
 
 
 if __name__ == '__main__':
     app = QApplication(sys.argv)
-    todo_app = TodoApp()
+    task_store = TaskStore()
+    todo_app = TodoApp(task_store)  # closing it also closes the secondary windows in todo_app.windows
+    startup_profile.mark("UI build")
+    loader = task_store.load_incrementally()
+    todo_app.watch_loading(loader)
+    startup_report = StartupReport(todo_app, loader)
     todo_app.show()
-    # Connect the closed signal of TodoApp to close the PerformanceWindow
-    todo_app.closed.connect(Performance_Window.close)
-    # Connect the closed signal of TodoApp to close the Recycle_Bin_Window
-    todo_app.closed.connect(Recycle_Bin_Window.close)
-    todo_app.closed.connect(ShiftScheduleApp.close)
+    app.aboutToQuit.connect(task_store.close)
     sys.exit(app.exec_())
@@ -0,0 +1,32 @@
+# Times a 10-year roster for 50 crews exported to .ics and CSV; the budget is one second per file.
+#   python benchmarks/bench_roster_export.py
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from shift_schedule import PATTERNS, RotationPattern, export_roster  # noqa: E402
+
+BUDGET_SECONDS = 1.0
+
+
+def main():
+    base = PATTERNS["2-2-2"]
+    crews = [f"C{crew_index:02d}" for crew_index in range(50)]
+    pattern = RotationPattern("2-2-2", base.cycle, crews, base.anchor,
+                              [(crew_index * 2) % len(base.cycle) for crew_index in range(len(crews))])
+    over_budget = False
+    with tempfile.TemporaryDirectory() as directory:
+        for extension in ("ics", "csv"):
+            path = os.path.join(directory, f"roster.{extension}")
+            started = time.perf_counter()
+            export_roster(path, pattern, "2025-01-01", "2034-12-31")
+            elapsed = time.perf_counter() - started
+            over_budget |= elapsed > BUDGET_SECONDS
+            print(f"{extension}: {elapsed:.3f} s, {os.path.getsize(path) / 1e6:.1f} MB")
+    return 1 if over_budget else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,321 @@
+# Times the task-list operations and window construction of "To-Do App.py" with Qt offscreen, on synthetic task files
+# of 1k, 10k and 100k tasks, and reports tracemalloc's peak for each. A run can be saved as the baseline JSON and later
+# runs compared against it.
+#   python benchmarks/bench_tasks.py                          # everything, both storages, 1k/10k/100k tasks
+#   python benchmarks/bench_tasks.py --sizes 1000 10000 --only load_tasks complete_task
+#   python benchmarks/bench_tasks.py --save-baseline          # writes benchmarks/baseline.json
+#   python benchmarks/bench_tasks.py --compare                # exits 1 if a benchmark got slower than the baseline
+import argparse
+import datetime
+import importlib.util
+import json
+import os
+import platform
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+BENCHMARK_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_DIR = os.path.dirname(BENCHMARK_DIR)
+sys.path.insert(0, REPO_DIR)
+from PyQt5.QtCore import QDate, QItemSelection, QItemSelectionModel, QThreadPool, PYQT_VERSION_STR  # noqa: E402
+from PyQt5.QtWidgets import QApplication, QMessageBox  # noqa: E402
+from todo_engine import TEXT_ENCODING, SQLiteTaskBackend, TextFileTaskBackend  # noqa: E402
+
+DEFAULT_BASELINE = os.path.join(BENCHMARK_DIR, "baseline.json")
+SIZES = (1000, 10000, 100000)
+STORAGES = {"sqlite": SQLiteTaskBackend, "text": TextFileTaskBackend}
+WORDS = ["REVIEW", "REPORT", "CALL", "EMAIL", "FIX", "BUG", "DEPLOY", "WRITE", "DOCS", "MEETING", "PLAN", "BUDGET"]
+
+
+def load_app_module():
+    # "To-Do App.py" is a script with a space in its name, so it is loaded from its path
+    spec = importlib.util.spec_from_file_location("todo_app", os.path.join(REPO_DIR, "To-Do App.py"))
+    module = importlib.util.module_from_spec(spec)
+    sys.modules["todo_app"] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+def task_name(number):
+    return f"TASK {number:06d} {WORDS[number % len(WORDS)]} {WORDS[number // len(WORDS) % len(WORDS)]}"
+
+
+def write_task_files(directory, size):
+    # the legacy text files every backend imports: 70% pending, 20% completed and 10% in the recycle bin
+    pending_count, completed_count = size * 7 // 10, size * 2 // 10
+    names = [task_name(number) for number in range(size)]
+    with open(os.path.join(directory, TextFileTaskBackend.tasks_file), "w", encoding=TEXT_ENCODING) as file:
+        file.write(TextFileTaskBackend.tasks_file_text(names[:pending_count],
+                                                       names[pending_count:pending_count + completed_count]))
+    with open(os.path.join(directory, TextFileTaskBackend.recycle_bin_file), "w", encoding=TEXT_ENCODING) as file:
+        file.write(TextFileTaskBackend.recycle_bin_file_text(names[pending_count + completed_count:]))
+
+
+class Fixtures:
+    # One prepared directory per (storage, size), copied for every run so each run starts from the same files
+    def __init__(self, todo):
+        self.todo = todo
+        self.root = tempfile.mkdtemp(prefix="todo-bench-")
+        self.prepared = set()
+
+    def directory(self, storage, size):
+        path = os.path.join(self.root, f"{storage}-{size}")
+        if (storage, size) not in self.prepared:
+            os.makedirs(path)
+            write_task_files(path, size)
+            with working_directory(path):
+                store = self.todo.TaskStore(backend=STORAGES[storage]())
+                store.load()  # SQLite imports the text files here, once
+                store.close()
+            self.prepared.add((storage, size))
+        return path
+
+    def fresh_copy(self, storage, size):
+        path = tempfile.mkdtemp(dir=self.root)
+        shutil.copytree(self.directory(storage, size), path, dirs_exist_ok=True)
+        return path
+
+    def remove(self):
+        shutil.rmtree(self.root, ignore_errors=True)
+
+
+class working_directory:
+    def __init__(self, path):
+        self.path = path
+
+    def __enter__(self):
+        self.previous = os.getcwd()
+        os.chdir(self.path)
+
+    def __exit__(self, *exc_info):
+        os.chdir(self.previous)
+
+
+# Benchmarks are generators: the code before the yield is setup, the yielded callable is what gets timed and the code
+# after it cleans up. Each one runs in a fresh copy of the synthetic task files.
+def loaded_store(todo, storage):
+    store = todo.TaskStore(backend=STORAGES[storage]())
+    store.load()
+    return store
+
+
+def close_windows(app, *windows):
+    for window in windows:
+        window.close()
+        window.deleteLater()
+    QThreadPool.globalInstance().waitForDone()  # chart renders still running
+    app.processEvents()
+
+
+def select_rows(view, first, last):
+    model = view.model()
+    model.fetch_all()
+    view.selectionModel().select(QItemSelection(model.index(first), model.index(last)), QItemSelectionModel.Select)
+
+
+def bench_todoapp_init(todo, app, storage, size):
+    store = loaded_store(todo, storage)
+    windows = []
+    yield lambda: windows.append(todo.TodoApp(store))
+    close_windows(app, *windows)
+    store.close()
+
+
+def bench_load_tasks(todo, app, storage, size):
+    store = todo.TaskStore(backend=STORAGES[storage]())
+    yield store.load
+    store.close()
+
+
+def bench_save_tasks(todo, app, storage, size):
+    # a full, synchronous save of every list (the text backend also writes a fresh snapshot)
+    store = loaded_store(todo, storage)
+    store.add_pending_task("BENCHMARK SAVE")
+
+    def save():
+        store.save_tasks()
+        store.flush()
+    yield save
+    store.close()
+
+
+def bench_add_tasks_dedup(todo, app, storage, size):
+    # one bulk add of size/10 new tasks mixed with as many duplicates of pending and completed tasks
+    store = loaded_store(todo, storage)
+    count = max(1, size // 10)
+    batch = [name for number in range(count) for name in (f"NEW TASK {number}", task_name(number * 7 % size))]
+    yield lambda: store.add_pending_tasks(batch)
+    store.close()
+
+
+def bench_complete_task(todo, app, storage, size):
+    # completes every pending task but one, selected in the list view
+    store = loaded_store(todo, storage)
+    window = todo.TodoApp(store)
+    select_rows(window.pending_tasks_listbox, 0, len(store.pending_tasks) - 2)
+    yield window.complete_task
+    close_windows(app, window)
+    store.close()
+
+
+def bench_clear_completed_tasks(todo, app, storage, size):
+    store = loaded_store(todo, storage)
+    window = todo.TodoApp(store)
+    yield window.clear_completed_tasks
+    close_windows(app, window)
+    store.close()
+
+
+def bench_restore_tasks(todo, app, storage, size):
+    # restores the whole recycle bin, selected in the Recycle Bin window
+    store = loaded_store(todo, storage)
+    window = todo.Recycle_Bin_Window(store)
+    select_rows(window.recycle_bin_listbox, 0, len(store.recycle_bin_tasks) - 1)
+    yield window.restore_tasks
+    close_windows(app, window)
+    store.close()
+
+
+def bench_performance_window(todo, app, storage, size):
+    # construction and first paint; the chart itself renders on a worker thread
+    store = loaded_store(todo, storage)
+    windows = []
+
+    def open_window():
+        window = todo.Performance_Window(store)
+        windows.append(window)
+        window.show()
+        app.processEvents()
+    yield open_window
+    close_windows(app, *windows)
+    store.close()
+
+
+def bench_shift_year(todo, app, storage, size):
+    # ShiftScheduleApp.get_shift for every day of a year; does not depend on the task count or storage
+    window = todo.ShiftScheduleApp()
+    first = QDate(2025, 1, 1)
+    yield lambda: [window.get_shift(first.addDays(day)) for day in range(365)]
+    close_windows(app, window)
+
+
+BENCHMARKS = {
+    "todoapp_init": bench_todoapp_init,
+    "load_tasks": bench_load_tasks,
+    "save_tasks": bench_save_tasks,
+    "add_tasks_dedup": bench_add_tasks_dedup,
+    "complete_task": bench_complete_task,
+    "clear_completed_tasks": bench_clear_completed_tasks,
+    "restore_tasks": bench_restore_tasks,
+    "performance_window": bench_performance_window,
+    "shift_get_shift_year": bench_shift_year,
+}
+SIZE_INDEPENDENT = {"shift_get_shift_year"}
+
+
+def run_once(bench, todo, app, fixtures, storage, size, trace_memory):
+    directory = fixtures.fresh_copy(storage, size)
+    with working_directory(directory):
+        steps = bench(todo, app, storage, size)
+        action = next(steps)
+        if trace_memory:
+            tracemalloc.start()
+        started = time.perf_counter()
+        action()
+        elapsed = time.perf_counter() - started
+        peak = tracemalloc.get_traced_memory()[1] if trace_memory else None
+        tracemalloc.stop()
+        for _ in steps:
+            pass
+    shutil.rmtree(directory, ignore_errors=True)
+    return elapsed, peak
+
+
+def run(names, sizes, storages, repeat, todo, app):
+    # {"name[storage,size]": {"seconds": best, "median": ..., "peak_mb": ...}}; timings are taken without tracemalloc,
+    # which slows allocation down, and the peak comes from one extra traced run
+    fixtures = Fixtures(todo)
+    results = {}
+    try:
+        for name in names:
+            cases = [("-", 0)] if name in SIZE_INDEPENDENT else [(storage, size) for storage in storages
+                                                                for size in sizes]
+            for storage, size in cases:
+                fixture_storage = storages[0] if storage == "-" else storage
+                timings = [run_once(BENCHMARKS[name], todo, app, fixtures, fixture_storage, size, False)[0]
+                           for _ in range(repeat)]
+                _, peak = run_once(BENCHMARKS[name], todo, app, fixtures, fixture_storage, size, True)
+                key = name if name in SIZE_INDEPENDENT else f"{name}[{storage},{size}]"
+                results[key] = {"seconds": round(min(timings), 6), "median": round(statistics.median(timings), 6),
+                                "peak_mb": round(peak / 1e6, 3)}
+                print(f"{key:45} {min(timings) * 1000:10.1f} ms  (median {statistics.median(timings) * 1000:.1f})"
+                      f"  peak {peak / 1e6:8.2f} MB", flush=True)
+    finally:
+        fixtures.remove()
+    return results
+
+
+def compare(results, baseline, tolerance, noise_seconds=0.005):
+    # benchmark keys that are more than tolerance slower than the baseline (and slower by more than the noise floor)
+    regressions = []
+    for key, result in results.items():
+        before = baseline.get("results", {}).get(key)
+        if before is None:
+            continue
+        ratio = result["seconds"] / before["seconds"] if before["seconds"] else float("inf")
+        regressed = ratio > 1 + tolerance and result["seconds"] - before["seconds"] > noise_seconds
+        print(f"{key:45} {before['seconds'] * 1000:10.1f} -> {result['seconds'] * 1000:10.1f} ms  x{ratio:5.2f}"
+              f"  {before['peak_mb']:8.2f} -> {result['peak_mb']:8.2f} MB{'  SLOWER' if regressed else ''}")
+        if regressed:
+            regressions.append(key)
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Times task-list operations and window construction.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=list(SIZES), help="task counts (default: %(default)s)")
+    parser.add_argument("--storage", nargs="+", choices=list(STORAGES), default=list(STORAGES))
+    parser.add_argument("--only", nargs="+", choices=list(BENCHMARKS), default=list(BENCHMARKS), metavar="NAME",
+                        help=f"benchmarks to run: {', '.join(BENCHMARKS)}")
+    parser.add_argument("--repeat", type=int, default=3, help="timed runs per case; the best one is kept")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE, help="baseline JSON (default: benchmarks/baseline.json)")
+    parser.add_argument("--save-baseline", action="store_true", help="write this run to the baseline file")
+    parser.add_argument("--compare", action="store_true", help="compare with the baseline; exit 1 on a slowdown")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed slowdown before --compare fails")
+    parser.add_argument("-o", "--output", help="also write this run's JSON here")
+    args = parser.parse_args(argv)
+
+    app = QApplication.instance() or QApplication([])
+    # nobody is there to dismiss message boxes (e.g. the congratulations once every task is completed)
+    QMessageBox.information = staticmethod(lambda *args, **kwargs: QMessageBox.Ok)
+    QMessageBox.exec_ = lambda self: QMessageBox.Ok
+    todo = load_app_module()
+
+    results = run(args.only, args.sizes, args.storage, max(1, args.repeat), todo, app)
+    report = {"created": datetime.datetime.now().isoformat(timespec="seconds"), "python": platform.python_version(),
+              "pyqt": PYQT_VERSION_STR, "machine": platform.machine(), "results": results}
+    for path in filter(None, [args.output, args.baseline if args.save_baseline else None]):
+        with open(path, "w") as file:
+            json.dump(report, file, indent=2)
+        print(f"wrote {path}")
+    if args.compare:
+        try:
+            with open(args.baseline) as file:
+                baseline = json.load(file)
+        except FileNotFoundError:
+            print(f"no baseline at {args.baseline}; run with --save-baseline first")
+            return 1
+        regressions = compare(results, baseline, args.tolerance)
+        if regressions:
+            print(f"{len(regressions)} benchmark(s) slower than the baseline: {', '.join(regressions)}")
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,171 @@
+# ______________________________________________ ADVANCED TO-DO LIST: SHIFT SCHEDULE ___________________________________
+# Crew rotations for the "AGL Shifts" viewer. A pattern is one crew's repeating cycle of shifts plus the day each crew
+# starts it, so the shift of every crew on every day is a single modulo. Nothing here imports PyQt5, and NumPy is only
+# imported by the range functions.
+import csv
+import datetime
+import os
+from functools import lru_cache
+
+DAY, NIGHT, OFF = 0, 1, 2
+SHIFT_NAMES = ("DAY", "NIGHT", "OFF")
+SHIFT_HOURS = {DAY: (7, 19), NIGHT: (19, 7)}  # start and end hour used by the calendar export; nights end next day
+
+
+def to_date(value):
+    # datetime.date, "YYYY-MM-DD" or numpy.datetime64
+    if isinstance(value, datetime.datetime):
+        return value.date()
+    if isinstance(value, datetime.date):
+        return value
+    if isinstance(value, str):
+        return datetime.date.fromisoformat(value)
+    return datetime.date.fromisoformat(str(value)[:10])
+
+
+class RotationPattern:
+    def __init__(self, name, cycle, crews=("A", "B", "C"), anchor=datetime.date(2024, 4, 30), offsets=None):
+        self.name = name
+        self.cycle = tuple(cycle)  # DAY/NIGHT/OFF for each day of one crew's cycle
+        self.crews = tuple(crews)
+        self.anchor = to_date(anchor)  # the day crew offsets are counted from
+        if offsets is None:
+            # crews spread evenly through the cycle, as in the 2-2-2 rotation (A, B and C two days apart)
+            step = len(self.cycle) // len(self.crews)
+            offsets = [crew_index * step for crew_index in range(len(self.crews))]
+        if len(offsets) != len(self.crews):
+            raise ValueError("a rotation needs one offset per crew")
+        self.offsets = tuple(offsets)
+
+    def __repr__(self):
+        return f"RotationPattern({self.name!r}, {len(self.cycle)}-day cycle, {len(self.crews)} crews)"
+
+    def shift_on(self, date):
+        # [(crew, DAY/NIGHT/OFF)] for one date
+        days_since_anchor = (to_date(date) - self.anchor).days
+        return [(crew, self.cycle[(days_since_anchor + offset) % len(self.cycle)])
+                for crew, offset in zip(self.crews, self.offsets)]
+
+    def with_crews(self, crews, offsets=None):
+        return RotationPattern(self.name, self.cycle, crews, self.anchor, offsets)
+
+    def with_anchor(self, anchor):
+        return RotationPattern(self.name, self.cycle, self.crews, anchor, self.offsets)
+
+
+PATTERNS = {
+    # two days, two nights, two off; crew B is two days behind A and crew C four
+    "2-2-2": RotationPattern("2-2-2", [DAY, DAY, NIGHT, NIGHT, OFF, OFF]),
+    # four days, four off, four nights, four off
+    "4-on-4-off": RotationPattern("4-on-4-off", [DAY] * 4 + [OFF] * 4 + [NIGHT] * 4 + [OFF] * 4,
+                                  crews=("A", "B", "C", "D")),
+    # four-week DuPont cycle: 4 nights, 3 off, 3 days, 1 off, 3 nights, 3 off, 4 days, 7 off
+    "DuPont": RotationPattern("DuPont", [NIGHT] * 4 + [OFF] * 3 + [DAY] * 3 + [OFF] + [NIGHT] * 3 + [OFF] * 3 +
+                              [DAY] * 4 + [OFF] * 7, crews=("A", "B", "C", "D")),
+}
+
+
+def shift_roster(pattern, start, end):
+    # Every crew's shift on every day from start to end inclusive: returns (dates, shifts), where dates is a
+    # datetime64[D] array of length days and shifts an int8 (crews x days) array of DAY/NIGHT/OFF.
+    import numpy as np  # only the roster views and exports pay for NumPy
+
+    start, end = to_date(start), to_date(end)
+    if end < start:
+        raise ValueError("the roster ends before it starts")
+    first = (start - pattern.anchor).days
+    days_since_anchor = np.arange(first, first + (end - start).days + 1, dtype=np.int64)
+    offsets = np.asarray(pattern.offsets, dtype=np.int64)[:, np.newaxis]
+    cycle = np.asarray(pattern.cycle, dtype=np.int8)
+    shifts = cycle[(days_since_anchor + offsets) % len(pattern.cycle)]
+    dates = np.datetime64(start, "D") + np.arange(days_since_anchor.size)
+    return dates, shifts
+
+
+def shift_counts(pattern, start, end):
+    # {crew: (days, nights, offs)} over the range, e.g. to check a roster is fair
+    _, shifts = shift_roster(pattern, start, end)
+    return {crew: tuple(int((row == shift).sum()) for shift in (DAY, NIGHT, OFF))
+            for crew, row in zip(pattern.crews, shifts)}
+
+
+@lru_cache(maxsize=64)
+def month_table(pattern, year, month):
+    # Shifts for a calendar page: (first date, [(crew shifts...) per day]) from two weeks before the 1st to two weeks
+    # after the month ends, which covers whatever weeks a month view shows. Cached per (pattern, month).
+    first = datetime.date(year, month, 1) - datetime.timedelta(days=14)
+    next_month = datetime.date(year + month // 12, month % 12 + 1, 1)
+    _, shifts = shift_roster(pattern, first, next_month + datetime.timedelta(days=13))
+    return first, [tuple(day) for day in shifts.T.tolist()]
+
+
+def _roster_blocks(pattern, start, end, crews=None, block_days=366):
+    # (first date, crew indexes, shifts for those crews) a year at a time, so long rosters never sit in memory whole
+    start, end = to_date(start), to_date(end)
+    crew_indexes = list(range(len(pattern.crews))) if crews is None else [pattern.crews.index(crew) for crew in crews]
+    block_start = start
+    while block_start <= end:
+        block_end = min(end, block_start + datetime.timedelta(days=block_days - 1))
+        _, shifts = shift_roster(pattern, block_start, block_end)
+        yield block_start, crew_indexes, shifts[crew_indexes]
+        block_start = block_end + datetime.timedelta(days=1)
+
+
+def iter_roster_csv(pattern, start, end, crews=None):
+    # rows of a CSV roster: "date" and one column per crew, then one row per day
+    crews = list(pattern.crews if crews is None else crews)
+    yield ["date"] + crews
+    for block_start, _, shifts in _roster_blocks(pattern, start, end, crews):
+        first = block_start.toordinal()
+        for offset, day in enumerate(shifts.T.tolist()):
+            yield [datetime.date.fromordinal(first + offset).isoformat()] + [SHIFT_NAMES[shift] for shift in day]
+
+
+def iter_roster_ics(pattern, start, end, crews=None, hours=SHIFT_HOURS):
+    # An iCalendar (RFC 5545) roster as text chunks: one VEVENT per crew per worked shift, with floating local times.
+    # UIDs and DTSTAMP are derived from the roster itself, so the same roster always produces the same file.
+    start = to_date(start)
+    stamp = f"{start:%Y%m%d}T000000Z"
+    yield ("BEGIN:VCALENDAR\r\nVERSION:2.0\r\nPRODID:-//Advanced To-Do App//AGL Shifts//EN\r\n"
+           f"CALSCALE:GREGORIAN\r\nX-WR-CALNAME:{pattern.name} shifts\r\n")
+    crews = list(pattern.crews if crews is None else crews)
+    for block_start, _, shifts in _roster_blocks(pattern, start, end, crews):
+        first = block_start.toordinal()
+        # every date string of the block once (plus the day after, for nights), shared by all crews
+        days = [datetime.date.fromordinal(first + offset).strftime("%Y%m%d") for offset in range(shifts.shape[1] + 1)]
+        for crew, row in zip(crews, shifts.tolist()):
+            head = f"BEGIN:VEVENT\r\nUID:{pattern.name}-{crew}-"
+            middle = f"@agl-shifts\r\nDTSTAMP:{stamp}\r\nDTSTART:"
+            # shift -> (start time + DTEND:, days until it ends, end time + summary)
+            parts = {shift: (f"T{start_hour:02d}0000\r\nDTEND:", int(end_hour <= start_hour),
+                             f"T{end_hour:02d}0000\r\nSUMMARY:Crew {crew} {SHIFT_NAMES[shift]} shift\r\nEND:VEVENT\r\n")
+                     for shift, (start_hour, end_hour) in hours.items() if shift != OFF}
+            events = []
+            for offset, shift in enumerate(row):
+                part = parts.get(shift)
+                if part is not None:
+                    day = days[offset]
+                    events.append(head + day + middle + day + part[0] + days[offset + part[1]] + part[2])
+            yield "".join(events)
+    yield "END:VCALENDAR\r\n"
+
+
+def export_roster(path, pattern, start, end, crews=None):
+    # Streams the roster to path as iCalendar (.ics) or CSV (anything else), via a temp file renamed into place; a
+    # failed export removes the temp file and leaves any earlier export at path untouched
+    temp_path = f"{path}.tmp"
+    try:
+        with open(temp_path, "w", newline="", encoding="utf-8") as file:
+            if path.lower().endswith(".ics"):
+                file.writelines(iter_roster_ics(pattern, start, end, crews))
+            else:
+                csv.writer(file).writerows(iter_roster_csv(pattern, start, end, crews))
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(temp_path, path)
+    except BaseException:
+        try:
+            os.remove(temp_path)
+        except OSError:
+            pass
+        raise
@@ -0,0 +1,14 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+@pytest.fixture(autouse=True)
+def in_tmp_path(tmp_path, monkeypatch):
+    # the backends keep their files in the working directory
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.delenv("TODO_STORAGE", raising=False)
+    return tmp_path
@@ -0,0 +1,55 @@
+import io
+import json
+
+import todo
+
+
+def run(capsys, *argv):
+    status = todo.main(list(argv))
+    return status, capsys.readouterr()
+
+
+def listed(capsys, list_name="pending"):
+    _, output = run(capsys, "list", list_name)
+    return [line.split(". ", 1)[1] for line in output.out.splitlines()]
+
+
+def test_add_stores_tasks_like_the_window(capsys):
+    status, output = run(capsys, "add", " write report", "Call the bank", "WRITE REPORT")
+    assert status == 0
+    assert output.out == "added 2 task(s), skipped 1 duplicate(s)\n"
+    assert listed(capsys) == ["WRITE REPORT", "CALL THE BANK"]
+
+
+def test_add_reads_tasks_from_stdin(capsys, monkeypatch):
+    monkeypatch.setattr("sys.stdin", io.StringIO("one\n\n  two  \n"))
+    run(capsys, "add", "-")
+    assert listed(capsys) == ["ONE", "TWO"]
+
+
+def test_move_commands_take_numbers_and_names(capsys):
+    run(capsys, "add", "a", "b", "c")
+    assert run(capsys, "complete", "1", "c")[1].out == "completed 2 task(s)\n"
+    assert listed(capsys) == ["B"]
+    assert listed(capsys, "completed") == ["A", "C"]
+    run(capsys, "recycle", "--all")
+    run(capsys, "restore", "C")
+    run(capsys, "purge", "--all")
+    assert (listed(capsys), listed(capsys, "completed"), listed(capsys, "recycled")) == (["B"], ["C"], [])
+
+
+def test_unmatched_names_are_reported(capsys):
+    run(capsys, "add", "a")
+    status, output = run(capsys, "complete", "missing")
+    assert status == 1
+    assert "no pending task matches 'missing'" in output.err
+
+
+def test_stats_and_export(capsys, tmp_path):
+    run(capsys, "add", "a", "b")
+    run(capsys, "complete", "a")
+    _, output = run(capsys, "stats", "--json")
+    assert json.loads(output.out) == {"pending": 1, "completed": 1, "recycled": 0, "success_rate": 100.0}
+    run(capsys, "export", "-o", str(tmp_path / "backup.json"))
+    exported = json.loads((tmp_path / "backup.json").read_text())
+    assert exported == {"pending": ["B"], "completed": ["A"], "recycled": []}
@@ -0,0 +1,124 @@
+import pytest
+
+from todo_engine import SQLiteTaskBackend, TaskEngine, TextFileTaskBackend
+
+
+@pytest.fixture(params=["text", "sqlite"])
+def engine(request):
+    backend = TextFileTaskBackend() if request.param == "text" else SQLiteTaskBackend()
+    engine = TaskEngine(backend=backend)
+    engine.load()
+    yield engine
+    engine.close()
+
+
+def reloaded(engine):
+    engine.flush()
+    other = TaskEngine(backend=type(engine.backend)())
+    other.load()
+    try:
+        return other.pending_tasks, other.completed_tasks, other.recycle_bin_tasks
+    finally:
+        other.close()
+
+
+def assert_index_consistent(engine):
+    expected = {TaskEngine.canonical_task(task).casefold(): "pending" for task in engine.pending_tasks}
+    expected.update((TaskEngine.canonical_task(task).casefold(), "completed") for task in engine.completed_tasks)
+    assert engine.index.states == expected
+    assert len(engine._pending_ids) == len(engine.pending_tasks)
+    assert len(engine._completed_ids) == len(engine.completed_tasks)
+    assert len(engine._recycle_bin_ids) == len(engine.recycle_bin_tasks)
+
+
+def test_new_tasks_are_trimmed_and_in_capitals(engine):
+    assert engine.add_pending_tasks(["  write report ", "Call the bank"]) == ["WRITE REPORT", "CALL THE BANK"]
+    assert engine.pending_tasks == ["WRITE REPORT", "CALL THE BANK"]
+
+
+def test_duplicates_are_skipped_whatever_their_case_or_spacing(engine):
+    engine.add_pending_tasks(["Write report"])
+    engine.complete_tasks([0])
+    assert engine.add_pending_tasks(["write  REPORT", "new", " NEW ", "", "   "]) == ["NEW"]
+    assert engine.task_state("Write Report") == "completed"
+    assert engine.task_state("new") == "pending"
+    assert_index_consistent(engine)
+
+
+def test_bulk_moves_keep_the_lists_and_index_in_step(engine):
+    engine.add_pending_tasks([f"T{number}" for number in range(10)])
+    engine.complete_tasks([1, 3, 5, 7])
+    engine.recycle_completed_tasks([0, 2])
+    engine.delete_pending_tasks([0, 5])
+    assert engine.pending_tasks == ["T2", "T4", "T6", "T8"]
+    assert engine.completed_tasks == ["T3", "T7"]
+    assert engine.recycle_bin_tasks == ["T1", "T5"]
+    assert_index_consistent(engine)
+    assert reloaded(engine) == (["T2", "T4", "T6", "T8"], ["T3", "T7"], ["T1", "T5"])
+
+
+def test_restore_drops_tasks_that_exist_again(engine):
+    engine.add_pending_tasks(["A", "B"])
+    engine.complete_tasks([0, 1])
+    engine.recycle_all_completed_tasks()
+    engine.add_pending_tasks(["a"])  # added again while "A" sits in the recycle bin
+    engine.restore_tasks([0, 1])
+    assert (engine.pending_tasks, engine.completed_tasks, engine.recycle_bin_tasks) == (["A"], ["B"], [])
+    assert_index_consistent(engine)
+    assert reloaded(engine) == (["A"], ["B"], [])
+
+
+def test_search_follows_the_lists(engine):
+    engine.add_pending_tasks(["write report", "report bug", "call bank"])
+    assert engine.search_rows("pending", "report") == [0, 1]
+    engine.complete_tasks([0])
+    assert engine.search_rows("pending", "report") == [0]
+    assert engine.search_rows("completed", "rep") == [0]
+    engine.recycle_all_completed_tasks()
+    engine.purge_recycled_tasks([0])
+    assert engine.search_rows("recycled", "report") == []
+
+
+def fail(*args):
+    raise OSError("disk full")
+
+
+@pytest.mark.parametrize("action, failing", [
+    (lambda engine: engine.complete_tasks([0, 2]), "move"),
+    (lambda engine: engine.restore_tasks([0]), "move"),
+    (lambda engine: engine.delete_pending_tasks([1]), "delete"),
+    (lambda engine: engine.purge_recycled_tasks([0]), "delete"),
+    (lambda engine: engine.add_pending_tasks(["NEW"]), "insert_many"),
+])
+def test_a_failed_mutation_leaves_the_lists_as_they_were(engine, action, failing):
+    engine.add_pending_tasks(["A", "B", "C", "D", "E"])
+    engine.complete_tasks([3, 4])
+    engine.recycle_completed_tasks([1])
+    before = (list(engine.pending_tasks), list(engine.completed_tasks), list(engine.recycle_bin_tasks),
+              dict(engine.index.states))
+    setattr(engine.backend, failing, fail)
+    try:
+        with pytest.raises(OSError):
+            action(engine)
+    finally:
+        delattr(engine.backend, failing)
+    assert (engine.pending_tasks, engine.completed_tasks, engine.recycle_bin_tasks, engine.index.states) == before
+    assert_index_consistent(engine)
+    assert engine.search_rows("pending", "b") == [1]
+    assert reloaded(engine) == before[:3]
+    engine.complete_tasks([0])  # and the engine carries on
+    assert reloaded(engine) == (["B", "C"], ["D", "A"], ["E"])
+
+
+def test_duplicate_rows_from_older_versions_keep_their_name_indexed():
+    with open(TextFileTaskBackend.tasks_file, "w", encoding="utf-8") as file:
+        file.write("Pending Tasks:\nA\nA\nB\nCompleted Tasks:\nB\n")
+    engine = TaskEngine(backend=TextFileTaskBackend())
+    engine.load()
+    engine.delete_pending_tasks([0])
+    assert engine.task_state("A") == "pending"
+    engine.delete_pending_tasks([0])
+    assert engine.task_state("A") is None
+    engine.delete_pending_tasks([0])  # the pending "B"; the completed one is still there
+    assert engine.task_state("B") == "completed"
+    assert engine.add_pending_tasks(["A", "B"]) == ["A"]
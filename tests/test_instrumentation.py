@@ -0,0 +1,17 @@
+import pytest
+
+from todo_instrumentation import instrumentation, timed
+
+
+@timed(name="test.chunk")
+def chunk(first, size=10):
+    return first, size
+
+
+@pytest.mark.parametrize("enabled", [False, True])
+def test_timed_passes_every_argument_through(monkeypatch, enabled):
+    monkeypatch.setattr(instrumentation, "enabled", enabled)
+    assert chunk(1, 20) == (1, 20)
+    assert chunk(1, size=30) == (1, 30)
+    with pytest.raises(TypeError):
+        chunk(1, 20, False)  # e.g. a checked flag the function does not take
@@ -0,0 +1,41 @@
+import pytest
+
+QtCore = pytest.importorskip("PyQt5.QtCore")
+
+from todo_io import FileIOService  # noqa: E402
+
+
+@pytest.fixture(scope="module")
+def app():
+    return QtCore.QCoreApplication.instance() or QtCore.QCoreApplication([])
+
+
+def wait(app, service):
+    service.wait_for_done()
+    app.processEvents()  # delivers the queued signals
+
+
+def test_writes_and_reads_are_reported(app):
+    service = FileIOService()
+    written, read = [], []
+    service.writeFinished.connect(written.append)
+    service.readFinished.connect(lambda path, contents: read.append((path, contents)))
+    service.write("a.txt", "café")
+    service.read("a.txt")
+    service.read("missing.txt")
+    wait(app, service)
+    assert written == ["a.txt"]
+    assert sorted(read) == [("a.txt", "café".encode("utf-8")), ("missing.txt", None)]
+
+
+def test_a_failed_write_does_not_stall_the_file(app):
+    service = FileIOService()
+    failed, written = [], []
+    service.failed.connect(lambda path, error: failed.append(path))
+    service.writeFinished.connect(written.append)
+    service.write("a.txt", object())  # neither str nor bytes: TypeError in the worker
+    wait(app, service)
+    service.write("a.txt", "ok")
+    wait(app, service)
+    assert failed == ["a.txt"] and written == ["a.txt"]
+    assert service.read_text("a.txt") == "ok"
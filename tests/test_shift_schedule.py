@@ -0,0 +1,108 @@
+import calendar
+import datetime
+import os
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+import shift_schedule  # noqa: E402
+from shift_schedule import (DAY, NIGHT, OFF, PATTERNS, export_roster, iter_roster_csv, iter_roster_ics,  # noqa: E402
+                            month_table, shift_roster)
+
+START, END = datetime.date(1999, 12, 1), datetime.date(2031, 3, 1)  # either side of every anchor
+
+
+def days(start, end):
+    return [start + datetime.timedelta(days=offset) for offset in range((end - start).days + 1)]
+
+
+def old_get_shift(date):
+    # the viewer's per-day 2-2-2 lookup before rosters: crew n is 2n days into the cycle, two days per shift type
+    days_since_start = (date - datetime.date(2024, 4, 30)).days
+    return [(crew, [DAY, NIGHT, OFF][(days_since_start + crew_index * 2) % 6 // 2])
+            for crew_index, crew in enumerate(["A", "B", "C"])]
+
+
+def test_the_2_2_2_roster_matches_the_old_per_day_lookup():
+    pattern = PATTERNS["2-2-2"]
+    _, shifts = shift_roster(pattern, START, END)
+    assert [list(zip(pattern.crews, day)) for day in shifts.T.tolist()] == [old_get_shift(date)
+                                                                            for date in days(START, END)]
+
+
+@pytest.mark.parametrize("name", sorted(PATTERNS))
+def test_the_roster_matches_the_per_day_lookup(name):
+    pattern = PATTERNS[name]
+    dates, shifts = shift_roster(pattern, START, END)
+    assert dates[0] == np.datetime64(START) and dates[-1] == np.datetime64(END)
+    assert shifts.shape == (len(pattern.crews), (END - START).days + 1)
+    assert [list(zip(pattern.crews, day)) for day in shifts.T.tolist()] == [pattern.shift_on(date)
+                                                                            for date in days(START, END)]
+
+
+@pytest.mark.parametrize("year, month", [
+    (2024, 12),  # the page runs into January of the next year
+    (2024, 2),  # leap-year February
+    (2023, 2),
+    (2024, 9),  # starts on a Sunday
+])
+@pytest.mark.parametrize("name", sorted(PATTERNS))
+def test_month_table_covers_two_weeks_either_side(name, year, month):
+    pattern = PATTERNS[name]
+    first, table = month_table(pattern, year, month)
+    month_days = calendar.monthrange(year, month)[1]
+    assert first == datetime.date(year, month, 1) - datetime.timedelta(days=14)
+    assert len(table) == 14 + month_days + 14
+    last = first + datetime.timedelta(days=len(table) - 1)
+    assert [tuple(pattern.shift_on(date)) for date in days(first, last)] == [tuple(zip(pattern.crews, day))
+                                                                              for day in table]
+
+
+def test_month_table_edges():
+    assert datetime.date(2024, 9, 1).weekday() == calendar.SUNDAY
+    first, table = month_table(PATTERNS["2-2-2"], 2024, 12)
+    assert first + datetime.timedelta(days=len(table) - 1) == datetime.date(2025, 1, 14)
+    first, table = month_table(PATTERNS["2-2-2"], 2024, 2)
+    assert first + datetime.timedelta(days=14 + 28) == datetime.date(2024, 2, 29)
+
+
+ROSTER = (PATTERNS["DuPont"], datetime.date(2023, 12, 20), datetime.date(2025, 3, 10))
+
+
+@pytest.mark.parametrize("extension", ["ics", "csv"])
+def test_exporting_a_roster_twice_gives_the_same_bytes(extension):
+    export_roster(f"first.{extension}", *ROSTER)
+    export_roster(f"second.{extension}", *ROSTER)
+    with open(f"first.{extension}", "rb") as first, open(f"second.{extension}", "rb") as second:
+        data = first.read()
+        assert data == second.read()
+    assert data.count(b"\n") == data.count(b"\r\n") > 0  # CRLF lines on every platform
+    chunks = (iter_roster_ics(*ROSTER) if extension == "ics" else
+              (",".join(row) + "\r\n" for row in iter_roster_csv(*ROSTER)))
+    assert data == "".join(chunks).encode("utf-8")
+
+
+def test_ics_uids_and_stamps_come_from_the_roster():
+    lines = "".join(iter_roster_ics(*ROSTER)).split("\r\n")
+    uids = [line for line in lines if line.startswith("UID:")]
+    assert len(uids) == len(set(uids)) == lines.count("BEGIN:VEVENT") > 0
+    assert uids[0] == "UID:DuPont-A-20231220@agl-shifts"
+    assert {line for line in lines if line.startswith("DTSTAMP:")} == {"DTSTAMP:20231220T000000Z"}
+    assert "".join(iter_roster_ics(*ROSTER)) == "\r\n".join(lines)
+
+
+def test_a_failed_export_leaves_no_temp_file(monkeypatch):
+    export_roster("roster.csv", *ROSTER)
+    with open("roster.csv", "rb") as file:
+        exported = file.read()
+
+    def broken(*args):
+        yield ["date", "A"]
+        raise OSError("disk full")
+    monkeypatch.setattr(shift_schedule, "iter_roster_csv", broken)
+    with pytest.raises(OSError):
+        export_roster("roster.csv", *ROSTER)
+    assert os.listdir(".") == ["roster.csv"]
+    with open("roster.csv", "rb") as file:
+        assert file.read() == exported
@@ -0,0 +1,77 @@
+import sqlite3
+import threading
+
+import pytest
+
+from todo_engine import SQLiteTaskBackend, TaskEngine
+
+
+def open_engine(path="tasks.db"):
+    engine = TaskEngine(backend=SQLiteTaskBackend(path))
+    engine.load()
+    return engine
+
+
+def stored_rows(path="tasks.db"):
+    backend = SQLiteTaskBackend(path)
+    try:
+        return backend.load()
+    finally:
+        backend.close()
+
+
+def test_insert_many_returns_the_ids_of_the_inserted_rows():
+    engine = open_engine()
+    engine.add_pending_tasks(["A", "B", "C"])
+    engine.flush()
+    assert list(zip(engine._pending_ids, engine.pending_tasks)) == stored_rows()["pending"]
+
+
+def test_rows_added_by_another_process_keep_their_ids():
+    gui = open_engine()
+    gui.add_pending_tasks(["FIRST"])
+    gui.flush()
+
+    cron = open_engine()  # e.g. todo.py add run from cron while the app is open
+    cron.add_pending_tasks(["CRON1", "CRON2", "CRON3"])
+    cron.close()
+
+    gui.add_pending_tasks(["GUI TASK"])
+    assert len(gui._pending_ids) == len(gui.pending_tasks) == 2
+    gui.delete_pending_tasks([gui.pending_tasks.index("GUI TASK")])
+    gui.close()
+
+    assert [task for _, task in stored_rows()["pending"]] == ["FIRST", "CRON1", "CRON2", "CRON3"]
+
+
+def test_positions_continue_after_another_process_wrote():
+    gui = open_engine()
+    cron = open_engine()
+    cron.add_pending_tasks(["CRON"])
+    cron.close()
+    gui.add_pending_tasks(["GUI"])
+    gui.close()
+    assert [task for _, task in stored_rows()["pending"]] == ["CRON", "GUI"]
+
+
+def test_a_mutation_that_cannot_begin_leaves_the_backend_usable():
+    engine = open_engine()
+    engine.add_pending_tasks(["BEFORE"])
+    engine.flush()
+    engine.backend.connection.execute("PRAGMA busy_timeout = 0")
+
+    other = sqlite3.connect("tasks.db", isolation_level=None)
+    other.execute("BEGIN IMMEDIATE")  # another process holds the write lock
+    with pytest.raises(sqlite3.OperationalError):
+        engine.add_pending_tasks(["BLOCKED"])
+    other.execute("ROLLBACK")
+    other.close()
+
+    assert engine.pending_tasks == ["BEFORE"]
+    flushed = threading.Thread(target=engine.flush)  # the save worker must not wait for a lock nobody releases
+    flushed.start()
+    flushed.join(timeout=5)
+    assert not flushed.is_alive()
+    engine.add_pending_tasks(["AFTER"])
+    engine.close()
+    assert [task for _, task in stored_rows()["pending"]] == ["BEFORE", "AFTER"]
@@ -0,0 +1,188 @@
+import json
+import locale
+import multiprocessing
+import os
+import random
+import tracemalloc
+
+import pytest
+
+from todo_engine import TaskEngine, TextFileTaskBackend, atomic_write_bytes, atomic_write_text
+
+
+def open_engine():
+    engine = TaskEngine(backend=TextFileTaskBackend())
+    engine.load()
+    return engine
+
+
+def test_reload_keeps_edits_not_yet_written():
+    # Refresh while the save worker's debounce still holds the journal records
+    engine = open_engine()
+    engine.add_pending_tasks(["X1"])
+    engine.add_pending_tasks(["X2"])
+    engine.load_tasks()
+    assert engine.pending_tasks == ["X1", "X2"]
+    engine.add_pending_tasks(["Y1"])
+    engine.close()
+    assert open_engine().pending_tasks == ["X1", "X2", "Y1"]
+
+
+def test_records_after_a_torn_tail_are_kept():
+    engine = open_engine()
+    engine.add_pending_tasks(["ONE"])
+    engine.backend.write_pending()
+    with open(TextFileTaskBackend.journal_file, "a") as journal:
+        journal.write('{"seq": 2, "time": "2026')  # the app died mid-append
+
+    engine = open_engine()
+    assert engine.pending_tasks == ["ONE"]
+    engine.add_pending_tasks(["TWO"])
+    engine.backend.write_pending()  # and dies again before any compaction
+
+    assert open_engine().pending_tasks == ["ONE", "TWO"]
+
+
+def test_journal_replays_every_kind_of_change():
+    engine = open_engine()
+    engine.add_pending_tasks(["A", "B", "C", "D"])
+    engine.complete_tasks([0, 2])
+    engine.recycle_completed_tasks([1])
+    engine.delete_pending_tasks([0])
+    engine.uncomplete_tasks([0])
+    engine.backend.write_pending()  # the app dies here, before any compaction
+    assert os.path.getsize(TextFileTaskBackend.journal_file)  # not compacted: the changes are only in the journal
+
+    engine = open_engine()
+    assert (engine.pending_tasks, engine.completed_tasks, engine.recycle_bin_tasks) == (["D", "A"], [], ["C"])
+
+
+def test_task_files_are_utf8_whatever_the_locale(monkeypatch):
+    monkeypatch.setattr(locale, "getpreferredencoding", lambda do_setlocale=True: "cp1252")
+    engine = open_engine()
+    engine.add_pending_tasks(["café ☕", "naïve"])
+    engine.close()
+    with open(TextFileTaskBackend.tasks_file, encoding="utf-8") as file:
+        assert "CAFÉ ☕" in file.read()
+    assert open_engine().pending_tasks == ["CAFÉ ☕", "NAÏVE"]
+
+
+def test_legacy_files_in_the_locale_encoding_are_read(monkeypatch):
+    monkeypatch.setattr(locale, "getpreferredencoding", lambda do_setlocale=True: "cp1252")
+    with open(TextFileTaskBackend.tasks_file, "w", encoding="cp1252") as file:
+        file.write("Pending Tasks:\nCAFÉ\nCompleted Tasks:\nNAÏVE\n")
+    engine = open_engine()
+    assert (engine.pending_tasks, engine.completed_tasks) == (["CAFÉ"], ["NAÏVE"])
+
+
+def test_two_processes_writing_between_loads_keep_each_others_changes():
+    engine = open_engine()
+    engine.add_pending_tasks(["A", "B", "C"])
+    engine.close()
+
+    gui = open_engine()
+    cli = open_engine()  # todo.py while the window is open
+    cli.add_pending_tasks(["D"])
+    cli.delete_pending_tasks([0])
+    cli.backend.write_pending()
+
+    gui.delete_pending_tasks([1])  # "B", by the window's rows, which still show "A"
+    gui.complete_tasks([1])  # "C"
+    gui.backend.write_pending()
+    cli.close()
+
+    engine = open_engine()
+    assert (engine.pending_tasks, engine.completed_tasks) == (["D"], ["C"])
+    gui.close()  # compacts after the other process did
+    engine = open_engine()
+    assert (engine.pending_tasks, engine.completed_tasks) == (["D"], ["C"])
+
+
+def add_one_by_one(directory, prefix):
+    os.chdir(directory)
+    engine = open_engine()
+    for number in range(40):
+        engine.add_pending_tasks([f"{prefix}{number}"])
+        engine.backend.write_pending()
+        if number % 15 == 0:
+            engine.flush()
+    engine.close()
+
+
+def test_concurrent_appends_are_all_kept(tmp_path):
+    open_engine().close()
+    context = multiprocessing.get_context("spawn")
+    writers = [context.Process(target=add_one_by_one, args=(str(tmp_path), prefix)) for prefix in ("X", "Y")]
+    for writer in writers:
+        writer.start()
+    for writer in writers:
+        writer.join()
+        assert writer.exitcode == 0
+    assert sorted(open_engine().pending_tasks) == sorted(f"{prefix}{number}" for prefix in "XY" for number in range(40))
+
+
+def test_streamed_replay_matches_replaying_the_whole_lists():
+    generator = random.Random(7)
+    for _ in range(200):
+        rows = [(list_name, generator.choice("ABCD")) for list_name in ("pending", "completed", "recycled")
+                for _ in range(generator.randrange(6))]
+        edits = [(generator.choice(("append", "discard")), generator.choice(("pending", "completed", "recycled")),
+                  generator.choice("ABCDE")) for _ in range(generator.randrange(12))]
+        state_lists = {"pending": [], "completed": [], "recycled": []}
+        for list_name, task in rows:
+            state_lists[list_name].append(task)
+        state = {list_name: list(tasks) for list_name, tasks in state_lists.items()}
+        TextFileTaskBackend.replay(state, edits)
+        expected = [(list_name, task) for list_name in state for task in state[list_name]]
+        backend = TextFileTaskBackend()
+        streamed = backend._replayed(backend._grouped(rows), edits)
+        assert [(list_name, task) for list_name, tasks in streamed for task in tasks] == expected
+        whole = backend._replayed([(list_name, state_lists[list_name]) for list_name in state_lists], edits)
+        assert [(list_name, task) for list_name, tasks in whole for task in tasks] == expected
+
+
+def test_the_snapshot_is_streamed():
+    engine = open_engine()
+    engine.add_pending_tasks([f"TASK NUMBER {number:06}" for number in range(50_000)])
+    engine.close()
+    size = os.path.getsize(TextFileTaskBackend.snapshot_file)
+
+    tracemalloc.start()
+    count = sum(1 for _ in TextFileTaskBackend().iter_state())
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    assert count == 50_000
+    assert peak < size / 4
+
+
+def test_snapshots_of_earlier_versions_are_read():
+    with open(TextFileTaskBackend.snapshot_file, "w", encoding="utf-8") as file:
+        json.dump({"seq": 3, "pending": ["A"], "completed": ["B"], "recycled": ["C"]}, file)
+    with open(TextFileTaskBackend.journal_file, "w", encoding="utf-8") as file:
+        file.write(json.dumps({"seq": 3, "op": "add", "edits": [["append", "pending", "OLD"]]}) + "\n")
+        file.write(json.dumps({"seq": 4, "op": "delete", "edits": [["remove", "pending", 0]]}) + "\n")
+    engine = open_engine()
+    assert (engine.pending_tasks, engine.completed_tasks, engine.recycle_bin_tasks) == ([], ["B"], ["C"])
+    engine.add_pending_tasks(["NEW"])
+    engine.close()
+    assert open_engine().pending_tasks == ["NEW"]
+
+
+def test_a_failed_write_keeps_the_old_file_and_removes_its_temp_file(monkeypatch):
+    engine = open_engine()
+    engine.add_pending_tasks(["KEPT"])
+    engine.close()
+    before = os.listdir(".")
+    with open(TextFileTaskBackend.tasks_file, "rb") as file:
+        saved = file.read()
+
+    def fsync(fd):
+        raise OSError("disk full")
+    monkeypatch.setattr(os, "fsync", fsync)
+    with pytest.raises(OSError):
+        atomic_write_text(TextFileTaskBackend.tasks_file, "Pending Tasks:\nLOST\n")
+    with pytest.raises(OSError):
+        atomic_write_bytes(TextFileTaskBackend.tasks_file, b"Pending Tasks:\nLOST\n")
+    assert sorted(os.listdir(".")) == sorted(before)
+    with open(TextFileTaskBackend.tasks_file, "rb") as file:
+        assert file.read() == saved
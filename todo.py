@@ -0,0 +1,155 @@
+# ______________________________________________ ADVANCED TO-DO LIST: COMMAND LINE ____________________________________
+# The To-Do App without a window: it uses the same storage as "To-Do App.py" (TODO_STORAGE picks the backend) through
+# todo_engine, and never imports PyQt5 or matplotlib, so scripts and cron jobs can add and complete tasks quickly.
+#
+#   python todo.py add "Write report" "Call the bank"
+#   cat tasks.txt | python todo.py add -
+#   python todo.py list completed
+#   python todo.py complete 1 "Call the bank"
+#   python todo.py recycle --all
+#   python todo.py stats
+#   python todo.py export --format txt -o backup.txt
+import argparse
+import json
+import sys
+from todo_engine import TaskEngine, TextFileTaskBackend, atomic_write_text
+
+LIST_NAMES = ("pending", "completed", "recycled")
+
+
+def read_tasks(args):
+    # task names from the command line, or one per line from stdin for "-" (or when nothing is given and stdin is piped)
+    if args.tasks in ([], ["-"]) and (args.tasks or not sys.stdin.isatty()):
+        return [line.strip() for line in sys.stdin.read().splitlines() if line.strip()]
+    return args.tasks
+
+
+def resolve_rows(engine, list_name, selectors):
+    # a selector is a task name or its number in "todo list <list_name>"; returns (rows, unmatched selectors)
+    tasks = engine.tasks(list_name)
+    rows, names, unmatched = set(), [], []
+    for selector in selectors:
+        if selector.isdigit() and 1 <= int(selector) <= len(tasks):
+            rows.add(int(selector) - 1)
+        else:
+            names.append(selector)
+    if names:
+        found = engine.find_rows(list_name, names)
+        rows.update(found)
+        found_names = {engine.index.normalize(tasks[row]) for row in found}
+        unmatched = [name for name in names if engine.index.normalize(name) not in found_names]
+    return sorted(rows), unmatched
+
+
+def report_unmatched(list_name, unmatched):
+    for name in unmatched:
+        print(f"todo: no {list_name} task matches {name!r}", file=sys.stderr)
+
+
+def command_add(engine, args):
+    tasks = read_tasks(args)
+    added = engine.add_pending_tasks(tasks)
+    print(f"added {len(added)} task(s)" + (f", skipped {len(tasks) - len(added)} duplicate(s)" if len(added) < len(tasks)
+                                          else ""))
+    return 0
+
+
+def command_list(engine, args):
+    list_names = LIST_NAMES if args.list_name == "all" else (args.list_name,)
+    lines = []
+    for list_name in list_names:
+        if len(list_names) > 1:
+            lines.append(f"{list_name.upper()} TASKS")
+        lines.extend(f"{row:>4}. {task}" for row, task in enumerate(engine.tasks(list_name), start=1))
+    if lines:
+        sys.stdout.write("\n".join(lines) + "\n")
+    return 0
+
+
+def move_command(list_name, action, verb):
+    # complete/recycle/restore/purge: select rows in one list and apply the engine action to all of them at once
+    def command(engine, args):
+        if getattr(args, "all", False):
+            rows, unmatched = range(len(engine.tasks(list_name))), []
+        else:
+            rows, unmatched = resolve_rows(engine, list_name, read_tasks(args))
+        report_unmatched(list_name, unmatched)
+        if rows:
+            getattr(engine, action)(rows)
+        print(f"{verb} {len(rows)} task(s)")
+        return 1 if unmatched and not rows else 0
+    return command
+
+
+def command_stats(engine, args):
+    counts = {list_name: len(engine.tasks(list_name)) for list_name in LIST_NAMES}
+    if args.json:
+        print(json.dumps(dict(counts, success_rate=engine.success_rate())))
+    else:
+        for list_name in LIST_NAMES:
+            print(f"{list_name.capitalize() + ':':<12}{counts[list_name]}")
+        print(f"{'Success:':<12}{engine.success_rate():.2f}%")
+    return 0
+
+
+def command_export(engine, args):
+    if args.format == "json":
+        text = json.dumps({list_name: engine.tasks(list_name) for list_name in LIST_NAMES}, indent=4) + "\n"
+    else:  # the PyQt5_tasks.txt layout, followed by the recycle bin when asked for
+        text = TextFileTaskBackend.tasks_file_text(engine.pending_tasks, engine.completed_tasks)
+        if args.recycled:
+            text += "Recycled Tasks:\n" + TextFileTaskBackend.recycle_bin_file_text(engine.recycle_bin_tasks)
+    if args.output:
+        atomic_write_text(args.output, text)
+    else:
+        sys.stdout.write(text)
+    return 0
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="todo", description="Manage the To-Do App tasks without the window.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    add = commands.add_parser("add", help="add pending tasks (use - to read one task per line from stdin)")
+    add.add_argument("tasks", nargs="*")
+    add.set_defaults(handler=command_add)
+
+    show = commands.add_parser("list", help="list tasks with the numbers the other commands accept")
+    show.add_argument("list_name", nargs="?", default="pending", choices=LIST_NAMES + ("all",))
+    show.set_defaults(handler=command_list)
+
+    for name, list_name, action, verb, help_text in (
+            ("complete", "pending", "complete_tasks", "completed", "mark pending tasks as completed"),
+            ("recycle", "completed", "recycle_completed_tasks", "recycled", "move completed tasks to the recycle bin"),
+            ("restore", "recycled", "restore_tasks", "restored", "restore tasks from the recycle bin"),
+            ("purge", "recycled", "purge_recycled_tasks", "purged", "permanently delete tasks from the recycle bin")):
+        command = commands.add_parser(name, help=help_text)
+        command.add_argument("tasks", nargs="*", help=f"names or numbers from 'todo list {list_name}' (- for stdin)")
+        command.add_argument("--all", action="store_true", help=f"every {list_name} task")
+        command.set_defaults(handler=move_command(list_name, action, verb))
+
+    stats = commands.add_parser("stats", help="task counts and success rate")
+    stats.add_argument("--json", action="store_true")
+    stats.set_defaults(handler=command_stats)
+
+    export = commands.add_parser("export", help="write every task list to stdout or a file")
+    export.add_argument("--format", choices=("json", "txt"), default="json")
+    export.add_argument("--recycled", action="store_true", help="include the recycle bin in txt output")
+    export.add_argument("-o", "--output", help="file to write (atomically) instead of stdout")
+    export.set_defaults(handler=command_export)
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    engine = TaskEngine()
+    try:
+        engine.load()
+        return args.handler(engine, args)
+    finally:
+        # writes what the command committed; compaction is left to the journal threshold and the app's own exit
+        engine.backend.close()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,1180 @@
+# ______________________________________________ ADVANCED TO-DO LIST: TASK ENGINE _____________________________________
+# Storage backends and the task lists with every action on them. Nothing here imports PyQt5 or matplotlib, so the
+# command line (todo.py) can use it without starting Qt; "To-Do App.py" wraps TaskEngine in its TaskStore.
+import os
+import locale
+import threading
+import sqlite3 as sql
+from contextlib import contextmanager
+import datetime
+import json
+import re
+from bisect import bisect_left
+from collections import Counter
+from itertools import groupby
+from operator import itemgetter
+from todo_instrumentation import timed
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+# every text file the app and todo.py write, whatever the platform's locale
+TEXT_ENCODING = "utf-8"
+
+
+def decode_text(data):
+    # files written by older versions used the locale's encoding; they are read in it until they are next written
+    try:
+        return data.decode(TEXT_ENCODING)
+    except UnicodeDecodeError:
+        return data.decode(locale.getpreferredencoding(False), errors="replace")
+
+
+@contextmanager
+def _replacing(path, mode, **open_args):
+    # write-to-temp, fsync, rename: readers see either the old file or the new one, never a half-written one, and a
+    # write that fails (or is interrupted) removes its temp file and leaves the old file as it was
+    temp_path = f"{path}.tmp"
+    try:
+        with open(temp_path, mode, **open_args) as file:
+            yield file
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(temp_path, path)
+    except BaseException:
+        try:
+            os.remove(temp_path)
+        except OSError:
+            pass
+        raise
+
+
+def atomic_write_text(path, text):
+    with _replacing(path, "w", encoding=TEXT_ENCODING) as file:
+        file.write(text)
+
+
+def atomic_write_bytes(path, data):
+    with _replacing(path, "wb") as file:
+        file.write(data)
+
+
+def read_text(path):
+    with open(path, "rb") as file:
+        return decode_text(file.read())
+
+
+def lock_exclusive(file):
+    # blocks until this process holds the file's lock; other processes (and other open files in this one) wait
+    if fcntl is not None:
+        fcntl.flock(file.fileno(), fcntl.LOCK_EX)
+    else:
+        file.seek(0)
+        while True:
+            try:
+                msvcrt.locking(file.fileno(), msvcrt.LK_LOCK, 1)  # gives up after 10 seconds
+                return
+            except OSError:
+                continue
+
+
+def unlock(file):
+    if fcntl is not None:
+        fcntl.flock(file.fileno(), fcntl.LOCK_UN)
+    else:
+        file.seek(0)
+        msvcrt.locking(file.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+def iter_file_lines(path):
+    # yields the lines of a text file one at a time, so a file with millions of lines is never read into a list
+    try:
+        file = open(path, "rb")
+    except FileNotFoundError:
+        return
+    with file:
+        for line in file:
+            yield decode_text(line)
+
+
+class TextFileTaskBackend:
+    # Plain-text storage. The lists live in a snapshot (PyQt5_tasks.snapshot: a {"seq": ...} line, then one
+    # [list_name, task] line per task, so it can be read a line at a time) and every action after it is one small
+    # fsync'd JSON line appended to PyQt5_tasks.journal, so a save costs the same however long the lists are. Records
+    # are queued by commit() and written by write_pending() on the store's save worker. Once the journal passes
+    # compaction_threshold the worker also writes a new snapshot, refreshes the human-readable
+    # PyQt5_tasks.txt/PyQt5_tasks_recycle_bin.txt and starts a new journal. On load the snapshot (or the legacy .txt
+    # files on first run) is replayed forward by sequence number, so recovery after a crash is deterministic: a torn
+    # last line is ignored and nothing is applied twice.
+    # The app and todo.py may write at the same time: every journal append and every read of the files happens under
+    # an exclusive lock on PyQt5_tasks.lock, appends take their sequence numbers from the journal as it is on disk,
+    # and removals are recorded by task name, so one process's records stay correct on top of another's.
+    tasks_file = "PyQt5_tasks.txt"
+    recycle_bin_file = "PyQt5_tasks_recycle_bin.txt"
+    performance_file = "user_performance.json"
+    snapshot_file = "PyQt5_tasks.snapshot"
+    journal_file = "PyQt5_tasks.journal"
+    lock_file = "PyQt5_tasks.lock"
+    compaction_threshold = 256 * 1024  # bytes of journal before a background compaction
+
+    def __init__(self):
+        self._last_id = 0
+        self._seq = 0  # sequence number of the last journal record seen on disk or written
+        self._snapshot_seq = 0
+        self._journal_records = 0  # records in the journal(s) that no snapshot covers yet
+        self._journal_id = None  # (st_dev, st_ino) of the live journal as last read, and the bytes read from it:
+        self._journal_offset = 0  # appends by other processes are the bytes after that
+        self._edits = None  # the running mutation's journal edits
+        # records waiting for write_pending(), in order, and whether a compaction has been asked for
+        self._pending = []
+        self._compact_requested = False
+        self._pending_lock = threading.Lock()
+        self._write_lock = threading.Lock()
+        # whole-file access to the performance data; TaskStore routes both through the app's background I/O service
+        self.write_file = atomic_write_text
+        self.read_file = read_text
+
+    def _new_id(self):
+        self._last_id += 1
+        return self._last_id
+
+    def load(self):
+        state = self.read_state()
+        return {list_name: [(self._new_id(), task) for task in state[list_name]]
+                for list_name in ("pending", "completed", "recycled")}
+
+    def iter_load(self):
+        for list_name, task in self.iter_state():
+            yield list_name, self._new_id(), task
+
+    def count_tasks(self):
+        return None  # unknown until the files have been read
+
+    def iter_state(self):
+        # (list_name, task) pairs in list order, streamed from the snapshot (or the legacy files on first run) with the
+        # journal applied on the way; only the journal, which compaction keeps small, is read into memory. The files
+        # are opened under the lock and read after it is released: a compaction replaces them rather than
+        # rewriting them, so the open ones stay as they were.
+        self.write_pending()
+        with self._locked():
+            file, sections, edits = self._open_state(stream=True)
+        try:
+            for list_name, tasks in self._replayed(sections, edits):
+                for task in tasks:
+                    yield list_name, task
+        finally:
+            if file is not None:
+                file.close()
+
+    def read_state(self):
+        # snapshot (or the legacy files) plus the journal tail. Records still queued for the save worker are written
+        # out first: otherwise they would be missing from the state.
+        self.write_pending()
+        with self._locked():
+            return self._read_state()
+
+    def _read_state(self):
+        file, sections, edits = self._open_state(stream=False)
+        try:
+            return {list_name: tasks if isinstance(tasks, list) else list(tasks)
+                    for list_name, tasks in self._replayed(sections, edits)}
+        finally:
+            if file is not None:
+                file.close()
+
+    def _open_state(self, stream):
+        # Under the lock: the open snapshot (None for the legacy files), its (list_name, tasks) sections in list order
+        # and the journal's edits after it. Streamed sections are read as they are iterated, one after the other.
+        try:
+            file = open(self.snapshot_file, "rb")
+        except FileNotFoundError:
+            file, seq = None, 0
+            if stream:
+                sections = self._grouped(self._legacy_rows())
+            else:
+                pending_tasks, completed_tasks = self.read_tasks_file()
+                sections = [("pending", pending_tasks), ("completed", completed_tasks),
+                            ("recycled", self.read_recycle_bin_file())]
+        else:
+            header = json.loads(file.readline())
+            seq = header["seq"]
+            if "pending" in header:  # written by an earlier version: the whole state on one line
+                sections = [(list_name, header[list_name]) for list_name in ("pending", "completed", "recycled")]
+            elif stream:
+                sections = self._grouped(self._snapshot_rows(file))
+            else:
+                # the arrays are one per line group, so one json.loads reads them all
+                data = file.read().replace(b"\r", b"").rstrip(b"\n")
+                sections = list(zip(("pending", "completed", "recycled"),
+                                    json.loads(b"[" + data.replace(b"]\n[", b"],[") + b"]")))
+        self._snapshot_seq = self._seq = seq
+        edits = []
+        self._journal_records = 0
+        for path in [path for _, path in self._rotated_journals()] + [self.journal_file]:
+            for record in self._read_journal(path):
+                if record["seq"] <= self._seq:
+                    continue  # already part of the snapshot
+                edits.extend(record["edits"])
+                self._seq = record["seq"]
+                self._journal_records += 1
+        return file, sections, edits
+
+    @staticmethod
+    def _snapshot_rows(file):
+        # (list_name, task) rows of the snapshot's arrays. Each array starts on a new line ("[") and has one task per
+        # line; a task is a JSON string, so it never starts with "[" or spans lines. 16 KiB of lines (a few hundred
+        # tasks) go to each json.loads: parsing them one by one would cost a call per task.
+        list_names = iter(("pending", "completed", "recycled"))
+        list_name = None
+        while True:
+            lines = file.readlines(1 << 14)
+            if not lines:
+                return
+            names, items = [], []
+            for line in lines:
+                line = line.rstrip(b"\r\n")
+                if line.startswith(b"["):
+                    list_name = next(list_names)
+                    line = line[1:]
+                if line.endswith(b"]"):
+                    line = line[:-1]
+                line = line.rstrip(b",")
+                if line:
+                    names.append(list_name)
+                    items.append(line)
+            yield from zip(names, json.loads(b"[" + b",".join(items) + b"]"))
+
+    @staticmethod
+    def _grouped(rows):
+        for list_name, group in groupby(rows, key=itemgetter(0)):
+            yield list_name, (task for _, task in group)
+
+    def _legacy_rows(self):
+        yield from self.iter_tasks_file()
+        for task in self.iter_recycle_bin_file():
+            yield "recycled", task
+
+    def _replayed(self, sections, edits):
+        # (list_name, tasks) for each list, in order: the sections with the journal edits applied, lazily for streamed
+        # sections. Each section must be consumed before the next one is asked for.
+        if any(operation == "remove" for operation, _, _ in edits):
+            # row removals from earlier versions need the whole lists
+            state = {"pending": [], "completed": [], "recycled": []}
+            for list_name, tasks in sections:
+                state[list_name].extend(tasks)
+            self.replay(state, edits)
+            sections, edits = list(state.items()), []
+        discards = {}
+        for operation, list_name, task in edits:
+            if operation == "discard":
+                discards.setdefault(list_name, Counter())[task] += 1
+        edited_lists = {list_name for _, list_name, _ in edits}
+        sections = iter(sections)
+        section = next(sections, None)
+        for list_name in ("pending", "completed", "recycled"):
+            tasks = ()
+            taken = section is not None and section[0] == list_name
+            if taken:
+                tasks = section[1]
+            if list_name in edited_lists:
+                tasks = self._replayed_list(list_name, tasks, edits, discards.get(list_name, Counter()))
+            yield list_name, tasks
+            if taken:
+                section = next(sections, None)
+
+    @staticmethod
+    def _replayed_list(list_name, tasks, edits, discards):
+        # A discard removes the first occurrence of its task, and the snapshot's tasks come before the journal's
+        # appends, so the first n discards of a task take its n occurrences in the snapshot, whenever they happened;
+        # the rest take appended ones
+        taken = Counter()
+        for task in tasks:
+            if taken[task] < discards[task]:
+                taken[task] += 1
+            else:
+                yield task
+        appended, skipped = [], Counter()
+        for operation, edit_list, task in edits:
+            if edit_list != list_name:
+                continue
+            if operation == "append":
+                appended.append(task)
+            elif skipped[task] < taken[task]:
+                skipped[task] += 1  # one of the discards that took a snapshot task
+            elif task in appended:
+                appended.remove(task)
+        yield from appended
+
+    @staticmethod
+    def replay(state, edits):
+        for operation, list_name, value in edits:
+            if operation == "discard":
+                try:
+                    state[list_name].remove(value)
+                except ValueError:
+                    pass  # another process removed it first
+            elif operation == "remove":
+                del state[list_name][value]  # by row, as journals written by earlier versions record removals
+            else:
+                state[list_name].append(value)
+
+    @contextmanager
+    def _locked(self):
+        # held while the journal is read or appended to; a separate file, since compaction replaces the journal
+        with open(self.lock_file, "a+b") as file:
+            lock_exclusive(file)
+            try:
+                yield
+            finally:
+                unlock(file)
+
+    def _read_journal(self, path, offset=0):
+        # The records from offset on. A record torn by a crash (no newline, or not valid JSON) ends the log. The live
+        # journal is cut back to the last good record, so records appended later start on a line of their own
+        # instead of joining the torn one, and where it ends is remembered for _catch_up().
+        live = path == self.journal_file
+        try:
+            file = open(path, "rb+" if live else "rb")
+        except FileNotFoundError:
+            if live:
+                self._journal_id, self._journal_offset = None, 0
+            return []
+        records = []
+        with file:
+            file.seek(offset)
+            good_bytes = offset
+            for line in file:
+                try:
+                    record = json.loads(line) if line.endswith(b"\n") else None
+                except ValueError:
+                    record = None
+                if not isinstance(record, dict):
+                    if live:
+                        file.truncate(good_bytes)
+                    break
+                good_bytes += len(line)
+                records.append(record)
+            if live:
+                stat = os.fstat(file.fileno())
+                self._journal_id, self._journal_offset = (stat.st_dev, stat.st_ino), good_bytes
+        return records
+
+    def _catch_up(self):
+        # Under the lock, before an append: reads what other processes appended since this one last looked, so the
+        # next sequence number follows theirs
+        try:
+            stat = os.stat(self.journal_file)
+        except FileNotFoundError:
+            # no journal since the snapshot (or a crash right after one): the snapshot holds the last sequence number
+            if os.path.exists(self.snapshot_file):
+                with open(self.snapshot_file, "rb") as file:
+                    self._seq = max(self._seq, json.loads(file.readline())["seq"])
+            self._journal_records = 0
+            self._journal_id, self._journal_offset = None, 0
+            return
+        same_file = (stat.st_dev, stat.st_ino) == self._journal_id and stat.st_size >= self._journal_offset
+        if not same_file:
+            self._journal_records = 0
+        for record in self._read_journal(self.journal_file, self._journal_offset if same_file else 0):
+            if record["op"] == "snapshot":
+                self._journal_records = 0  # a compaction started this journal; it is covered up to here
+            else:
+                self._journal_records += 1
+            self._seq = max(self._seq, record["seq"])
+
+    def _rotated_journals(self):
+        # journals left by compactions of earlier versions, renamed to PyQt5_tasks.journal.<last seq>; returns
+        # (seq, path) in order
+        directory = os.path.dirname(os.path.abspath(self.journal_file))
+        prefix = os.path.basename(self.journal_file) + "."
+        return sorted((int(name[len(prefix):]), os.path.join(directory, name)) for name in os.listdir(directory)
+                      if name.startswith(prefix) and name[len(prefix):].isdigit())
+
+    def read_tasks_file(self):
+        pending_tasks, completed_tasks = [], []
+        for list_name, task in self.iter_tasks_file():
+            (pending_tasks if list_name == "pending" else completed_tasks).append(task)
+        return pending_tasks, completed_tasks
+
+    def iter_tasks_file(self):
+        pending_section = True
+        for line in iter_file_lines(self.tasks_file):
+            line = line.strip()
+            if line == "Completed Tasks:":
+                pending_section = False
+            elif pending_section and line != "Pending Tasks:":
+                yield "pending", line
+            elif not pending_section:
+                yield "completed", line
+
+    def read_recycle_bin_file(self):
+        return list(self.iter_recycle_bin_file())
+
+    def iter_recycle_bin_file(self):
+        for line in iter_file_lines(self.recycle_bin_file):
+            yield line.strip()
+
+    # The journal records what the engine asks of the backend rather than the store's row edits: rows are only
+    # meaningful in this process's copy of the lists, task names in any process's
+    def begin(self):
+        self._edits = []
+
+    def insert(self, state, task):
+        self._edits.append(("append", state, task))
+        return self._new_id()
+
+    def insert_many(self, state, tasks):
+        self._edits.extend(("append", state, task) for task in tasks)
+        return [self._new_id() for _ in tasks]
+
+    def move(self, ids, from_state, to_state, tasks):
+        self._edits.extend(("discard", from_state, task) for task in tasks)
+        self._edits.extend(("append", to_state, task) for task in tasks)
+
+    def delete(self, ids, state, tasks):
+        self._edits.extend(("discard", state, task) for task in tasks)
+
+    def commit(self, store, operation, edits):
+        # only queues the record; its sequence number is given, and the disk work done, in write_pending()
+        edits, self._edits = self._edits, None
+        if edits:
+            record = {"time": datetime.datetime.now().isoformat(timespec="seconds"), "op": operation, "edits": edits}
+            with self._pending_lock:
+                self._pending.append(record)
+
+    def rollback(self):
+        self._edits = None
+
+    def flush(self, store):
+        # explicit save: fold the journal into a fresh snapshot and .txt files right away
+        with self._pending_lock:
+            self._compact_requested = True
+        self.write_pending()
+
+    def write_pending(self):
+        # Runs on the save worker: everything committed since the last call goes out as one append and one fsync,
+        # followed by a compaction once the journal has grown past compaction_threshold (or one was asked for)
+        with self._write_lock:
+            with self._pending_lock:
+                pending, self._pending = self._pending, []
+                compact, self._compact_requested = self._compact_requested, False
+            if not pending and not compact:
+                return
+            with self._locked():
+                self._catch_up()
+                lines = []
+                for record in pending:
+                    self._seq += 1
+                    lines.append(json.dumps(dict(seq=self._seq, **record)) + "\n")
+                self._append_journal(lines)
+                if compact or self._journal_offset > self.compaction_threshold:
+                    self._compact()
+
+    def _append_journal(self, lines):
+        if not lines:
+            return
+        with open(self.journal_file, "ab") as journal:
+            journal.write("".join(lines).encode(TEXT_ENCODING))
+            journal.flush()
+            os.fsync(journal.fileno())
+            stat = os.fstat(journal.fileno())
+        self._journal_id, self._journal_offset = (stat.st_dev, stat.st_ino), stat.st_size
+        self._journal_records += len(lines)
+
+    def _compact(self):
+        # Under the lock: the snapshot is built from the files, so it holds every process's records and not only the
+        # lists this one has in memory. The new journal starts with a record of the snapshot's sequence number, which
+        # is where the next append, by any process, continues from.
+        if self._journal_records == 0 and os.path.exists(self.snapshot_file):
+            return
+        state = self._read_state()
+        state["seq"] = self._seq
+        self.write_snapshot(state)
+        atomic_write_text(self.journal_file, json.dumps({"seq": self._seq, "op": "snapshot", "edits": []}) + "\n")
+        stat = os.stat(self.journal_file)
+        self._journal_id, self._journal_offset = (stat.st_dev, stat.st_ino), stat.st_size
+        self._journal_records = 0
+
+    @staticmethod
+    def tasks_file_text(pending_tasks, completed_tasks):
+        return ("Pending Tasks:\n" + "".join(task + "\n" for task in pending_tasks) +
+                "Completed Tasks:\n" + "".join(task + "\n" for task in completed_tasks))
+
+    @staticmethod
+    def recycle_bin_file_text(recycled_tasks):
+        return "".join(task + "\n" for task in recycled_tasks)
+
+    def write_snapshot(self, state):
+        # a JSON array per list with one task per line, which the item separator gives without a call per task
+        atomic_write_text(self.snapshot_file, json.dumps({"seq": state["seq"]}) + "\n" + "".join(
+            json.dumps(state[list_name], separators=(",\n", ":")) + "\n"
+            for list_name in ("pending", "completed", "recycled")))
+        self._snapshot_seq = state["seq"]
+        # the snapshot is the commit point; the .txt files are refreshed for people and older versions of the app
+        atomic_write_text(self.tasks_file, self.tasks_file_text(state["pending"], state["completed"]))
+        atomic_write_text(self.recycle_bin_file, self.recycle_bin_file_text(state["recycled"]))
+        for seq, path in self._rotated_journals():
+            if seq <= state["seq"]:
+                os.remove(path)
+
+    def load_performance_data(self):
+        try:
+            return json.loads(self.read_file(self.performance_file))
+        except FileNotFoundError:
+            return []
+
+    def save_performance_data(self, task_data):
+        self.write_file(self.performance_file, json.dumps(task_data, indent=4))
+
+    def close(self):
+        self.write_pending()
+
+
+class SQLiteTaskBackend:
+    # Row-level storage: every add/complete/delete touches only its own rows, so the cost of an action does not grow
+    # with the size of the lists. The legacy text files are imported the first time the database is created.
+    # Each mutation runs in a savepoint of one long transaction that write_pending() commits on the save worker, so a
+    # burst of actions costs one COMMIT and the GUI thread never waits for the disk.
+    database_file = "PyQt5_tasks.db"
+    performance_columns = ("task_name", "deadline", "task_type", "task_priority", "user_comment")
+
+    def __init__(self, database_file=None):
+        if database_file is not None:
+            self.database_file = database_file
+        # transactions are managed below; _lock keeps the save worker's COMMIT out of a running mutation
+        self.connection = sql.connect(self.database_file, isolation_level=None, check_same_thread=False)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        self._lock = threading.RLock()
+        self._in_transaction = False
+        self._next_position = {}
+        self.create_schema()
+
+    def create_schema(self):
+        self.connection.executescript("""
+            CREATE TABLE IF NOT EXISTS tasks (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                name TEXT NOT NULL,
+                state TEXT NOT NULL CHECK (state IN ('pending', 'completed', 'recycled')),
+                position INTEGER NOT NULL,
+                created_at TEXT NOT NULL,
+                completed_at TEXT
+            );
+            CREATE INDEX IF NOT EXISTS tasks_state_position ON tasks (state, position);
+            CREATE TABLE IF NOT EXISTS task_details (
+                task_name TEXT PRIMARY KEY,
+                deadline TEXT,
+                task_type TEXT,
+                task_priority TEXT,
+                user_comment TEXT
+            );
+            CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+        """)
+        if self.connection.execute("SELECT 1 FROM meta WHERE key = 'legacy_import'").fetchone() is None:
+            self.import_legacy_files()
+
+    def import_legacy_files(self, text_backend=None):
+        text_backend = text_backend or TextFileTaskBackend()
+        now = datetime.datetime.now().isoformat(timespec="seconds")
+        positions = {}
+
+        def legacy_rows():
+            # streamed straight from the legacy files into the INSERT
+            for state, task in text_backend.iter_state():
+                position = positions.get(state, 0)
+                positions[state] = position + 1
+                yield task, state, position, now, now if state == "completed" else None
+
+        with self.transaction():
+            self.connection.executemany(
+                "INSERT INTO tasks (name, state, position, created_at, completed_at) VALUES (?, ?, ?, ?, ?)",
+                legacy_rows())
+            self._write_performance_data(text_backend.load_performance_data())
+            self.connection.execute("INSERT INTO meta (key, value) VALUES ('legacy_import', ?)", (now,))
+        self.write_pending()
+
+    @contextmanager
+    def transaction(self):
+        self.begin()
+        try:
+            yield
+        except Exception:
+            self.rollback()
+            raise
+        self.commit(None, None, None)
+
+    def load(self):
+        loaded = {"pending": [], "completed": [], "recycled": []}
+        with self._lock:
+            for task_id, name, state in self.connection.execute(
+                    "SELECT id, name, state FROM tasks ORDER BY state, position"):
+                loaded[state].append((task_id, name))
+        return loaded
+
+    def _read_next_positions(self):
+        # one index lookup per state rather than a scan of the whole table. Read at the start of every transaction,
+        # since another process (e.g. todo.py from cron) may have added rows since the last one.
+        self._next_position = {}
+        for state in ("pending", "completed", "recycled"):
+            (position,) = self.connection.execute("SELECT MAX(position) FROM tasks WHERE state = ?", (state,)).fetchone()
+            if position is not None:
+                self._next_position[state] = position + 1
+
+    def iter_load(self, page_size=5000):
+        # pages through each state by position, taking the lock per page only, so no cursor stays open between pages
+        for state in ("pending", "completed", "recycled"):
+            last_position = -1
+            while True:
+                with self._lock:
+                    rows = self.connection.execute(
+                        "SELECT id, name, position FROM tasks WHERE state = ? AND position > ? "
+                        "ORDER BY position LIMIT ?", (state, last_position, page_size)).fetchall()
+                for task_id, name, last_position in rows:
+                    yield state, task_id, name
+                if len(rows) < page_size:
+                    break
+
+    def count_tasks(self):
+        with self._lock:
+            return self.connection.execute("SELECT COUNT(*) FROM tasks").fetchone()[0]
+
+    def _take_position(self, state):
+        position = self._next_position.get(state, 0)
+        self._next_position[state] = position + 1
+        return position
+
+    def begin(self):
+        self._lock.acquire()  # held until commit() or rollback()
+        started = False
+        try:
+            if not self._in_transaction:
+                # IMMEDIATE takes the write lock now, so the positions read below cannot be taken by another writer
+                self.connection.execute("BEGIN IMMEDIATE")
+                started = self._in_transaction = True
+                self._read_next_positions()
+            self.connection.execute("SAVEPOINT mutation")
+        except Exception:
+            # e.g. "database is locked" while another process writes: nothing was changed, so the lock (and a
+            # transaction begun here) must not outlive the failure, or the save worker would wait for it forever
+            try:
+                if started:
+                    self._in_transaction = False
+                    self.connection.execute("ROLLBACK")
+            finally:
+                self._lock.release()
+            raise
+
+    def insert(self, state, task):
+        now = datetime.datetime.now().isoformat(timespec="seconds")
+        cursor = self.connection.execute(
+            "INSERT INTO tasks (name, state, position, created_at) VALUES (?, ?, ?, ?)",
+            (task, state, self._take_position(state), now))
+        return cursor.lastrowid
+
+    def insert_many(self, state, tasks):
+        now = datetime.datetime.now().isoformat(timespec="seconds")
+        first_position = self._next_position.get(state, 0)
+        self._next_position[state] = first_position + len(tasks)
+        # ids only grow (AUTOINCREMENT) and this transaction holds the write lock, so the new rows are the ones above
+        # the largest id before the insert
+        (last_id,) = self.connection.execute("SELECT COALESCE(MAX(id), 0) FROM tasks").fetchone()
+        self.connection.executemany(
+            "INSERT INTO tasks (name, state, position, created_at) VALUES (?, ?, ?, ?)",
+            [(task, state, first_position + offset, now) for offset, task in enumerate(tasks)])
+        return [task_id for (task_id,) in self.connection.execute(
+            "SELECT id FROM tasks WHERE id > ? ORDER BY id", (last_id,))]
+
+    def move(self, ids, from_state, to_state, tasks):
+        now = datetime.datetime.now().isoformat(timespec="seconds")
+        if to_state == "completed":
+            self.connection.executemany(
+                "UPDATE tasks SET state = ?, position = ?, completed_at = ? WHERE id = ?",
+                [(to_state, self._take_position(to_state), now, task_id) for task_id in ids])
+        elif to_state == "pending":
+            self.connection.executemany(
+                "UPDATE tasks SET state = ?, position = ?, completed_at = NULL WHERE id = ?",
+                [(to_state, self._take_position(to_state), task_id) for task_id in ids])
+        else:
+            self.connection.executemany(
+                "UPDATE tasks SET state = ?, position = ? WHERE id = ?",
+                [(to_state, self._take_position(to_state), task_id) for task_id in ids])
+
+    def delete(self, ids, state, tasks):
+        self.connection.executemany("DELETE FROM tasks WHERE id = ?", [(task_id,) for task_id in ids])
+
+    def commit(self, store, operation, edits):
+        try:
+            self.connection.execute("RELEASE mutation")
+        finally:
+            self._lock.release()
+
+    def rollback(self):
+        try:
+            self.connection.execute("ROLLBACK TO mutation")
+            self.connection.execute("RELEASE mutation")
+        finally:
+            self._lock.release()
+
+    def write_pending(self):
+        with self._lock:
+            if self._in_transaction:
+                self._in_transaction = False
+                self.connection.execute("COMMIT")
+
+    def flush(self, store):
+        self.write_pending()
+
+    def load_performance_data(self):
+        with self._lock:
+            rows = self.connection.execute(
+                f"SELECT {', '.join(self.performance_columns)} FROM task_details ORDER BY rowid").fetchall()
+        return [{column: value for column, value in zip(self.performance_columns, row) if value is not None}
+                for row in rows]
+
+    def save_performance_data(self, task_data):
+        with self.transaction():
+            self.connection.execute("DELETE FROM task_details")
+            self._write_performance_data(task_data)
+
+    def _write_performance_data(self, task_data):
+        self.connection.executemany(
+            f"INSERT OR REPLACE INTO task_details ({', '.join(self.performance_columns)}) VALUES (?, ?, ?, ?, ?)",
+            [tuple(item.get(column) for column in self.performance_columns) for item in task_data])
+
+    def close(self):
+        self.write_pending()
+        self.connection.close()
+
+
+def default_task_backend():
+    # TODO_STORAGE=text keeps the old plain-text files as the live storage
+    if os.environ.get("TODO_STORAGE", "sqlite") == "text":
+        return TextFileTaskBackend()
+    return SQLiteTaskBackend()
+
+
+class TaskIndex:
+    # Hash index over the pending and completed tasks, keyed by normalized name, so duplicate checks and lookups cost
+    # the same with ten tasks or a hundred thousand. The dict keeps insertion order and maps each name to its state.
+    # Lists written by older versions can hold the same name more than once, so the rows are counted per name and
+    # state, and a name only leaves the index with its last row.
+    def __init__(self):
+        self.states = {}
+        self.rows = Counter()  # (name, state) -> rows
+
+    @staticmethod
+    def normalize(task):
+        return " ".join(task.split()).casefold()
+
+    def rebuild(self, pending_tasks, completed_tasks):
+        self.states = {}
+        self.rows = Counter()
+        self.add_many(pending_tasks, "pending")
+        self.add_many(completed_tasks, "completed")
+
+    def add(self, task, state):
+        self.add_many([task], state)
+
+    def add_many(self, tasks, state):
+        keys = [self.normalize(task) for task in tasks]
+        self.rows.update((key, state) for key in keys)
+        self.states.update(dict.fromkeys(keys, state))
+
+    def discard(self, task, state):
+        key = self.normalize(task)
+        remaining = self.rows[key, state] - 1
+        if remaining > 0:
+            self.rows[key, state] = remaining
+            return
+        self.rows.pop((key, state), None)
+        if self.states.get(key) == state:
+            other_state = "completed" if state == "pending" else "pending"
+            if self.rows[key, other_state]:
+                self.states[key] = other_state
+            else:
+                del self.states[key]
+
+    def state_of(self, task):
+        return self.states.get(self.normalize(task))
+
+    def __contains__(self, task):
+        return self.normalize(task) in self.states
+
+    def __len__(self):
+        return len(self.states)
+
+
+class TaskSearchIndex:
+    # Inverted index for search: each word of each task, in any list, maps to the storage ids of the tasks containing
+    # it. A query word of three letters or more matches every indexed word containing it, found with str.find over
+    # all the words joined into one string; shorter query words match by prefix only, from a bisect over the sorted
+    # words. A task must match every word of the query. The index is built the first time it is searched and kept up
+    # to date after that; a reload only marks it stale.
+    min_substring_length = 3
+    _word_pattern = re.compile(r"\w+")
+
+    def __init__(self):
+        self.built = False
+        self.postings = {}  # word -> set of task ids
+        self._task_words = {}  # task id -> its words, to unindex it
+        self._sorted_words = []
+        self._word_text = None  # "\n".join(self._sorted_words), rebuilt after the word set changes
+        self._last_search = (None, None)  # (query, matching ids)
+
+    @classmethod
+    def words(cls, text):
+        return set(cls._word_pattern.findall(text.casefold()))
+
+    def invalidate(self):
+        self.built = False
+        self.postings = {}
+        self._task_words = {}
+        self._sorted_words = []
+        self._changed()
+
+    def rebuild(self, tasks_by_id):
+        self.invalidate()
+        self.built = True
+        self.add_many(tasks_by_id)
+        self._sorted_words = sorted(self.postings)
+
+    def add_many(self, tasks_by_id):
+        # [(task id, task)]; ignored until the index is built
+        if not self.built:
+            return
+        new_words = []
+        for task_id, task in tasks_by_id:
+            words = self._task_words[task_id] = self.words(task)
+            for word in words:
+                ids = self.postings.get(word)
+                if ids is None:
+                    ids = self.postings[word] = set()
+                    new_words.append(word)
+                ids.add(task_id)
+        self._update_sorted_words(new_words, [])
+
+    def discard_many(self, task_ids):
+        if not self.built:
+            return
+        removed_words = []
+        for task_id in task_ids:
+            for word in self._task_words.pop(task_id, ()):
+                ids = self.postings[word]
+                ids.discard(task_id)
+                if not ids:
+                    del self.postings[word]
+                    removed_words.append(word)
+        self._update_sorted_words([], removed_words)
+
+    def _update_sorted_words(self, new_words, removed_words):
+        words = self._sorted_words
+        if len(new_words) + len(removed_words) > 64:
+            self._sorted_words = sorted(self.postings)
+        else:
+            for word in new_words:
+                words.insert(bisect_left(words, word), word)
+            for word in removed_words:
+                del words[bisect_left(words, word)]
+        self._changed(word_set_changed=bool(new_words or removed_words))
+
+    def _changed(self, word_set_changed=True):
+        self._last_search = (None, None)
+        if word_set_changed:
+            self._word_text = None
+
+    def matching_words(self, query_word):
+        words = self._sorted_words
+        if len(query_word) < self.min_substring_length:
+            first = bisect_left(words, query_word)
+            return words[first:bisect_left(words, query_word + "\U0010ffff", first)]
+        if self._word_text is None:
+            self._word_text = "\n".join(words)
+        text, matches = self._word_text, []
+        position = text.find(query_word)
+        while position != -1:
+            start = text.rfind("\n", 0, position) + 1
+            end = text.find("\n", position)
+            if end == -1:
+                end = len(text)
+            matches.append(text[start:end])
+            position = text.find(query_word, end)
+        return matches
+
+    def search(self, query):
+        # ids of the tasks matching every word of query (an empty query matches nothing)
+        if query == self._last_search[0]:
+            return self._last_search[1]
+        matches = None
+        for query_word in sorted(self.words(query), key=len, reverse=True):  # longest, most selective words first
+            ids = set().union(*(self.postings[word] for word in self.matching_words(query_word)))
+            matches = ids if matches is None else matches & ids
+            if not matches:
+                break
+        matches = matches or set()
+        self._last_search = (query, matches)
+        return matches
+
+
+class TaskEngine:
+    # Owns the pending, completed and recycled tasks and applies the add/complete/recycle/restore/purge actions to
+    # them through a storage backend. Subclasses are told about changes through the tasks_reloaded/tasks_edited hooks.
+    def __init__(self, backend=None, **kwargs):
+        super().__init__(**kwargs)
+        self.backend = backend if backend is not None else default_task_backend()
+        self.pending_tasks = []
+        self.completed_tasks = []
+        self.recycle_bin_tasks = []
+        # storage row ids, kept parallel to the three lists above
+        self._pending_ids = []
+        self._completed_ids = []
+        self._recycle_bin_ids = []
+        self.index = TaskIndex()  # dedup/membership for pending and completed tasks
+        self.search_index = TaskSearchIndex()  # words of the tasks in all three lists
+        self._edits = None
+        self._undo = None  # the running mutation's changes to the lists, undone if its storage work fails
+
+    # hooks
+    def tasks_reloaded(self, list_names):
+        pass
+
+    def tasks_edited(self, edits):
+        pass
+
+    def ensure_loaded(self):
+        pass  # every list is complete once load() returns
+
+    @timed(category="io")
+    def load(self):
+        loaded = self.backend.load()
+        self._set_tasks(loaded)
+        self._set_recycle_bin_items(loaded)
+        self.tasks_reloaded({"pending", "completed", "recycled"})
+
+    @timed(category="io")
+    def load_tasks(self):
+        self._set_tasks(self.backend.load())
+        self.tasks_reloaded({"pending", "completed"})
+
+    @timed(category="io")
+    def load_recycle_bin_items(self):
+        self._set_recycle_bin_items(self.backend.load())
+        self.tasks_reloaded({"recycled"})
+
+    def _set_tasks(self, loaded):
+        self._pending_ids = [task_id for task_id, _ in loaded["pending"]]
+        self.pending_tasks = [task for _, task in loaded["pending"]]
+        self._completed_ids = [task_id for task_id, _ in loaded["completed"]]
+        self.completed_tasks = [task for _, task in loaded["completed"]]
+        self.index.rebuild(self.pending_tasks, self.completed_tasks)
+        self.search_index.invalidate()
+
+    def _set_recycle_bin_items(self, loaded):
+        self._recycle_bin_ids = [task_id for task_id, _ in loaded["recycled"]]
+        self.recycle_bin_tasks = [task for _, task in loaded["recycled"]]
+        self.search_index.invalidate()
+
+    @timed(category="io")
+    def flush(self):
+        # everything committed so far on disk, plus a fresh snapshot for the text backend
+        self.backend.flush(self)
+
+    def close(self):
+        self.flush()
+        self.backend.close()
+
+    @timed(category="io")
+    def load_performance_data(self):
+        return self.backend.load_performance_data()
+
+    @timed(category="io")
+    def save_performance_data(self, task_data):
+        self.backend.save_performance_data(task_data)
+
+    def tasks(self, list_name):
+        return self._lists(list_name)[0]
+
+    def _lists(self, list_name):
+        return {"pending": (self.pending_tasks, self._pending_ids),
+                "completed": (self.completed_tasks, self._completed_ids),
+                "recycled": (self.recycle_bin_tasks, self._recycle_bin_ids)}[list_name]
+
+    def _take_rows(self, list_name, rows):
+        # removes a whole selection from one list and returns its (task, id) pairs in list order
+        tasks, ids = self._lists(list_name)
+        rows = sorted(set(rows))
+        taken = [(tasks[row], ids[row]) for row in rows]
+        self._edits.extend(("remove", list_name, row) for row in reversed(rows))
+        if len(rows) < 16:
+            for row in reversed(rows):
+                del tasks[row], ids[row]
+        else:
+            # one pass over the list instead of a memmove per removed row; slice assignment keeps the list objects
+            removed = set(rows)
+            tasks[:] = [task for row, task in enumerate(tasks) if row not in removed]
+            ids[:] = [task_id for row, task_id in enumerate(ids) if row not in removed]
+        if list_name != "recycled":
+            for task, _ in taken:
+                self.index.discard(task, list_name)
+        self._undo.append(("take", list_name, list(zip(rows, taken))))
+        return taken
+
+    def _extend(self, list_name, tasks, task_ids):
+        stored_tasks, ids = self._lists(list_name)
+        self._edits.extend(("append", list_name, task) for task in tasks)
+        stored_tasks.extend(tasks)
+        ids.extend(task_ids)
+        if list_name != "recycled":
+            self.index.add_many(tasks, list_name)
+        self._undo.append(("extend", list_name, len(tasks)))
+
+    def _move_rows(self, from_list, rows, to_list):
+        taken = self._take_rows(from_list, rows)
+        tasks = [task for task, _ in taken]
+        task_ids = [task_id for _, task_id in taken]
+        self._extend(to_list, tasks, task_ids)
+        self.backend.move(task_ids, from_list, to_list, tasks)
+
+    def task_state(self, task):
+        # "pending", "completed" or None, without scanning the lists
+        return self.index.state_of(task)
+
+    def find_rows(self, list_name, tasks):
+        # rows of the given task names in one list, matched like the duplicate check; unknown names are skipped
+        wanted = {TaskIndex.normalize(task) for task in tasks}
+        return [row for row, task in enumerate(self._lists(list_name)[0]) if TaskIndex.normalize(task) in wanted]
+
+    def search(self, query):
+        # storage ids of the tasks, in any list, matching every word of query
+        if not self.search_index.built:
+            self.search_index.rebuild((task_id, task) for list_name in ("pending", "completed", "recycled")
+                                      for task, task_id in zip(*self._lists(list_name)))
+        return self.search_index.search(query)
+
+    def search_rows(self, list_name, query):
+        # rows of one list whose task matches query, in list order
+        matches = self.search(query)
+        if not matches:
+            return []
+        return [row for row, task_id in enumerate(self._lists(list_name)[1]) if task_id in matches]
+
+    def success_rate(self):
+        # completed tasks as a percentage of the pending ones, as shown in the "Your Performance" window
+        if not self.pending_tasks:
+            return 100  # All pending tasks are completed
+        return (len(self.completed_tasks) / len(self.pending_tasks)) * 100
+
+    @contextmanager
+    def _mutation(self, operation):
+        self.ensure_loaded()
+        self._edits = []
+        self._undo = []
+        self.backend.begin()
+        try:
+            yield
+        except Exception:
+            self.backend.rollback()
+            self._undo_changes()
+            raise
+        self._undo = None
+        self.backend.commit(self, operation, self._edits)
+        edits, self._edits = self._edits, None
+        if edits:
+            self.tasks_edited(edits)
+
+    def _undo_changes(self):
+        # puts the lists and the dedup index back as they were before a mutation whose storage work failed, so they
+        # still match the storage it rolled back; the search index is rebuilt by the next search
+        for change, list_name, value in reversed(self._undo):
+            tasks, ids = self._lists(list_name)
+            if change == "extend":
+                restored = tasks[len(tasks) - value:]
+                del tasks[len(tasks) - value:], ids[len(ids) - value:]
+                if list_name != "recycled":
+                    for task in restored:
+                        self.index.discard(task, list_name)
+            else:
+                for row, (task, task_id) in value:
+                    tasks.insert(row, task)
+                    ids.insert(row, task_id)
+                if list_name != "recycled":
+                    self.index.add_many([task for _, (task, _) in value], list_name)
+        self._undo = self._edits = None
+        self.search_index.invalidate()
+
+    # mutations: each one persists only the affected rows and reports its edits through tasks_edited
+    def add_pending_task(self, task):
+        return bool(self.add_pending_tasks([task]))
+
+    @staticmethod
+    def canonical_task(task):
+        # how a new task is stored, whichever front end added it: trimmed and in capitals
+        return task.strip().upper()
+
+    def add_pending_tasks(self, tasks):
+        # bulk add in one transaction; tasks already pending or completed (or repeated in the input) are skipped
+        self.ensure_loaded()
+        added, seen = [], set()
+        for task in map(self.canonical_task, tasks):
+            key = TaskIndex.normalize(task)
+            if key and key not in seen and key not in self.index.states:
+                seen.add(key)
+                added.append(task)
+        if added:
+            with self._mutation("add"):
+                task_ids = self.backend.insert_many("pending", added)
+                self._extend("pending", added, task_ids)
+                self.search_index.add_many(zip(task_ids, added))
+        return added
+
+    def delete_pending_tasks(self, rows):
+        with self._mutation("delete"):
+            taken = self._take_rows("pending", rows)
+            task_ids = [task_id for _, task_id in taken]
+            self.backend.delete(task_ids, "pending", [task for task, _ in taken])
+            self.search_index.discard_many(task_ids)
+
+    def complete_tasks(self, rows):
+        self._move_unique_rows("complete", "pending", rows, "completed")
+
+    def uncomplete_tasks(self, rows):
+        with self._mutation("uncomplete"):
+            self._move_rows("completed", rows, "pending")
+
+    def recycle_completed_tasks(self, rows):
+        with self._mutation("recycle"):
+            self._move_rows("completed", rows, "recycled")
+
+    def recycle_all_completed_tasks(self):
+        self.recycle_completed_tasks(range(len(self.completed_tasks)))
+
+    def restore_tasks(self, rows):
+        # bulk restore: the whole selection goes back to the completed tasks in one transaction, one write per file
+        # and one tasksEdited notification; tasks that are pending or completed again are dropped from the bin
+        self._move_unique_rows("restore", "recycled", rows, "completed")
+
+    def _move_unique_rows(self, operation, from_list, rows, to_list):
+        with self._mutation(operation):
+            moved_tasks, moved_ids, dropped_tasks, dropped_ids, seen = [], [], [], [], set()
+            for task, task_id in self._take_rows(from_list, rows):
+                key = TaskIndex.normalize(task)
+                if self.index.states.get(key) in (None, from_list) and key not in seen:
+                    seen.add(key)
+                    moved_tasks.append(task)
+                    moved_ids.append(task_id)
+                else:
+                    dropped_tasks.append(task)
+                    dropped_ids.append(task_id)
+            self._extend(to_list, moved_tasks, moved_ids)
+            self.backend.move(moved_ids, from_list, to_list, moved_tasks)
+            self.backend.delete(dropped_ids, from_list, dropped_tasks)
+            self.search_index.discard_many(dropped_ids)
+
+    def purge_recycled_tasks(self, rows):
+        # bulk purge: permanently deletes the selection in one transaction
+        with self._mutation("purge"):
+            taken = self._take_rows("recycled", rows)
+            task_ids = [task_id for _, task_id in taken]
+            self.backend.delete(task_ids, "recycled", [task for task, _ in taken])
+            self.search_index.discard_many(task_ids)
@@ -0,0 +1,120 @@
+# ______________________________________________ ADVANCED TO-DO LIST: INSTRUMENTATION __________________________________
+# Opt-in timing of slots, file loads/saves and table refreshes. Set TODO_INSTRUMENT=1 (or use the hidden diagnostics
+# menu, Ctrl+Shift+D in the main window) to switch it on. Spans go to a fixed-size ring buffer that the diagnostics
+# panel shows and that can be exported as Chrome trace-event JSON (chrome://tracing, Perfetto). While it is off, a timed
+# function costs one attribute check per call. StartupProfile times the phases of a start-up. Nothing here imports
+# PyQt5.
+import functools
+import json
+import os
+import threading
+import time
+from collections import Counter, deque
+from contextlib import contextmanager
+
+
+class Instrumentation:
+    def __init__(self, enabled=False, capacity=10000):
+        self.enabled = enabled
+        self.events = deque(maxlen=capacity)  # (name, category, start us, duration us, thread id); oldest dropped
+        self.counters = Counter()  # e.g. widgets created
+        self.origin_ns = time.perf_counter_ns()
+        self.thread_names = {}
+
+    def enable(self, enabled=True):
+        self.enabled = enabled
+
+    def clear(self):
+        self.events.clear()
+        self.counters.clear()
+
+    @contextmanager
+    def span(self, name, category="function"):
+        started = time.perf_counter_ns()
+        try:
+            yield
+        finally:
+            ended = time.perf_counter_ns()
+            thread = threading.current_thread()
+            self.thread_names.setdefault(thread.ident, thread.name)
+            self.events.append((name, category, (started - self.origin_ns) // 1000, (ended - started) // 1000,
+                                thread.ident))
+
+    def count(self, name, amount=1):
+        if self.enabled:
+            self.counters[name] += amount
+
+    def summary(self):
+        # {name: (calls, total ms, max ms)} over the spans still in the ring buffer, slowest total first
+        totals = {}
+        for name, _, _, duration, _ in list(self.events):
+            calls, total, longest = totals.get(name, (0, 0, 0))
+            totals[name] = (calls + 1, total + duration, max(longest, duration))
+        return {name: (calls, total / 1000, longest / 1000)
+                for name, (calls, total, longest) in sorted(totals.items(), key=lambda item: -item[1][1])}
+
+    def chrome_trace(self):
+        # the trace-event format: one complete ("X") event per span, thread names as metadata and the counters as a
+        # final counter ("C") event
+        pid = os.getpid()
+        events = [{"name": "thread_name", "ph": "M", "pid": pid, "tid": tid, "args": {"name": name}}
+                  for tid, name in self.thread_names.items()]
+        events.extend({"name": name, "cat": category, "ph": "X", "ts": start, "dur": duration, "pid": pid, "tid": tid}
+                      for name, category, start, duration, tid in list(self.events))
+        if self.counters:
+            events.append({"name": "counters", "ph": "C", "pid": pid, "tid": threading.get_ident(),
+                           "ts": (time.perf_counter_ns() - self.origin_ns) // 1000, "args": dict(self.counters)})
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+    def export_chrome_trace(self, path):
+        with open(path, "w", encoding="utf-8") as file:
+            json.dump(self.chrome_trace(), file)
+
+
+instrumentation = Instrumentation(enabled=os.environ.get("TODO_INSTRUMENT", "0") not in ("", "0"))
+
+
+class StartupProfile:
+    # Back-to-back phases of one start-up, e.g. import, UI build, first paint, data load. The clock starts when this
+    # module is imported, so "To-Do App.py" imports it before PyQt5. Phases are also recorded as "startup" spans while
+    # instrumentation is enabled.
+    def __init__(self):
+        self.started_ns = time.perf_counter_ns()
+        self.phases = []  # (name, start ns, end ns)
+
+    def mark(self, name):
+        # ends the phase called name now; it began where the previous one ended
+        start = self.phases[-1][2] if self.phases else self.started_ns
+        end = time.perf_counter_ns()
+        self.phases.append((name, start, end))
+        if instrumentation.enabled:
+            instrumentation.events.append((name, "startup", (start - instrumentation.origin_ns) // 1000,
+                                           (end - start) // 1000, threading.get_ident()))
+
+    def total_ms(self):
+        return (self.phases[-1][2] - self.started_ns) / 1e6 if self.phases else 0.0
+
+    def report(self):
+        lines = [f"{name:<14}{(end - start) / 1e6:>10.1f} ms" for name, start, end in self.phases]
+        lines.append(f"{'total':<14}{self.total_ms():>10.1f} ms")
+        return "\n".join(lines)
+
+
+startup_profile = StartupProfile()
+
+
+def timed(name=None, category="function"):
+    # Decorator recording a span for each call while instrumentation is enabled. The wrapper takes *args, so Qt hands
+    # it every argument of the signal it is connected to (e.g. clicked's checked flag); connect a timed slot through a
+    # lambda when the signal carries arguments the slot does not take.
+    def decorate(func):
+        label = name or func.__qualname__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not instrumentation.enabled:
+                return func(*args, **kwargs)
+            with instrumentation.span(label, category):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorate
@@ -0,0 +1,124 @@
+# ______________________________________________ ADVANCED TO-DO LIST: FILE I/O _______________________________________
+# Whole-file reads and writes off the GUI thread. Each file has its own queue, worked through by one QThreadPool task
+# at a time, so operations on a file run in the order they were asked for while different files proceed in parallel.
+# Every write goes to a temp file that is fsync'd and renamed over the target, so a crash leaves either the old file
+# or the new one. A write still waiting in the queue is replaced by a newer write of the same file (each write is the
+# whole file), and every read returns the newest queued data, so callers always read their own writes. read() delivers
+# its result through a queued Qt signal; read_text()/read_bytes() are the blocking forms for code already off the GUI
+# thread (or that cannot wait).
+import threading
+from collections import deque
+from PyQt5.QtCore import QObject, QRunnable, QThreadPool, pyqtSignal
+from todo_engine import TEXT_ENCODING, atomic_write_bytes, atomic_write_text, decode_text, read_text
+
+
+class FileIOTask(QRunnable):
+    def __init__(self, service, path):
+        super().__init__()
+        self.service = service
+        self.path = path
+
+    def run(self):
+        self.service.run_queue(self.path)
+
+
+class FileIOService(QObject):
+    writeFinished = pyqtSignal(str)  # path; only once no newer write of it is waiting
+    readFinished = pyqtSignal(str, object)  # path, contents as bytes (None when the file does not exist)
+    failed = pyqtSignal(str, str)  # path, error
+
+    def __init__(self, max_threads=2, parent=None):
+        super().__init__(parent)
+        self._lock = threading.Lock()
+        self._queues = {}  # path -> deque of ("write", data) / ("read", None); present while a task works on the path
+        self._in_flight = {}  # path -> data of the write being performed now
+        self._pool = QThreadPool(self)
+        self._pool.setMaxThreadCount(max_threads)
+
+    def write(self, path, data):
+        # replaces the file with data: str is written as text, bytes as they are
+        self._submit(path, ("write", data))
+
+    def read(self, path):
+        # readFinished(path, contents) once every write queued before it is on disk
+        self._submit(path, ("read", None))
+
+    def read_text(self, path):
+        data = self.pending_data(path)
+        if data is None:
+            return read_text(path)
+        return data if isinstance(data, str) else decode_text(data)
+
+    def read_bytes(self, path):
+        data = self.pending_data(path)
+        if data is None:
+            with open(path, "rb") as file:
+                return file.read()
+        return data if isinstance(data, bytes) else data.encode(TEXT_ENCODING)
+
+    def pending_data(self, path):
+        # the newest data queued or being written for path, or None when the file on disk is current
+        with self._lock:
+            for kind, data in reversed(self._queues.get(path, ())):
+                if kind == "write":
+                    return data
+            return self._in_flight.get(path)
+
+    def _submit(self, path, operation):
+        with self._lock:
+            queue = self._queues.get(path)
+            start = queue is None
+            if start:
+                queue = self._queues[path] = deque()
+            if operation[0] == "write" and queue and queue[-1][0] == "write":
+                queue[-1] = operation  # nothing has read the older write yet, so only the newest is written
+            else:
+                queue.append(operation)
+        if start:
+            self._pool.start(FileIOTask(self, path))
+
+    def run_queue(self, path):
+        # Runs on the pool: works through path's queue until it is empty
+        while True:
+            with self._lock:
+                queue = self._queues[path]
+                if not queue:
+                    del self._queues[path]
+                    return
+                kind, data = queue.popleft()
+                if kind == "write":
+                    self._in_flight[path] = data
+            try:
+                if kind == "write":
+                    if isinstance(data, str):
+                        atomic_write_text(path, data)
+                    else:
+                        atomic_write_bytes(path, data)
+                else:
+                    try:
+                        with open(path, "rb") as file:
+                            contents = file.read()
+                    except FileNotFoundError:
+                        contents = None
+            except Exception as error:  # not only OSError: the queue must keep moving after any failure
+                self.failed.emit(path, str(error))
+            else:
+                if kind == "read":
+                    self.readFinished.emit(path, contents)
+                elif not self._superseded(path):
+                    self.writeFinished.emit(path)
+            finally:
+                if kind == "write":
+                    with self._lock:
+                        del self._in_flight[path]
+
+    def _superseded(self, path):
+        with self._lock:
+            return any(kind == "write" for kind, _ in self._queues[path])
+
+    def wait_for_done(self):
+        # blocks until every queued operation has finished; used when the app closes
+        self._pool.waitForDone()
+
+
+io_service = FileIOService()
@@ -0,0 +1,163 @@
+# ______________________________________________ ADVANCED TO-DO LIST: THEMES ___________________________________________
+# One application-wide stylesheet per theme. Every window and styled widget has an object name (or a dynamic property
+# for widgets that share a look), and the rules below are scoped by the window's object name, so a whole theme is one
+# QApplication.setStyleSheet call instead of a setStyleSheet per widget. Each theme's sheet is built once and cached.
+from PyQt5.QtCore import QObject, pyqtSignal
+from PyQt5.QtWidgets import QApplication
+
+# Rules that look the same in both themes. Widget rules carry the window's and the widget's object names, which makes
+# them more specific than the theme's window-wide rules (e.g. "#todoApp QPushButton:hover"), as a widget's own
+# stylesheet used to be.
+COMMON_STYLESHEET = """
+/* cell editors of the "Your Performance" table delegates */
+#performanceWindow [cellEditor="true"], #performanceWindow [cellEditor="true"] * {background-color: #ccc;}
+
+/* AGL shift viewer */
+#shiftScheduleWindow, #shiftScheduleWindow * {background-color: #05161a;}
+#shiftScheduleWindow QLabel#dateLabel {
+    background-color: #000; color: #ccc; padding-left: 120px; padding-top: 5px; padding-bottom: 5px;
+    border: 1px solid #c1e8ff;
+}
+#shiftScheduleWindow #patternCombo, #shiftScheduleWindow #patternCombo * {background-color: #f2f2f2;}
+#shiftScheduleWindow #shiftCalendar, #shiftScheduleWindow #shiftCalendar * {background-color: #6da5c0;}
+#shiftScheduleWindow QLabel#legendLabel {background-color: #000; color: #ccc; padding: 3px;}
+#shiftScheduleWindow QLabel#shiftOutputLabel {
+    background-color: #000; padding-left: 120px; padding-top: 5px; padding-bottom: 5px; border: 1px solid #c1e8ff;
+    color: yellow;
+}
+#shiftScheduleWindow [rosterInput="true"], #shiftScheduleWindow [rosterInput="true"] * {background-color: #f2f2f2;}
+#shiftScheduleWindow QPushButton#exportRosterButton {background-color: #29343d; color: #ccc;}
+#shiftScheduleWindow QPushButton#exportRosterButton:hover {background-color: green;}
+
+/* Your Performance */
+#performanceWindow QPushButton#saveButton {
+    background-color: #000; color: white; border: 2px solid greenyellow; border-radius: 10px;
+}
+#performanceWindow QPushButton#saveButton:hover {background-color: green; color: white;}
+#performanceWindow QHeaderView#taskRowHeader::section {background-color: #3c3c3c; color: white; font-weight: bold;}
+#performanceWindow QTabWidget#taskTabs QTabBar {color: #fff;}
+#performanceWindow QTabWidget#taskTabs QTabBar::tab {background-color: #000; color: #ccc;}
+#performanceWindow QTabWidget#taskTabs QTabBar::tab:selected {background-color: #468faf; color: #ccc;}
+#performanceWindow [taskTab="pending"] {background-color: #FCF55F; color: #000; padding: 10px;}
+#performanceWindow [taskTab="completed"] {background-color: green; color: #fff; padding: 10px;}
+#performanceWindow [taskTab="recycled"] {background-color: #465362; color: #fff; padding: 10px;}
+#performanceWindow [taskTab="analytics"] {background-color: #000; color: #fff; padding: 10px;}
+
+/* Recycle Bin */
+#recycleBinWindow, #recycleBinWindow * {background-color: #000;}
+#recycleBinWindow QLabel#recycleBinLabel {background-color: #ffcc00; padding: 5px; color: black; font-weight: bold;}
+#recycleBinWindow QListView#recycleBinList {
+    background-color: #000; padding-left: 3px; padding-top: 1px; color: white;
+    background-image: url('to-do-list recycle bin background-img.jpg');
+}
+#recycleBinWindow QListView#recycleBinList::item:selected {background-color: black;}
+#recycleBinWindow QLineEdit#recycleBinSearch {background-color: #ccc; color: black;}
+#recycleBinWindow QPushButton#restoreButton, #recycleBinWindow QPushButton#permanentDeletionButton {
+    background-color: #ccc; border: 2px solid #4CAF50; border-radius: 10px; padding: 5px 10px;
+}
+#recycleBinWindow QPushButton#restoreButton:hover {background-color: green; color: white;}
+#recycleBinWindow QPushButton#permanentDeletionButton:hover {background-color: #ff0000; color: white;}
+
+/* main window buttons */
+#todoApp QPushButton#aglShiftsButton {background-color: #29343d; color: #ccc;}
+#todoApp QPushButton#aglShiftsButton:hover {background-color: green;}
+#todoApp #modeCombo, #todoApp #modeCombo * {background-color: #f2f2f2;}
+#todoApp QPushButton#currentTimeButton {text-align: left; background-color: #f2f2f2;}
+#todoApp QPushButton#refreshButton {
+    background-color: black; color: white; letter-spacing: 1px; font-family: Georgia, san-serif; padding: 5px 1px;
+    margin: 0; border-color: white;
+}
+#todoApp QPushButton#refreshButton:hover {background-color: black; color: green;}
+#todoApp QPushButton#performanceButton {background-color: black; color: white;}
+#todoApp QPushButton#performanceButton:hover {background-color: green;}
+#todoApp QPushButton#recycleBinButton {background-color: #4d4dff; color: white;}
+#todoApp QPushButton#recycleBinButton:hover {background-color: green; color: white;}
+"""
+
+THEME_STYLESHEETS = {
+    "light": """
+#todoApp, #todoApp QWidget {background-color: #05161a;}
+#todoApp QLabel {
+    background-color: #ffcc00; padding: 5px; color: black; font-weight: bold; font-family: Arial, sans-serif;
+}
+#todoApp QListView {background-color: #e4e7eb;}
+#todoApp QLineEdit {background-color: white; color: black; font-weight: bold;}
+#todoApp QPushButton {background-color: #98FB98; border: 1px solid #4CAF50; border-radius: 10px; padding: 5px 10px;}
+#todoApp QPushButton:hover {background-color: yellow;}
+#todoApp QPushButton:pressed {background-color: #FF0000;}
+#todoApp QMenu {background-color: #e4e7eb; color: #000;}
+#todoApp QMessageBox {background-color: #000;}
+#todoApp QMessageBox QPushButton {background-color: #000; color: white;}
+#todoApp QMessageBox QPushButton:hover {background-color: #00ff00; color: white;}
+#todoApp QMessageBox QLabel {background-color: #000; color: white;}
+QToolTip {
+    border: 2px solid black; border-radius: 7px; background-color: grey; color: yellow; padding: 8px;
+}
+
+#performanceWindow QHeaderView#taskHeader::section {background-color: green; color: white; font-weight: bold;}
+#performanceWindow QTableView#performanceTable {background-color: #edfbff; color: black;}
+""",
+    "dark": """
+#todoApp, #todoApp QWidget {background-color: #021024;}
+#todoApp QLabel {background-color: #5483b3; padding: 5px; color: white;}
+#todoApp QListView {background-color: #29343d; color: #ccc;}
+#todoApp QListView::item:selected {background-color: #0f969c; color: #c1e8ff;}
+#todoApp QLineEdit {background-color: #c1ebff;}
+#todoApp QPushButton {background-color: #5483b3; border: 1px solid #4CAF50; border-radius: 10px; padding: 5px 10px;}
+#todoApp QPushButton:hover {background-color: green; color: white;}
+#todoApp QPushButton:pressed {background-color: #FF0000;}
+#todoApp QComboBox {background-color: #c1ebff; color: white;}
+#todoApp QMenu {background-color: #29343d; color: #ccc;}
+#todoApp QMessageBox {background-color: #000;}
+#todoApp QPushButton#currentTimeButton {background-color: #021024; border-color: #021024; color: yellow;}
+#todoApp QPushButton#currentTimeButton:hover {background-color: #021024; border-color: #021024; color: #021024;}
+
+#performanceWindow, #performanceWindow QFrame {background-color: #021024;}
+#performanceWindow QHeaderView#taskHeader::section {background-color: #0077b6; color: white; font-weight: bold;}
+#performanceWindow QTableView#performanceTable {background-color: #a3aabe; color: black;}
+#performanceWindow QLabel#referenceLabel {color: white;}
+#performanceWindow #readOnlyNotice, #performanceWindow #readOnlyNotice * {background-color: white;}
+""",
+}
+
+
+def build_stylesheet(theme):
+    return COMMON_STYLESHEET + THEME_STYLESHEETS[theme]
+
+
+class ThemeManager(QObject):
+    # Owns the current theme. apply() swaps the application stylesheet in one call; windows that draw theme colours
+    # themselves (the performance chart) listen to themeChanged instead of reading a global flag.
+    themeChanged = pyqtSignal(str)
+
+    def __init__(self, theme="light"):
+        super().__init__()
+        self.theme = theme
+        self.applied = None  # theme whose stylesheet the QApplication currently has
+        self._stylesheets = {}
+
+    @property
+    def is_dark(self):
+        return self.theme == "dark"
+
+    def stylesheet(self, theme):
+        stylesheet = self._stylesheets.get(theme)
+        if stylesheet is None:
+            stylesheet = self._stylesheets[theme] = build_stylesheet(theme)
+        return stylesheet
+
+    def apply(self, theme=None):
+        theme = theme or self.theme
+        if theme not in THEME_STYLESHEETS:
+            raise ValueError(f"unknown theme {theme!r}")
+        changed = theme != self.theme
+        self.theme = theme
+        app = QApplication.instance()
+        if app is not None and theme != self.applied:
+            app.setStyleSheet(self.stylesheet(theme))
+            self.applied = theme
+        if changed:
+            self.themeChanged.emit(theme)
+
+
+theme_manager = ThemeManager()